@@ -2,52 +2,90 @@
 AI Agent Module - Engages scammers using LLM
 """
 
+import asyncio
 import os
-import re
-from typing import List, Dict, Optional
-
-try:
-    import google.generativeai as genai
-except ImportError:
-    print("Warning: google.generativeai not available, using fallback responses")
-    genai = None
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, List, Dict, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 
+from circuit_breaker import CircuitBreaker
+from intent_router import intent_router
+from llm_backend import LLMBackend, create_backend
+from prompt_builder import BuiltPrompt, prompt_builder
+from reply_cache import ReplyKey, reply_cache
+from request_coalescer import RequestCoalescer
+from text_analysis import MessageAnalysis, analyze
+
 load_dotenv('api.env')
 
+# Reply language for messages written in a non-Latin script
+SCRIPT_LANGUAGES = {"Devanagari": "Hindi", "Tamil": "Tamil", "Telugu": "Telugu"}
+
+# LLM calls in flight at once (async path), and the per-reply deadline in
+# seconds (including time spent waiting for a slot) before falling back
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', 8))
+
+# Seconds after which a reply still being generated is answered with the
+# scripted fallback instead (the call finishes in the background); 0 disables
+LLM_HEDGE_SECONDS = float(os.getenv('LLM_HEDGE_SECONDS', 0))
+
+
 class ScamEngagementAgent:
     """AI Agent that engages with scammers while extracting intelligence"""
     
-    def __init__(self):
+    def __init__(self, connect: bool = True):
+        """
+        Args:
+            connect: Create the model backend now; otherwise replies use the
+                scripted fallback until connect() runs (e.g. in a startup warmup)
+        """
         # Try multiple environment variable names
         self.api_key = os.getenv('API_KEY') or os.getenv('GEMINI_API_KEY')
         
-        # Validate API key - only use real API keys, not placeholders
-        is_valid_api_key = (
-            self.api_key and 
-            len(self.api_key) > 5 and
-            self.api_key not in ['your-api-key-here', 'test', '']
-        )
-        
-        self.has_api = False
+        # Model backend (LLM_BACKEND); None means scripted fallback replies
         self.model = None
-        
-        if is_valid_api_key and genai:
-            try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.has_api = True
-                print("✓ Using Gemini API for realistic responses")
-            except Exception as e:
-                print(f"⚠️  Warning: Failed to configure Gemini API: {str(e)}")
-                self.has_api = False
-                self.model = None
-        else:
-            print("⚠️  Using fallback responses (no Gemini API)")
+        self.has_api = False
+        self.connected = False
+        self.connecting = False
+        self._connect_lock = threading.Lock()
         
         self.temperature = float(os.getenv('LLM_TEMPERATURE', 0.85))
         
+        # Async reply path: bounded concurrency, deadline, fallback
+        self.max_concurrency = max(1, LLM_MAX_CONCURRENCY)
+        self.timeout = LLM_TIMEOUT_SECONDS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self.llm_calls = 0
+        self.llm_timeouts = 0
+        self.llm_errors = 0
+        self.in_flight = 0
+        
+        # Fallback instead of the model while it is failing or slow, and
+        # for replies that miss the hedge deadline
+        self.breaker = CircuitBreaker()
+        self.hedge_seconds = LLM_HEDGE_SECONDS
+        self.llm_hedged = 0
+        self._hedged_calls = set()
+        
+        # Model replies reused for repeated script turns
+        self.reply_cache = reply_cache
+        
+        # Concurrent reply requests collected into batches (off unless LLM_BATCH_MAX_WAIT_MS is set)
+        self.coalescer = RequestCoalescer(self._complete_batch_async)
+        
+        # Stage/intent rules behind the scripted replies and continue decision
+        self.intent_router = intent_router
+        
+        # Token-budgeted prompts with a rolling per-session summary
+        self.prompt_builder = prompt_builder
+        
         self.system_prompt = """You are roleplaying as a real person who just received a suspicious message (potential scam).
 You should respond naturally, like a real person who is confused or slightly concerned about the message.
 Guidelines:
@@ -65,22 +103,61 @@ Examples of good responses:
 - "Hmm, but how will sharing my OTP help? Won't that be dangerous?"
 - "Which bank are you calling from? This sounds weird."
 """
+        
+        if connect:
+            self.connect()
     
-    def _detect_language(self, text: str) -> str:
-        """Detect language from text based on character ranges and keywords."""
-        if re.search(r"[\u0900-\u097F]", text):
-            return "Hindi"
-        if re.search(r"[\u0B80-\u0BFF]", text):
-            return "Tamil"
-        if re.search(r"[\u0C00-\u0C7F]", text):
-            return "Telugu"
-        if re.search(r"\b(hola|gracias|buenos)\b", text, re.IGNORECASE):
+    def connect(self) -> bool:
+        """
+        Create the configured model backend, importing its client library (once)
+
+        Returns:
+            Whether a model is available
+
+        Raises:
+            Exception: Whatever creating the backend raised; the agent stays
+                unconnected so the next call tries again
+        """
+        self.connecting = True
+        try:
+            with self._connect_lock:
+                if not self.connected:
+                    # Validate API key - only use real API keys, not placeholders
+                    is_valid_api_key = (
+                        self.api_key and 
+                        len(self.api_key) > 5 and
+                        self.api_key not in ['your-api-key-here', 'test', '']
+                    )
+                    self.set_backend(create_backend(api_key=self.api_key if is_valid_api_key else None))
+                    if not self.has_api:
+                        print("⚠️  Using fallback responses (no Gemini API)")
+        finally:
+            self.connecting = False
+        return self.has_api
+
+    def set_backend(self, model: Optional[LLMBackend]):
+        """
+        Swap the model backend (e.g. a local stand-in for load tests)
+
+        Args:
+            model: Backend with the LLMBackend surface, or None for fallback replies
+        """
+        self.model = model
+        self.has_api = model is not None
+        self.connected = True
+
+    def _detect_language(self, text: Union[str, MessageAnalysis]) -> str:
+        """Detect language from text based on its script and keywords."""
+        analysis = analyze(text)
+        if analysis.script in SCRIPT_LANGUAGES:
+            return SCRIPT_LANGUAGES[analysis.script]
+        if analysis.words & {"hola", "gracias", "buenos"}:
             return "Spanish"
-        if re.search(r"\b(bonjour|merci|salut)\b", text, re.IGNORECASE):
+        if analysis.words & {"bonjour", "merci", "salut"}:
             return "French"
         return "English"
 
-    def _resolve_language(self, text: str, language: Optional[str]) -> str:
+    def _resolve_language(self, text: Union[str, MessageAnalysis], language: Optional[str]) -> str:
         """Resolve the language to use for response."""
         if not language or language.lower() == "auto":
             return self._detect_language(text)
@@ -88,161 +165,474 @@ Examples of good responses:
 
     
     def generate_reply(self,
-                      current_message: str,
+                      current_message: Union[str, MessageAnalysis],
                       conversation_history: List[Dict] = None,
-                      language: Optional[str] = None) -> str:
+                      language: Optional[str] = None,
+                      session_id: Optional[str] = None) -> str:
         """
         Generate a realistic reply using OpenAI API or fallback responses
 
         Args:
-            current_message: The latest message from scammer
+            current_message: The latest message from scammer (text or its analysis)
             conversation_history: Previous messages in conversation
             language: Preferred reply language
+            session_id: Session whose rolling prompt summary to reuse
 
         Returns:
             Generated reply text
         """
         if conversation_history is None:
             conversation_history = []
+        analysis = analyze(current_message)
 
         # If API is not available, use smarter fallback based on message content
         if not self.has_api:
-            return self._get_smart_fallback(current_message, conversation_history)
+            return self._get_smart_fallback(analysis, conversation_history)
+
+        cache_key, cached = self._cached_reply(analysis, conversation_history, language)
+        if cached is not None:
+            return cached
 
+        if not self.breaker.allow():
+            return self._get_smart_fallback(analysis, conversation_history)
+
+        prompt = self._build_prompt(analysis, conversation_history, session_id)
+        start = time.perf_counter()
         try:
-            # Build conversation context for Gemini
-            context = self.system_prompt + "\n\n"
-            
-            # Add recent conversation history (last 4 messages)
-            if conversation_history:
-                context += "Previous conversation:\n"
-                for msg in conversation_history[-4:]:
-                    sender_label = "Scammer" if msg.get("sender") == "scammer" else "You"
-                    context += f"{sender_label}: {msg.get('text', '')}\n"
-            
-            # Build the prompt
-            prompt = f"{context}\nScammer: {current_message}\nYou (respond naturally in 1-2 sentences):"
-            
             # Generate response with Gemini
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=100,
-                    top_p=0.95,
-                )
-            )
-            
-            reply = response.text.strip()
-            
-            # Clean up if needed
-            if reply.startswith("You:") or reply.startswith("Me:"):
-                reply = reply.split(":", 1)[1].strip()
-            
-            return reply if reply else "That sounds suspicious... Can you explain more?"
+            response = self.model.generate_content(prompt.text, generation_config=self._generation_config())
+            reply = self._clean_reply(response.text)
+            self.breaker.record(time.perf_counter() - start, True)
+            self.prompt_builder.record(prompt, time.perf_counter() - start)
+            return self._store_reply(cache_key, reply)
 
         except Exception as e:
             print(f"Error generating reply: {str(e)}")
-            return self._get_smart_fallback(current_message, conversation_history)
+            self.breaker.record(time.perf_counter() - start, False)
+            self.prompt_builder.record(prompt, None)
+            return self._get_smart_fallback(analysis, conversation_history)
 
-    def _get_smart_fallback(self, message: str, history: List[Dict]) -> str:
-        """Generate contextual fallback responses based on message content and conversation stage."""
-        msg_lower = message.lower()
-        turn_count = len(history)
-        
-        # Early stage responses (first 1-2 messages) - suspicious/questioning
-        if turn_count <= 2:
-            if any(word in msg_lower for word in ["blocked", "suspended", "locked", "freeze", "expiry"]):
-                return "What do you mean it's blocked? When did this happen?"
-            elif any(word in msg_lower for word in ["mobile number", "upi id", "account number", "pin", "otp"]):
-                return "Why would you need that information?"
-            elif any(word in msg_lower for word in ["verify", "confirm", "update", "kyc"]):
-                return "How do I verify it? Is this really from my bank?"
-            elif any(word in msg_lower for word in ["reward", "cashback", "refund", "credit", "bonus"]):
-                return "I don't remember receiving any reward. How much is it?"
-            elif any(word in msg_lower for word in ["urgent", "immediately", "now", "asap", "expire"]):
-                return "Why is it so urgent? Can't this wait?"
-            else:
-                return "Sorry, I didn't understand. Can you explain?"
-        
-        # Middle stage (3-5 messages) - gradually more engaged but still cautious
-        elif turn_count <= 5:
-            if any(word in msg_lower for word in ["qr code", "scan", "click", "link", "download"]):
-                return "How do I know this is safe? What will happen when I scan it?"
-            elif any(word in msg_lower for word in ["pin", "password", "cvv", "otp"]):
-                return "But won't sharing that be risky? How is this secure?"
-            elif any(word in msg_lower for word in ["upi", "bank account", "payment", "transfer"]):
-                return "Okay, but how exactly does this work? What will I need to do?"
-            elif any(word in msg_lower for word in ["confirm", "approve", "accept"]):
-                return "What exactly will I be confirming? What happens next?"
-            elif any(word in msg_lower for word in ["receive", "collect", "process", "credit"]):
-                return "So I just need to do this and the money comes to my account?"
-            else:
-                return "Hmm, okay. What do I need to do exactly?"
-        
-        # Later stage (6+ messages) - more engaged, asking for specifics
+    async def generate_reply_async(self,
+                                   current_message: Union[str, MessageAnalysis],
+                                   conversation_history: List[Dict] = None,
+                                   language: Optional[str] = None,
+                                   timeout: Optional[float] = None,
+                                   session_id: Optional[str] = None) -> str:
+        """
+        Generate a reply without blocking the event loop
+
+        At most max_concurrency LLM calls run at once (others wait for a
+        slot). The model's native async client is used when available,
+        otherwise the blocking client runs on a dedicated thread pool. If no
+        reply arrives within the deadline (slot wait included), the smart
+        fallback reply is returned instead. Replies already cached for the
+        conversation stage, language and message intent skip the model, and
+        so do all replies while the circuit breaker is open. With
+        hedge_seconds set, a reply not ready by then is answered with the
+        fallback while the call completes in the background.
+
+        Args:
+            current_message: The latest message from scammer (text or its analysis)
+            conversation_history: Previous messages in conversation
+            language: Preferred reply language
+            timeout: Override for the per-reply deadline in seconds
+            session_id: Session whose rolling prompt summary to reuse
+
+        Returns:
+            Generated reply text
+        """
+        if conversation_history is None:
+            conversation_history = []
+        analysis = analyze(current_message)
+
+        if not self.has_api:
+            return self._get_smart_fallback(analysis, conversation_history)
+
+        cache_key, cached = self._cached_reply(analysis, conversation_history, language)
+        if cached is not None:
+            return cached
+
+        if not self.breaker.allow():
+            return self._get_smart_fallback(analysis, conversation_history)
+
+        prompt = self._build_prompt(analysis, conversation_history, session_id)
+        call = asyncio.ensure_future(self._model_reply_async(prompt, cache_key, timeout or self.timeout))
+        if self.hedge_seconds > 0:
+            done, _ = await asyncio.wait({call}, timeout=self.hedge_seconds)
+            if not done:
+                # Its outcome still reaches the breaker and the reply cache
+                self.llm_hedged += 1
+                self._hedged_calls.add(call)
+                call.add_done_callback(self._hedged_calls.discard)
+                return self._get_smart_fallback(analysis, conversation_history)
+        reply = await call
+        return reply if reply is not None else self._get_smart_fallback(analysis, conversation_history)
+
+    async def _model_reply_async(self, prompt: BuiltPrompt, cache_key: Optional[ReplyKey], timeout: float) -> Optional[str]:
+        """
+        One model reply within its deadline, reported to the breaker, prompt stats and reply cache
+
+        Args:
+            prompt: Built prompt
+            cache_key: Reply cache key (None when the cache is off)
+            timeout: Deadline in seconds, slot wait included
+
+        Returns:
+            Cleaned reply, or None if the call failed or timed out
+        """
+        start = time.perf_counter()
+        call = asyncio.ensure_future(asyncio.wait_for(self._complete_async(prompt.text), timeout))
+        reported = False
+        try:
+            done, _ = await asyncio.wait({call}, timeout=self.breaker.slow_seconds)
+            if not done:
+                # A call over the latency budget counts against the breaker
+                # right away, not only once it finishes or times out
+                self.breaker.record(time.perf_counter() - start, True)
+                reported = True
+            text = await call
+        except asyncio.TimeoutError:
+            self.llm_timeouts += 1
+            print(f"LLM reply timed out after {timeout}s, using fallback")
+        except Exception as e:
+            self.llm_errors += 1
+            print(f"Error generating reply: {str(e)}")
         else:
-            if any(word in msg_lower for word in ["done", "received", "got", "confirm", "proceed"]):
-                return "What happens now? When will I get the money?"
-            elif any(word in msg_lower for word in ["enter", "input", "type", "provide"]):
-                return "Okay, I'm ready. What should I enter?"
-            elif any(word in msg_lower for word in ["wait", "process", "loading", "please"]):
-                return "How long will this take?"
+            seconds = time.perf_counter() - start
+            if not reported:
+                self.breaker.record(seconds, True)
+            self.prompt_builder.record(prompt, seconds)
+            return self._store_reply(cache_key, self._clean_reply(text))
+        finally:
+            call.cancel()  # only still pending if this reply was cancelled
+        if not reported:
+            self.breaker.record(time.perf_counter() - start, False)
+        self.prompt_builder.record(prompt, None)
+        return None
+
+    async def stream_reply_async(self,
+                                 current_message: Union[str, MessageAnalysis],
+                                 conversation_history: List[Dict] = None,
+                                 language: Optional[str] = None,
+                                 timeout: Optional[float] = None,
+                                 session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Generate a reply piece by piece as the model streams it
+
+        Same slots, deadline, cache and fallback as generate_reply_async; the
+        pieces joined are the reply it would return. Cached and fallback
+        replies arrive as a single piece, as do replies from clients without
+        async streaming. A stream cut off by the deadline or an error ends
+        with what was already sent (or the fallback if nothing was).
+
+        Args:
+            current_message: The latest message from scammer (text or its analysis)
+            conversation_history: Previous messages in conversation
+            language: Preferred reply language
+            timeout: Override for the per-reply deadline in seconds
+            session_id: Session whose rolling prompt summary to reuse
+
+        Yields:
+            Reply text pieces
+        """
+        if conversation_history is None:
+            conversation_history = []
+        analysis = analyze(current_message)
+
+        if not self.has_api:
+            yield self._get_smart_fallback(analysis, conversation_history)
+            return
+
+        cache_key, cached = self._cached_reply(analysis, conversation_history, language)
+        if cached is not None:
+            yield cached
+            return
+
+        if not self.breaker.allow():
+            yield self._get_smart_fallback(analysis, conversation_history)
+            return
+
+        prompt = self._build_prompt(analysis, conversation_history, session_id)
+        start = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + (timeout or self.timeout)
+        raw = ""
+        sent = 0  # characters of the cleaned reply already yielded
+        complete = False
+        try:
+            async with aclosing(self._stream_async(prompt.text, deadline)) as pieces:
+                async for piece in pieces:
+                    raw += piece
+                    # Hold the start back until a speaker label can be recognized
+                    if len(raw.lstrip()) < 4:
+                        continue
+                    reply = self._strip_label(raw)
+                    if len(reply) > sent:
+                        yield reply[sent:]
+                        sent = len(reply)
+            complete = True
+        except asyncio.TimeoutError:
+            self.llm_timeouts += 1
+            print(f"LLM reply timed out after {timeout or self.timeout}s, using what was streamed")
+        except Exception as e:
+            self.llm_errors += 1
+            print(f"Error streaming reply: {str(e)}")
+
+        self.breaker.record(time.perf_counter() - start, complete)
+        self.prompt_builder.record(prompt, time.perf_counter() - start if complete else None)
+        reply = self._strip_label(raw)
+        if not complete:
+            reply = reply[:sent]  # what the caller has already seen stands
+        if len(reply) > sent:
+            yield reply[sent:]
+        elif not reply:
+            yield self._clean_reply("") if complete else self._get_smart_fallback(analysis, conversation_history)
+        if complete and reply:
+            self._store_reply(cache_key, reply)
+
+    async def _stream_async(self, prompt: str, deadline: float) -> AsyncIterator[str]:
+        """Stream one LLM call's raw text pieces in a concurrency slot, until the deadline"""
+        loop = asyncio.get_running_loop()
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is None:
+            # Blocking clients cannot stream to the event loop: one piece
+            yield await asyncio.wait_for(self._complete_async(prompt), max(0.0, deadline - loop.time()))
+            return
+
+        semaphore = self._llm_semaphore()
+        await asyncio.wait_for(semaphore.acquire(), max(0.0, deadline - loop.time()))
+        self.llm_calls += 1
+        self.in_flight += 1
+        try:
+            response = await asyncio.wait_for(
+                generate_async(prompt, generation_config=self._generation_config(), stream=True),
+                max(0.0, deadline - loop.time())
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    return
+                yield chunk.text
+        finally:
+            # Streams are abandoned, not shielded, at the deadline, so the
+            # slot is free as soon as this generator is closed
+            self.in_flight -= 1
+            semaphore.release()
+
+    def _llm_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency slots for LLM calls on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _complete_async(self, prompt: str) -> str:
+        """Complete one prompt, through the coalescer when batching is enabled"""
+        if self.coalescer.enabled:
+            return await self.coalescer.submit(prompt)
+        return await self._complete_one_async(prompt)
+
+    async def _complete_batch_async(self, prompts: List[str]) -> List[Union[str, BaseException]]:
+        """
+        Complete a batch of prompts from the coalescer
+
+        Models with a batch call (generate_content_batch_async) get the whole
+        batch in one request and one concurrency slot. Others get the prompts
+        as concurrent single calls, sent together.
+
+        Args:
+            prompts: Distinct prompts
+
+        Returns:
+            Raw text or the exception, per prompt
+        """
+        generate_batch = getattr(self.model, "generate_content_batch_async", None)
+        if generate_batch is None or len(prompts) == 1:
+            return await asyncio.gather(*(self._complete_one_async(prompt) for prompt in prompts),
+                                        return_exceptions=True)
+
+        semaphore = self._llm_semaphore()
+        async with semaphore:
+            self.llm_calls += 1
+            self.in_flight += 1
+            try:
+                responses = await generate_batch(prompts, generation_config=self._generation_config())
+            finally:
+                self.in_flight -= 1
+        return [response if isinstance(response, (str, BaseException)) else response.text for response in responses]
+
+    async def _complete_one_async(self, prompt: str) -> str:
+        """Run one LLM call in a concurrency slot, returning its raw text"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._llm_semaphore()
+
+        await semaphore.acquire()
+        self.llm_calls += 1
+        self.in_flight += 1
+        try:
+            generate_async = getattr(self.model, "generate_content_async", None)
+            if generate_async is not None:
+                call = asyncio.ensure_future(generate_async(prompt, generation_config=self._generation_config()))
             else:
-                return "Alright, I understand. Then what?"
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+                call = loop.run_in_executor(self._executor, self._generate_text, prompt)
+        except BaseException:
+            self.in_flight -= 1
+            semaphore.release()
+            raise
+
+        def release(_):
+            # A call abandoned at its deadline keeps its slot until it ends,
+            # so the model never sees more than max_concurrency calls
+            self.in_flight -= 1
+            semaphore.release()
+        call.add_done_callback(release)
+
+        response = await asyncio.shield(call)
+        return response if isinstance(response, str) else response.text
+
+    def _cached_reply(self,
+                      analysis: MessageAnalysis,
+                      conversation_history: List[Dict],
+                      language: Optional[str]) -> Tuple[Optional[ReplyKey], Optional[str]]:
+        """Look up a stored model reply for this stage, language and intent"""
+        if not self.reply_cache.enabled:
+            return None, None
+        key = self.reply_cache.key(analysis, len(conversation_history), self._resolve_language(analysis, language))
+        return key, self.reply_cache.get(key)
+
+    def _store_reply(self, key: Optional[ReplyKey], reply: str) -> str:
+        """Offer a fresh model reply to the reply cache, returning it"""
+        if key is not None:
+            self.reply_cache.put(key, reply)
+        return reply
+
+    def _generate_text(self, prompt: str) -> str:
+        """Blocking LLM call (runs on the executor)"""
+        return self.model.generate_content(prompt, generation_config=self._generation_config()).text
+
+    def _generation_config(self):
+        """Sampling settings for the model"""
+        return dict(temperature=self.temperature, max_output_tokens=100, top_p=0.95)
+
+    def _build_prompt(self,
+                      analysis: MessageAnalysis,
+                      conversation_history: List[Dict],
+                      session_id: Optional[str] = None) -> BuiltPrompt:
+        """Build the LLM prompt within the token budget (recent turns verbatim, older ones summarized)"""
+        return self.prompt_builder.build(self.system_prompt, analysis, conversation_history, session_id)
+
+    @classmethod
+    def _clean_reply(cls, text: str) -> str:
+        """Strip speaker labels from a model reply"""
+        reply = cls._strip_label(text)
+        return reply if reply else "That sounds suspicious... Can you explain more?"
+
+    @staticmethod
+    def _strip_label(text: str) -> str:
+        """Model text without surrounding whitespace or a leading speaker label"""
+        reply = text.strip()
         
-        return "Okay, I'm listening. Tell me more."
+        # Clean up if needed
+        if reply.startswith("You:") or reply.startswith("Me:"):
+            reply = reply.split(":", 1)[1].strip()
+        
+        return reply
+
+    def stats(self) -> Dict:
+        """Snapshot of async LLM call counters"""
+        return {
+            "has_api": self.has_api,
+            "connected": self.connected,
+            "backend": getattr(self.model, "name", type(self.model).__name__) if self.model else None,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "calls": self.llm_calls,
+            "timeouts": self.llm_timeouts,
+            "errors": self.llm_errors,
+            "hedge_seconds": self.hedge_seconds,
+            "hedged": self.llm_hedged,
+            "breaker": self.breaker.stats(),
+            "reply_cache": self.reply_cache.stats(),
+            "batching": self.coalescer.stats(),
+            "prompt": self.prompt_builder.stats()
+        }
+
+    def _get_smart_fallback(self, message: Union[str, MessageAnalysis], history: List[Dict]) -> str:
+        """Generate contextual fallback responses based on message content and conversation stage."""
+        return self.intent_router.route(message, len(history)).reply
     
     def should_continue_conversation(self, 
-                                     message: str, 
+                                     message: Union[str, MessageAnalysis], 
                                      message_count: int) -> bool:
         """
         Determine if conversation should continue
         
         Args:
-            message: Latest message
+            message: Latest message (text or its analysis)
             message_count: Total messages exchanged
             
         Returns:
             bool - whether to continue
         """
-        # Continue if message count is reasonable
-        if message_count >= 10:  # Limit conversations to 10+ messages max
-            return False
-        
-        # Continue if message contains actionable info requests
-        continue_keywords = ["upi", "account", "bank", "card", "otp", "password", "verify"]
-        if any(keyword in message.lower() for keyword in continue_keywords):
-            return True
-        
-        # Continue for 3-5 messages minimum for intelligence gathering
-        if message_count < 3:
-            return True
-        
-        return True  # Default: continue
+        return self.intent_router.should_continue(message, message_count)
 
 
-# Singleton instance
+# Singleton instance; its backend is created by the API's startup warmup, or
+# on first use of the functions below
 try:
-    agent = ScamEngagementAgent()
+    agent = ScamEngagementAgent(connect=False)
     print("✓ Agent instance created successfully")
 except Exception as e:
     print(f"✗ Error creating agent instance: {e}")
     agent = None
 
 
-def generate_agent_reply(current_message: str,
+# Background connect started by an async reply (kept so it is not garbage collected)
+_connect_task: Optional["asyncio.Task"] = None
+
+
+def _connect_quietly():
+    try:
+        agent.connect()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not create the LLM backend: {e}")
+
+
+def _ensure_connected():
+    """Create the singleton's backend unless that is done or already under way (a
+    reply during a startup warmup uses the fallback rather than waiting for it)"""
+    if not (agent.connected or agent.connecting):
+        _connect_quietly()
+
+
+def _ensure_connected_async():
+    """Like _ensure_connected, but the backend is created in a worker thread so
+    the event loop never imports a client library; this reply uses the fallback"""
+    global _connect_task
+    if not (agent.connected or agent.connecting):
+        agent.connecting = True
+        _connect_task = asyncio.get_running_loop().create_task(asyncio.to_thread(_connect_quietly))
+
+
+def generate_agent_reply(current_message: Union[str, MessageAnalysis],
                         conversation_history: List[Dict] = None,
-                        language: Optional[str] = None) -> str:
+                        language: Optional[str] = None,
+                        session_id: Optional[str] = None) -> str:
     """Convenience function to generate reply"""
     if agent is None:
         print("ERROR: Agent instance not available!")
         return "I'm not able to respond right now. Please try again."
     
+    _ensure_connected()
     try:
-        reply = agent.generate_reply(current_message, conversation_history, language)
+        reply = agent.generate_reply(current_message, conversation_history, language, session_id)
         if not reply:
-            print(f"WARNING: Agent returned empty reply for message: {current_message[:50]}")
+            print(f"WARNING: Agent returned empty reply for message: {analyze(current_message).text[:50]}")
             return "Sorry, I couldn't generate a response. Can you repeat that?"
         return reply
     except Exception as e:
@@ -252,6 +642,64 @@ def generate_agent_reply(current_message: str,
         return "I'm having trouble responding. Please try again."
 
 
+async def generate_agent_reply_async(current_message: Union[str, MessageAnalysis],
+                                     conversation_history: List[Dict] = None,
+                                     language: Optional[str] = None,
+                                     session_id: Optional[str] = None) -> str:
+    """Convenience function to generate a reply without blocking the event loop"""
+    if agent is None:
+        print("ERROR: Agent instance not available!")
+        return "I'm not able to respond right now. Please try again."
+    
+    _ensure_connected_async()
+    try:
+        reply = await agent.generate_reply_async(current_message, conversation_history, language, session_id=session_id)
+        if not reply:
+            print(f"WARNING: Agent returned empty reply for message: {analyze(current_message).text[:50]}")
+            return "Sorry, I couldn't generate a response. Can you repeat that?"
+        return reply
+    except Exception as e:
+        print(f"ERROR in generate_agent_reply_async: {e}")
+        import traceback
+        traceback.print_exc()
+        return "I'm having trouble responding. Please try again."
+
+
+async def stream_agent_reply_async(current_message: Union[str, MessageAnalysis],
+                                   conversation_history: List[Dict] = None,
+                                   language: Optional[str] = None,
+                                   session_id: Optional[str] = None,
+                                   on_piece: Callable[[str], None] = None) -> str:
+    """Convenience function to generate a reply, passing each streamed piece to on_piece
+
+    Returns the whole reply; the pieces passed to on_piece add up to it.
+    """
+    sent = []
+
+    def emit(piece: str):
+        sent.append(piece)
+        if on_piece is not None:
+            on_piece(piece)
+
+    if agent is None:
+        print("ERROR: Agent instance not available!")
+        emit("I'm not able to respond right now. Please try again.")
+        return "".join(sent)
+    
+    _ensure_connected_async()
+    try:
+        async for piece in agent.stream_reply_async(current_message, conversation_history, language,
+                                                    session_id=session_id):
+            emit(piece)
+    except Exception as e:
+        print(f"ERROR in stream_agent_reply_async: {e}")
+        import traceback
+        traceback.print_exc()
+        if not sent:
+            emit("I'm having trouble responding. Please try again.")
+    return "".join(sent)
+
+
 def should_continue(message: str, message_count: int) -> bool:
     """Convenience function to check if conversation should continue"""
     return agent.should_continue_conversation(message, message_count)
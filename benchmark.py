@@ -0,0 +1,1259 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks - Micro and load benchmarks for the honeypot pipeline
+Run `python benchmark.py <name>`; `python benchmark.py --help` lists them.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+SAMPLE_MESSAGES = [
+    "Your SBI account will be blocked within 24 hours. Update KYC now.",
+    "Urgent: Your UPI service is blocked. Share your UPI PIN to restore.",
+    "ICICI Bank: KYC expired. Click link to update immediately.",
+    "Congratulations! You won Rs 50000 cashback from PhonePe.",
+    "Your bank account will be frozen for non-compliance. Call: 9876543210",
+    "Work from home: Earn Rs 50000/month. Registration fee Rs 2000.",
+    "Your package is stuck at customs. Pay clearance fee Rs 500.",
+    "Hi, can we schedule a meeting tomorrow at 3 PM?",
+    "Thanks for your help! I really appreciate it.",
+    "The presentation looks good. Let's finalize it by Friday.",
+]
+
+
+def _timeit(func: Callable, repeat: int) -> float:
+    """Best-of-3 wall time in seconds for `repeat` calls of func"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _synthetic_lexicon(size: int, seed: int = 7) -> List[str]:
+    """Generate pronounceable fake keywords to grow the lexicon"""
+    rnd = random.Random(seed)
+    syllables = ["ka", "ro", "mi", "tu", "pe", "sa", "li", "no", "vu", "de", "ja", "qo"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def bench_keywords(args):
+    """Naive per-keyword substring scans vs the Aho-Corasick automaton"""
+    from keyword_engine import KeywordAutomaton
+    from scam_detector import ScamDetector
+
+    base = dict(ScamDetector().scam_keywords)
+    messages = [m.lower() for m in SAMPLE_MESSAGES]
+
+    print("\n" + "=" * 80)
+    print("  KEYWORD ENGINE: substring scans vs Aho-Corasick automaton")
+    print("=" * 80)
+    print(f"{'lexicon':>8} {'states':>8} {'naive us/msg':>14} {'automaton us/msg':>18} {'speedup':>9}")
+
+    for size in args.sizes:
+        lexicon = dict(base)
+        for word in _synthetic_lexicon(max(0, size - len(base))):
+            lexicon[word] = 1.0
+        automaton = KeywordAutomaton(lexicon)
+
+        def naive():
+            for text in messages:
+                [k for k in lexicon if k in text]
+
+        def compiled():
+            for text in messages:
+                automaton.matched_indices(text)
+
+        n = args.repeat
+        naive_us = _timeit(naive, n) / (n * len(messages)) * 1e6
+        compiled_us = _timeit(compiled, n) / (n * len(messages)) * 1e6
+        print(f"{len(lexicon):>8} {automaton.state_count:>8} {naive_us:>14.1f} {compiled_us:>18.1f} {naive_us / compiled_us:>8.1f}x")
+    print()
+
+
+def _unique_messages(count: int, seed: int = 11) -> List[str]:
+    """Distinct messages so per-text memoization does not flatter the numbers"""
+    rnd = random.Random(seed)
+    return [f"{rnd.choice(SAMPLE_MESSAGES)} Ref {rnd.randint(0, 10**9)}" for _ in range(count)]
+
+
+def bench_batch(args):
+    """Per-message detect() vs detect_batch() throughput"""
+    from scam_detector import ScamDetector
+
+    detector = ScamDetector()
+    print("\n" + "=" * 80)
+    print("  BATCH DETECTION: detect() loop vs detect_batch()")
+    print("=" * 80)
+    print(f"(campaign batches repeat each distinct text {args.repeats}x)")
+    print(f"{'batch':>8} {'loop msg/s':>14} {'batch msg/s':>14} {'campaign msg/s':>16}")
+
+    for size in args.sizes:
+        loop_messages = _unique_messages(size, seed=size)
+        batch_messages = _unique_messages(size, seed=size + 1)
+        campaign = _unique_messages(max(1, size // args.repeats), seed=size + 2) * args.repeats
+
+        start = time.perf_counter()
+        for message in loop_messages:
+            detector.detect(message)
+        loop_rate = size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        detector.detect_batch(batch_messages)
+        batch_rate = size / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        detector.detect_batch(campaign)
+        campaign_rate = len(campaign) / (time.perf_counter() - start)
+
+        print(f"{size:>8} {loop_rate:>14,.0f} {batch_rate:>14,.0f} {campaign_rate:>16,.0f}")
+    print()
+
+
+def bench_cache(args):
+    """Verdict cache on campaign traffic (templates with varying digits/links)"""
+    from cache import LRUCache
+    import scam_detector
+
+    rnd = random.Random(5)
+    templates = [m.replace("50000", "{amount}").replace("9876543210", "{phone}") + " Ref {ref}"
+                 for m in SAMPLE_MESSAGES]
+    traffic = [
+        rnd.choice(templates).format(amount=rnd.randint(100, 99999), phone=rnd.randint(6 * 10**9, 10**10 - 1),
+                                     ref=rnd.randint(0, 10**6))
+        for _ in range(args.messages)
+    ]
+
+    scam_detector.verdict_cache = LRUCache(args.capacity, ttl=scam_detector.VERDICT_CACHE_TTL)
+    detector = scam_detector.detector
+
+    start = time.perf_counter()
+    exact = [detector.detect(message) for message in traffic]
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    served = [scam_detector.detect_scam(message) for message in traffic]
+    cached = time.perf_counter() - start
+
+    disagreements = sum(1 for a, b in zip(exact, served) if a["is_scam"] != b["is_scam"])
+
+    stats = scam_detector.verdict_cache.stats()
+    print("\n" + "=" * 80)
+    print("  VERDICT CACHE: campaign traffic")
+    print("=" * 80)
+    print(f"  messages: {len(traffic):,}   templates: {len(templates)}   capacity: {args.capacity}")
+    print(f"  detect():       {uncached / len(traffic) * 1e6:8.1f} us/msg")
+    print(f"  detect_scam():  {cached / len(traffic) * 1e6:8.1f} us/msg  ({uncached / cached:.1f}x)")
+    print(f"  hits: {stats['hits']:,}  misses: {stats['misses']:,}  evictions: {stats['evictions']:,}  "
+          f"hit rate: {stats['hit_rate']:.1%}")
+    print(f"  is_scam disagreements with detect(): {disagreements}\n")
+
+
+def bench_classifier(args):
+    """Keyword detector vs hashed-feature linear classifier batch throughput"""
+    from classifier import HashingVectorizer, LinearScamClassifier
+    from scam_detector import ScamDetector
+
+    detector = ScamDetector()
+    # Train on keyword-detector labels: only throughput is measured here
+    train = _unique_messages(2000, seed=3)
+    model = LinearScamClassifier(HashingVectorizer(2 ** 18, 2))
+    model.fit(train, [int(detector.detect(m)["is_scam"]) for m in train], epochs=50)
+
+    print("\n" + "=" * 80)
+    print("  CLASSIFIER: keyword detect() / detect_batch() vs linear detect_batch()")
+    print("=" * 80)
+    print(f"{'batch':>8} {'keyword loop/s':>16} {'keyword batch/s':>17} {'linear batch/s':>16}")
+
+    for size in args.sizes:
+        messages = _unique_messages(size, seed=size)
+        rates = []
+        for run in (lambda: [detector.detect(m) for m in messages],
+                    lambda: detector.detect_batch(messages),
+                    lambda: model.detect_batch(messages)):
+            start = time.perf_counter()
+            run()
+            rates.append(size / (time.perf_counter() - start))
+        print(f"{size:>8} {rates[0]:>16,.0f} {rates[1]:>17,.0f} {rates[2]:>16,.0f}")
+    print()
+
+
+def bench_templates(args):
+    """Full detect + extract per turn vs the near-duplicate template fast path"""
+    from extractor import IntelligenceExtractor
+    from scam_detector import ScamDetector
+    from template_index import TemplateIndex
+
+    rnd = random.Random(9)
+    fillers = ["", " please", " now", " asap", " sir"]
+    templates = [m.replace("50000", "{amount}").replace("9876543210", "{phone}") + "{filler}"
+                 for m in SAMPLE_MESSAGES[:7]]
+    sessions = [
+        [rnd.choice(templates).format(amount=rnd.randint(100, 99999), phone=rnd.randint(6 * 10**9, 10**10 - 1),
+                                      filler=rnd.choice(fillers))
+         for _ in range(args.turns)]
+        for _ in range(args.sessions)
+    ]
+    turns = args.sessions * args.turns
+
+    def full_path():
+        verdicts = []
+        for number, session in enumerate(sessions):
+            history = []
+            for message in session:
+                verdicts.append(detector.detect(message))
+                history.append({"text": message})
+                extractor.extract_incremental(f"full-{number}", history)
+        return verdicts
+
+    def fast_path():
+        verdicts = []
+        for number, session in enumerate(sessions):
+            history = []
+            for message in session:
+                history.append({"text": message})
+                template = index.add(message)
+                if template is not None and template.shape is not None and "keyword" in template.verdicts:
+                    verdicts.append(template.verdicts["keyword"])
+                    extractor.extract_incremental(f"fast-{number}", history, {message: template.shape})
+                    continue
+                verdict = detector.detect(message)
+                verdicts.append(verdict)
+                extractor.extract_incremental(f"fast-{number}", history)
+                if template is not None:
+                    template.verdicts["keyword"] = verdict
+                    shape = extractor.extract_from_message(message)
+                    template.shape = {"suspiciousKeywords": shape["suspiciousKeywords"],
+                                      "tactics_used": shape["tactics_used"]}
+        return verdicts
+
+    detector = ScamDetector()
+    extractor = IntelligenceExtractor()
+    index = TemplateIndex()
+
+    start = time.perf_counter()
+    exact = full_path()
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    served = fast_path()
+    fast = time.perf_counter() - start
+
+    disagreements = sum(1 for a, b in zip(exact, served) if a["is_scam"] != b["is_scam"])
+    stats = index.stats()
+    print("\n" + "=" * 80)
+    print("  TEMPLATE INDEX: campaign sessions, full pipeline vs near-duplicate fast path")
+    print("=" * 80)
+    print(f"  sessions: {args.sessions:,}   turns/session: {args.turns}   templates seen: {stats['templates']}")
+    print(f"  full path:  {full / turns * 1e6:8.1f} us/turn")
+    print(f"  fast path:  {fast / turns * 1e6:8.1f} us/turn  ({full / fast:.1f}x)")
+    print(f"  near-duplicate rate: {stats['near_duplicate_rate']:.1%}   campaigns: {stats['campaigns']}")
+    print(f"  is_scam disagreements with detect(): {disagreements}\n")
+
+
+def bench_extract(args):
+    """Per-turn cost of full-history vs incremental intelligence extraction"""
+    from extractor import IntelligenceExtractor
+
+    rnd = random.Random(13)
+    print("\n" + "=" * 80)
+    print("  EXTRACTION: extract_intelligence(full history) vs extract_incremental()")
+    print("=" * 80)
+    print(f"{'turns':>8} {'full us/turn':>14} {'incremental us/turn':>21} {'speedup':>9}")
+
+    for turns in args.turns:
+        conversation = _unique_messages(turns, seed=turns)
+        rates = []
+        for incremental in (False, True):
+            extractor = IntelligenceExtractor()
+            history = []
+            start = time.perf_counter()
+            for message in conversation:
+                history.append({"sender": "scammer", "text": message})
+                if incremental:
+                    extractor.extract_incremental("bench", history)
+                else:
+                    extractor.extract_intelligence(history)
+            rates.append((time.perf_counter() - start) / turns * 1e6)
+        print(f"{turns:>8} {rates[0]:>14.1f} {rates[1]:>21.1f} {rates[0] / rates[1]:>8.1f}x")
+    print()
+
+
+def bench_writes(args):
+    """SQLite rows and callback bytes per session: cumulative vs delta writes"""
+    import json
+    from db import intelligence_rows
+    from extractor import IntelligenceExtractor
+    from memory import SessionMemory
+
+    rnd = random.Random(17)
+    print("\n" + "=" * 80)
+    print("  INTELLIGENCE WRITES: every value every turn vs new values only")
+    print("=" * 80)
+    print(f"{'turns':>8} {'rows before':>12} {'rows after':>11} {'callback KB before':>19} {'callback KB after':>18}")
+
+    for turns in args.turns:
+        extractor = IntelligenceExtractor()
+        memory = SessionMemory()
+        session = memory.create_session("bench")
+        rows = [0, 0]
+        callback_bytes = [0, 0]
+        for turn in range(turns):
+            # Scammers repeat themselves; every few turns a new number or UPI ID appears
+            message = rnd.choice(SAMPLE_MESSAGES)
+            if turn % 4 == 0:
+                message += f" Call {rnd.randint(6 * 10**9, 10**10 - 1)} or pay to agent{turn}@ybl"
+            memory.add_message("bench", "scammer", message, "")
+            memory.add_message("bench", "user", "Okay, what should I do?", "")
+
+            extraction = extractor.extract_incremental("bench", memory.get_conversation_history("bench"))
+            new_intelligence = memory.update_intelligence("bench", extraction.delta)
+
+            for slot, intelligence in enumerate((session["extracted_intelligence"], new_intelligence)):
+                rows[slot] += len(intelligence_rows("bench", intelligence))
+                payload = {
+                    "sessionId": "bench",
+                    "scamDetected": True,
+                    "totalMessagesExchanged": session["message_count"],
+                    "extractedIntelligence": intelligence,
+                    "agentNotes": ""
+                }
+                callback_bytes[slot] += len(json.dumps(payload, ensure_ascii=True, indent=2))
+        print(f"{turns:>8} {rows[0]:>12,} {rows[1]:>11,} {callback_bytes[0] / 1024:>19,.1f} "
+              f"{callback_bytes[1] / 1024:>18,.1f}")
+    print()
+
+
+def bench_intel(args):
+    """Cross-session indicator lookup latency as the index grows"""
+    from indicator_index import IndicatorIndex
+
+    rnd = random.Random(23)
+    print("\n" + "=" * 80)
+    print("  INDICATOR INDEX: lookup latency by index size")
+    print("=" * 80)
+    print(f"{'indicators':>11} {'build s':>9} {'p50 us':>8} {'p99 us':>8} {'max us':>8}")
+
+    for size in args.indicators:
+        index = IndicatorIndex()
+        values = []
+        start = time.perf_counter()
+        for i in range(size):
+            session = f"session-{rnd.randrange(max(1, size // 3))}"
+            if i % 2:
+                value = f"+91 {6 * 10**9 + i:010d}"
+                index.record(session, "phoneNumbers", value, "2026-01-01T00:00:00")
+            else:
+                value = f"Scammer{i}@YBL"
+                index.record(session, "upiIds", value, "2026-01-01T00:00:00")
+            if i % max(1, size // 2000) == 0:
+                values.append(value)
+        build = time.perf_counter() - start
+
+        # Half hits (as typed by an analyst, before normalization), half misses
+        queries = values + [f"unknown{i}@paytm" for i in range(len(values))]
+        rnd.shuffle(queries)
+        samples = []
+        for _ in range(args.repeat):
+            for value in queries:
+                t0 = time.perf_counter()
+                index.lookup(value)
+                samples.append(time.perf_counter() - t0)
+        samples.sort()
+        p50 = samples[len(samples) // 2] * 1e6
+        p99 = samples[int(len(samples) * 0.99)] * 1e6
+        print(f"{len(index):>11,} {build:>9.1f} {p50:>8.1f} {p99:>8.1f} {samples[-1] * 1e6:>8.1f}")
+    print()
+
+
+def bench_knownbad(args):
+    """Known-bad feed build time, file size and check latency by feed size"""
+    import os
+    import tempfile
+    from known_bad import KnownBadFilter, build_feed
+
+    print("\n" + "=" * 80)
+    print("  KNOWN-BAD FEED: memory-mapped sorted hash array")
+    print("=" * 80)
+    print(f"{'entries':>11} {'build s':>9} {'file MB':>9} {'hit us':>8} {'miss us':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.entries:
+            path = os.path.join(directory, f"feed{size}.bin")
+            entries = ((("upi", f"fraud{i}@ybl") if i % 2 else ("phone", f"{6 * 10**9 + i}")) for i in range(size))
+            start = time.perf_counter()
+            build_feed(path, entries)
+            build = time.perf_counter() - start
+
+            feed = KnownBadFilter(path, poll_seconds=0)
+            hits = [f"fraud{i}@ybl" for i in range(1, size, 2 * max(1, size // 2000))]
+            misses = [f"clean{i}@ybl" for i in range(len(hits))]
+            n = args.repeat
+            hit_us = _timeit(lambda: [feed.contains("upiIds", v) for v in hits], n) / (n * len(hits)) * 1e6
+            miss_us = _timeit(lambda: [feed.contains("upiIds", v) for v in misses], n) / (n * len(misses)) * 1e6
+            assert all(feed.contains("upiIds", v) for v in hits)
+            print(f"{size:>11,} {build:>9.1f} {os.path.getsize(path) / 2**20:>9.1f} {hit_us:>8.2f} {miss_us:>8.2f}")
+    print()
+
+
+def bench_stream(args):
+    """Streaming extraction of a large SMS export vs one joined string"""
+    import os
+    import tempfile
+    import tracemalloc
+    from extractor import IntelligenceExtractor, read_chunks
+
+    extractor = IntelligenceExtractor()
+    rnd = random.Random(29)
+    print("\n" + "=" * 80)
+    print("  STREAMING EXTRACTION: whole file in memory vs chunked stream")
+    print("=" * 80)
+    print(f"{'file MB':>8} {'mode':>8} {'seconds':>9} {'MB/s':>8} {'peak MB':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in args.sizes:
+            path = os.path.join(directory, f"export{size_mb}.txt")
+            # An archive of 500 senders (indicators repeat, as in real exports)
+            senders = [f"+91{rnd.randint(6 * 10**9, 10**10 - 1)}" for _ in range(500)]
+            with open(path, "w", encoding="utf-8") as f:
+                written = 0
+                while written < size_mb * 2**20:
+                    line = f"{rnd.randint(1, 28)}/01/2026 {rnd.choice(senders)}: {rnd.choice(SAMPLE_MESSAGES)}"
+                    if rnd.random() < 0.05:
+                        line += f" Pay to agent{rnd.randint(1, 2000)}@ybl"
+                    written += f.write(line + "\n")
+
+            def whole():
+                with open(path, encoding="utf-8") as f:
+                    return extractor.extract_intelligence([{"text": f.read()}])
+
+            def streamed():
+                with open(path, encoding="utf-8") as f:
+                    return extractor.extract_stream(read_chunks(f, args.chunk_size))
+
+            for mode, func in (("whole", whole), ("stream", streamed)):
+                start = time.perf_counter()
+                func()
+                elapsed = time.perf_counter() - start
+                tracemalloc.start()
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{size_mb:>8} {mode:>8} {elapsed:>9.2f} {size_mb / elapsed:>8.1f} {peak / 2**20:>9.1f}")
+    print()
+
+
+def bench_llm(args):
+    """Concurrent sessions against a fake LLM: blocking vs async reply path"""
+    import asyncio
+    import tempfile
+    from agent import ScamEngagementAgent
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+
+    def make_agent(concurrency, async_client=True):
+        agent = ScamEngagementAgent()
+        agent.set_backend(FakeModel(latency=args.latency, async_client=async_client, seed=1))
+        agent.reply_cache = ReplyCache(capacity=0)  # every reply pays for a model call
+        agent.max_concurrency = concurrency
+        agent.timeout = args.timeout
+        return agent
+
+    async def run(reply):
+        start = time.perf_counter()
+        await asyncio.gather(*(reply(f"Your account {i} is blocked, share OTP") for i in range(args.sessions)))
+        return time.perf_counter() - start
+
+    print("\n" + "=" * 80)
+    print(f"  LLM REPLIES: {args.sessions} concurrent sessions, fake model latency {args.latency * 1000:.0f} ms")
+    print("=" * 80)
+    print(f"{'path':>28} {'slots':>6} {'seconds':>9} {'replies/s':>10} {'timeouts':>9}")
+
+    agent = make_agent(1)
+
+    async def blocking(message):
+        # What the handler did before: a synchronous call inside async def
+        return agent.generate_reply(message, [])
+    elapsed = asyncio.run(run(blocking))
+    print(f"{'blocking call in event loop':>28} {'-':>6} {elapsed:>9.2f} {args.sessions / elapsed:>10.1f} {'-':>9}")
+
+    for concurrency in args.concurrency:
+        for label, async_client in (("async client", True), ("thread pool", False)):
+            agent = make_agent(concurrency, async_client)
+            elapsed = asyncio.run(run(lambda message: agent.generate_reply_async(message, [])))
+            print(f"{label:>28} {concurrency:>6} {elapsed:>9.2f} {args.sessions / elapsed:>10.1f} {agent.llm_timeouts:>9}")
+
+    # End to end through the API
+    with tempfile.TemporaryDirectory() as directory:
+        main = _honeypot_app(directory, FakeModel(latency=args.latency, seed=1), max(args.concurrency), args.timeout)
+        main.engagement_agent.reply_cache = ReplyCache(capacity=0)
+        messages = [("Your account is blocked, share OTP", f"bench-{i}") for i in range(args.sessions)]
+        elapsed = asyncio.run(_post_turns(main.app, messages, concurrency=args.sessions))[0]
+        print(f"{'/api/honeypot (async)':>28} {max(args.concurrency):>6} {elapsed:>9.2f} "
+              f"{args.sessions / elapsed:>10.1f} {main.engagement_agent.llm_timeouts:>9}")
+    print()
+
+
+def bench_batching(args):
+    """Reply coalescing: throughput vs latency for batch sizes and wait windows against a fake LLM"""
+    import asyncio
+    from agent import ScamEngagementAgent
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+    from request_coalescer import RequestCoalescer
+
+    print("\n" + "=" * 80)
+    print(f"  BATCHING: {args.requests} replies, {args.slots} model slots, fake model latency "
+          f"{args.latency * 1000:.0f} ms (+{args.item_cost * 1000:.1f} ms per extra prompt in a batch)")
+    print("=" * 80)
+    print(f"{'sessions':>8} {'backend':>9} {'batch':>6} {'wait ms':>8} {'replies/s':>10} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'calls':>6} {'mean batch':>11} {'misrouted':>10}")
+    configs = [(None, 0.0)] + [(size, wait) for size in args.batch for wait in args.wait]
+    for sessions in args.sessions:
+        for batch_client in (True, False):
+            for max_batch, max_wait in configs:
+                if not batch_client and max_batch not in (None, max(args.batch)):
+                    continue
+                agent = ScamEngagementAgent()
+                agent.set_backend(FakeModel(latency=args.latency, seed=1, batch_client=batch_client,
+                                            batch_item_cost=args.item_cost, echo=True))
+                agent.reply_cache = ReplyCache(capacity=0)
+                agent.max_concurrency = args.slots
+                agent.timeout = 60
+                agent.coalescer = RequestCoalescer(agent._complete_batch_async, max_batch or 1, max_wait)
+                messages = [f"Your account {i} is blocked, share OTP" for i in range(args.requests)]
+                latencies = []
+                misrouted = 0
+
+                async def run():
+                    nonlocal misrouted
+                    gate = asyncio.Semaphore(sessions)
+
+                    async def reply(message):
+                        nonlocal misrouted
+                        async with gate:
+                            start = time.perf_counter()
+                            text = await agent.generate_reply_async(message, [])
+                            latencies.append(time.perf_counter() - start)
+                            misrouted += text != f"You said: {message}"
+
+                    start = time.perf_counter()
+                    await asyncio.gather(*(reply(message) for message in messages))
+                    return time.perf_counter() - start
+
+                elapsed = asyncio.run(run())
+                latencies.sort()
+                stats = agent.coalescer.stats()
+                print(f"{sessions:>8} {'batch' if batch_client else 'single':>9} "
+                      f"{max_batch or '-':>6} {max_wait if max_batch else '-':>8} {args.requests / elapsed:>10.1f} "
+                      f"{latencies[len(latencies) // 2] * 1000:>8.1f} {latencies[int(len(latencies) * 0.95)] * 1000:>8.1f} "
+                      f"{agent.model.calls:>6} {stats['mean_batch'] or 1:>11} {misrouted:>10}")
+    print("  (backend: batch = one request per batch; single = model without a batch call, prompts sent together)")
+    print()
+
+
+def bench_breaker(args):
+    """Reply latency while the model slows down: no breaker vs circuit breaker vs breaker + hedging"""
+    import asyncio
+    from agent import ScamEngagementAgent
+    from circuit_breaker import CircuitBreaker
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+
+    phase = args.duration / 3
+    print("\n" + "=" * 80)
+    print(f"  BREAKER: a reply every {args.interval * 1000:.0f} ms for {args.duration:.0f} s; the model takes "
+          f"{args.latency * 1000:.0f} ms, then {args.slow_latency * 1000:.0f} ms from {phase:.0f} s to {2 * phase:.0f} s")
+    print(f"  (deadline {args.timeout:.1f} s, slow from {args.slow_seconds:.1f} s, cooldown {args.cooldown:.1f} s; "
+          f"waited out = replies that took the whole deadline)")
+    print("=" * 80)
+    print(f"{'setup':>18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'model calls':>12} "
+          f"{'fallbacks':>10} {'waited out':>11} {'trips':>6}")
+    never = float("inf")
+    for label, trips, hedge in (("no breaker", False, 0.0), ("breaker", True, 0.0),
+                                ("breaker + hedge", True, args.hedge)):
+        agent = ScamEngagementAgent()
+        model = FakeModel(latency=args.latency, seed=1)
+        agent.set_backend(model)
+        agent.reply_cache = ReplyCache(capacity=0)
+        agent.max_concurrency = 1000
+        agent.timeout = args.timeout
+        agent.hedge_seconds = hedge
+        agent.breaker = CircuitBreaker(error_rate=None if trips else never, slow_rate=None if trips else never,
+                                       slow_seconds=args.slow_seconds, cooldown=args.cooldown)
+        latencies = []
+        fallbacks = 0
+
+        async def reply(message):
+            nonlocal fallbacks
+            start = time.perf_counter()
+            text = await agent.generate_reply_async(message, [])
+            latencies.append(time.perf_counter() - start)
+            fallbacks += text not in FakeModel.REPLIES
+
+        async def run():
+            tasks = []
+            started = time.perf_counter()
+            for i in range(int(args.duration / args.interval)):
+                elapsed = time.perf_counter() - started
+                model.latency = args.slow_latency if phase <= elapsed < 2 * phase else args.latency
+                tasks.append(asyncio.ensure_future(reply(f"Your account {i} is blocked, share OTP")))
+                await asyncio.sleep(max(0.0, (i + 1) * args.interval - (time.perf_counter() - started)))
+            await asyncio.gather(*tasks)
+            await asyncio.gather(*agent._hedged_calls)
+
+        asyncio.run(run())
+        latencies.sort()
+        n = len(latencies)
+        print(f"{label:>18} {latencies[n // 2] * 1000:>8.0f} {latencies[int(n * 0.95)] * 1000:>8.0f} "
+              f"{latencies[int(n * 0.99)] * 1000:>8.0f} {latencies[-1] * 1000:>8.0f} {model.calls:>12} "
+              f"{fallbacks:>10} {sum(1 for s in latencies if s >= args.timeout):>11} {agent.breaker.trips:>6}")
+    print()
+
+
+def _honeypot_app(directory: str, model, concurrency: int = 8, timeout: float = 8.0):
+    """Import the API with its SQLite database, logs and callback file in directory and a fake model"""
+    import os
+    os.environ["SQLITE_DB_PATH"] = os.path.join(directory, "bench.db")
+    import callback
+    import db
+    import logger
+    db.DB_PATH = os.environ["SQLITE_DB_PATH"]
+    db.init_db()
+    logger.LOG_PATH = os.path.join(directory, "events.csv")
+    callback.callback_handler.output_file = os.path.join(directory, "callbacks.txt")
+    import main
+    main.engagement_agent.set_backend(model)
+    main.engagement_agent.max_concurrency = concurrency
+    main.engagement_agent.timeout = timeout
+    return main
+
+
+async def _post_turns(app, turns, concurrency: int = 1):
+    """POST (text, session_id) turns to /api/honeypot, returning (seconds, per-request latencies)"""
+    import asyncio
+    import httpx
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def post(text, session_id):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await client.post("/api/honeypot", json={
+                    "sessionId": session_id,
+                    "message": {"sender": "scammer", "text": text, "timestamp": ""}
+                })
+                latencies.append(time.perf_counter() - start)
+                assert result.json()["status"] == "success"
+
+        start = time.perf_counter()
+        if concurrency == 1:
+            for text, session_id in turns:
+                await post(text, session_id)
+        else:
+            await asyncio.gather(*(post(text, session_id) for text, session_id in turns))
+        return time.perf_counter() - start, sorted(latencies)
+
+
+def bench_pipeline(args):
+    """Per-stage honeypot endpoint timings with a fake LLM: end-to-end vs the LLM call alone"""
+    import asyncio
+    import tempfile
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+
+    rng = random.Random(5)
+    turns = [
+        (f"{rng.choice(SAMPLE_MESSAGES)} Pay to refund{i}@ybl or call 98{rng.randint(10000000, 99999999)}",
+         f"pipeline-{i % args.sessions}")
+        for i in range(args.requests)
+    ]
+    print("\n" + "=" * 80)
+    print(f"  PIPELINE: {args.requests} sequential turns over {args.sessions} sessions, "
+          f"fake model latency {args.latency * 1000:.0f} ms")
+    print("=" * 80)
+    with tempfile.TemporaryDirectory() as directory:
+        main = _honeypot_app(directory, FakeModel(latency=args.latency, seed=1))
+        # Every turn pays for a model call
+        main.engagement_agent.reply_cache = ReplyCache(capacity=0)
+        main.pipeline_timings.clear()
+        asyncio.run(_post_turns(main.app, turns))
+        stats = main.pipeline_timings.stats()
+    print(f"{'stage':>10} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for stage in ("llm", "detect", "extract", "callback", "db_write", "llm_wait", "total"):
+        row = stats[stage]
+        print(f"{stage:>10} {row['mean_ms']:>9.2f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+    writes_per_turn = stats["db_write"]["count"] / args.requests
+    serial = sum(stats[stage]["mean_ms"] for stage in ("llm", "detect", "extract", "callback"))
+    serial += stats["db_write"]["mean_ms"] * writes_per_turn
+    print(f"\n  end-to-end mean {stats['total']['mean_ms']:.1f} ms vs LLM alone {stats['llm']['mean_ms']:.1f} ms "
+          f"(stages run back to back: {serial:.1f} ms)")
+    print()
+
+
+async def _asgi_post(app, path: str, payload: dict):
+    """POST JSON straight to an ASGI app, returning (seconds since the request, body chunk) per chunk sent"""
+    import asyncio
+    import json
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("bench", 1), "server": ("bench", 80)
+    }
+    chunks = []
+    received = False
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect until the response is complete
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter() - start, message["body"]))
+
+    await app(scope, receive, send)
+    return chunks
+
+
+def bench_sse(args):
+    """Time until the reply starts showing: JSON /api/honeypot vs streamed /api/honeypot/stream"""
+    import asyncio
+    import tempfile
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+
+    rng = random.Random(3)
+    texts = [f"{rng.choice(SAMPLE_MESSAGES)} Ref {i}" for i in range(args.requests)]
+    print("\n" + "=" * 80)
+    print(f"  STREAMING: {args.requests} turns, fake model {args.latency * 1000:.0f} ms per reply, "
+          f"first chunk after {args.first_token * 1000:.0f} ms")
+    print("=" * 80)
+    with tempfile.TemporaryDirectory() as directory:
+        main = _honeypot_app(directory, FakeModel(latency=args.latency, first_token=args.first_token, seed=1))
+        main.engagement_agent.reply_cache = ReplyCache(capacity=0)
+
+        async def run():
+            first, total = {"json": [], "sse": []}, {"json": [], "sse": []}
+            for i, text in enumerate(texts):
+                for mode, path in (("json", "/api/honeypot"), ("sse", "/api/honeypot/stream")):
+                    chunks = await _asgi_post(main.app, path, {
+                        "sessionId": f"sse-{mode}-{i % 10}",
+                        "message": {"sender": "scammer", "text": text, "timestamp": ""}
+                    })
+                    # The JSON reply shows with the whole body; a stream's with its first reply event
+                    shown = next((at for at, chunk in chunks if chunk.startswith(b"event: reply")), chunks[-1][0])
+                    first[mode].append(shown)
+                    total[mode].append(chunks[-1][0])
+            return first, total
+
+        first, total = asyncio.run(run())
+    print(f"{'endpoint':>22} {'reply shown p50 ms':>19} {'p95 ms':>8} {'complete p50 ms':>16}")
+    for mode, name in (("json", "/api/honeypot"), ("sse", "/api/honeypot/stream")):
+        shown, done = sorted(first[mode]), sorted(total[mode])
+        print(f"{name:>22} {shown[len(shown) // 2] * 1000:>19.1f} {shown[int(len(shown) * 0.95)] * 1000:>8.1f} "
+              f"{done[len(done) // 2] * 1000:>16.1f}")
+    print()
+
+
+def _fake_gemini_server(model):
+    """Serve model over the Gemini REST API on a free local port in a background thread, returning (server, base URL)"""
+    import socket
+    import threading
+    import uvicorn
+    from fake_llm import create_fake_gemini_app
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(create_fake_gemini_app(model), log_level="warning"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def bench_load(args):
+    """End-to-end load on /api/honeypot with the LLM behind a local fake Gemini server (HTTP)"""
+    import asyncio
+    import tempfile
+    import httpx
+    from circuit_breaker import CircuitBreaker
+    from fake_llm import FakeModel
+    from llm_backend import GeminiHTTPBackend
+    from reply_cache import ReplyCache
+
+    scenarios = [
+        ("healthy", dict()),
+        ("5% errors", dict(error_rate=0.05)),
+        ("slow tail", dict(slow_rate=0.1, slow_latency=args.slow_latency)),
+        ("outage", dict(error_rate=0.6)),
+    ]
+    # A few scam scripts shared by many sessions, as in a campaign
+    scripts = [SAMPLE_MESSAGES[offset:offset + args.turns] for offset in range(args.scripts)]
+    model = FakeModel(latency=args.latency, distribution="lognormal", sigma=args.sigma, seed=1)
+    server, base_url = _fake_gemini_server(model)
+
+    print("\n" + "=" * 110)
+    print(f"  LOAD: {args.sessions} concurrent sessions x {len(scripts[0])} turns over HTTP to a fake Gemini "
+          f"(lognormal median {args.latency * 1000:.0f} ms), {args.slots} LLM slots, {args.timeout:.0f}s deadline")
+    print("=" * 110)
+    print(f"{'scenario':>10} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'model calls':>12} {'HTTP errors':>12} {'fallbacks':>10} {'cache hits':>11} {'trips':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        main = _honeypot_app(directory, GeminiHTTPBackend(base_url=base_url), concurrency=args.slots,
+                             timeout=args.timeout)
+        agent = main.engagement_agent
+        for label, faults in scenarios:
+            model.error_rate = faults.get("error_rate", 0.0)
+            model.slow_rate = faults.get("slow_rate", 0.0)
+            model.slow_latency = faults.get("slow_latency", 0.0)
+            model.calls = model.errors = 0
+            agent.breaker = CircuitBreaker(slow_seconds=args.slow_seconds, cooldown=args.cooldown)
+            agent.reply_cache = ReplyCache()
+            agent.llm_calls = agent.llm_timeouts = agent.llm_errors = agent.llm_hedged = 0
+            latencies = []
+
+            async def session(client, number):
+                for text in scripts[number % len(scripts)]:
+                    start = time.perf_counter()
+                    result = await client.post("/api/honeypot", json={
+                        "sessionId": f"load-{label}-{number}",
+                        "message": {"sender": "scammer", "text": text, "timestamp": ""}
+                    })
+                    latencies.append(time.perf_counter() - start)
+                    assert result.json()["status"] == "success"
+
+            async def run():
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                    await asyncio.gather(*(session(client, number) for number in range(args.sessions)))
+                await asyncio.gather(*agent._hedged_calls)
+
+            start = time.perf_counter()
+            asyncio.run(run())
+            elapsed = time.perf_counter() - start
+            latencies.sort()
+            n = len(latencies)
+            fallbacks = agent.llm_timeouts + agent.llm_errors + agent.llm_hedged + agent.breaker.rejected
+            print(f"{label:>10} {n / elapsed:>7.1f} {latencies[n // 2] * 1000:>8.0f} "
+                  f"{latencies[int(n * 0.95)] * 1000:>8.0f} {latencies[int(n * 0.99)] * 1000:>8.0f} "
+                  f"{latencies[-1] * 1000:>8.0f} {model.calls:>12} {model.errors:>12} {fallbacks:>10} "
+                  f"{agent.reply_cache.hits:>11} {agent.breaker.trips:>6}")
+        main.drain_writes()  # before the database directory goes away
+    server.should_exit = True
+    print()
+
+
+def bench_replies(args):
+    """Campaign burst against a fake LLM: model calls and latency with/without the reply cache"""
+    import asyncio
+    from agent import ScamEngagementAgent
+    from fake_llm import FakeModel
+    from reply_cache import ReplyCache
+
+    scripts = [
+        "{greet} your SBI account {n} will be blocked today, share OTP {now}",
+        "{greet} your KYC is pending, update it at http://kyc-{n}.in {now}",
+        "{greet} you won cashback of Rs {n}, confirm your UPI ID {now}",
+        "{greet} send the OTP received on your mobile {now} to avoid suspension",
+        "{greet} pay Rs {n} processing fee to receive your refund {now}",
+        "{greet} this is the bank fraud team, tell me the account number {now}",
+    ]
+    greetings = ["Dear customer,", "Hello sir,", "Sir", "Dear", ""]
+    urgency = ["immediately", "now", "urgently please", "now please", "asap"]
+    rng = random.Random(7)
+    # (message, history length) pairs: sessions start at random points of a script
+    turns = [
+        (rng.choice(scripts).format(greet=rng.choice(greetings), n=rng.randint(10, 99999), now=rng.choice(urgency)),
+         rng.randint(0, 8))
+        for _ in range(args.messages)
+    ]
+
+    async def run(agent):
+        latencies = []
+        semaphore = asyncio.Semaphore(args.sessions)
+
+        async def reply(message, history_length):
+            async with semaphore:
+                start = time.perf_counter()
+                await agent.generate_reply_async(message, [{"sender": "scammer", "text": ""}] * history_length, "auto")
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(reply(message, history) for message, history in turns))
+        return time.perf_counter() - start, sorted(latencies)
+
+    print("\n" + "=" * 80)
+    print(f"  REPLY CACHE: {args.messages} scam turns from {len(scripts)} scripts, "
+          f"{args.sessions} concurrent, fake model latency {args.latency * 1000:.0f} ms")
+    print("=" * 80)
+    print(f"{'cache':>10} {'model calls':>12} {'p50 ms':>8} {'p95 ms':>8} {'seconds':>8} {'hit rate':>9} {'keys':>6}")
+    for variants in [None] + args.variants:
+        agent = ScamEngagementAgent()
+        agent.set_backend(FakeModel(latency=args.latency, seed=1))
+        agent.max_concurrency = args.sessions
+        agent.reply_cache = ReplyCache(capacity=0 if variants is None else 5000, variants=variants)
+        elapsed, latencies = asyncio.run(run(agent))
+        stats = agent.reply_cache.stats()
+        label = "off" if variants is None else f"{variants} var"
+        print(f"{label:>10} {agent.model.calls:>12} {latencies[len(latencies) // 2] * 1000:>8.1f} "
+              f"{latencies[int(len(latencies) * 0.95)] * 1000:>8.1f} {elapsed:>8.2f} "
+              f"{stats['hit_rate']:>9.1%} {stats['keys']:>6}")
+    print()
+
+
+def bench_fallback(args):
+    """Scripted fallback replies: compiled intent router vs per-rule substring scans"""
+    import json
+    from agent import agent
+    from intent_router import intent_router
+    from text_analysis import analyze
+
+    with open(intent_router.path, encoding="utf-8") as handle:
+        table = json.load(handle)
+
+    def chained(folded, turn_count):
+        # The previous implementation: one `any(word in text)` scan per rule
+        for stage in table["stages"]:
+            if stage["max_turns"] is None or turn_count <= stage["max_turns"]:
+                for rule in stage["rules"]:
+                    if any(word in folded for word in rule["keywords"]):
+                        return rule["reply"]
+                return stage["default"]
+
+    rng = random.Random(11)
+    print("\n" + "=" * 80)
+    print(f"  FALLBACK REPLIES: {args.repeat} messages per size, turn counts 0-9")
+    print("=" * 80)
+    print(f"{'chars':>8} {'chained us':>12} {'router us':>11} {'speedup':>8} {'+continue us':>13}")
+    for size in args.sizes:
+        messages = []
+        for _ in range(args.repeat):
+            text = (rng.choice(SAMPLE_MESSAGES) + " ") * (size // 60 + 1)
+            messages.append((analyze(text[:size]), rng.randint(0, 9)))
+        for analysis, turns in messages:
+            assert chained(analysis.folded, turns) == agent._get_smart_fallback(analysis, [{}] * turns)
+
+        chained_time = _timeit(lambda: [chained(a.folded, t) for a, t in messages], 1)
+        router_time = _timeit(lambda: [intent_router.route(a, t) for a, t in messages], 1)
+        both_time = _timeit(lambda: [(intent_router.route(a, t), intent_router.should_continue(a, t))
+                                     for a, t in messages], 1)
+        n = len(messages)
+        print(f"{size:>8} {chained_time / n * 1e6:>12.1f} {router_time / n * 1e6:>11.1f} "
+              f"{chained_time / router_time:>7.1f}x {both_time / n * 1e6:>13.1f}")
+    print()
+
+
+_STARTUP_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup():
+    await main.app.router.startup()
+    started = time.perf_counter()
+    await main.app.state.warmup
+    return started
+
+started = asyncio.run(startup())
+print(json.dumps({"import": imported - start, "startup": started - imported,
+                  "warmup": time.perf_counter() - started, "ready": time.perf_counter() - start}))
+"""
+
+
+def bench_startup(args):
+    """Cold start of the API in fresh interpreters: import time per module, startup, warmup, time to ready"""
+    import json
+    import os
+    import statistics
+    import subprocess
+    import sys
+    import tempfile
+    from collections import defaultdict
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    phases = defaultdict(list)
+    # (module, "import" or "startup") -> [(self seconds, cumulative seconds)] per run
+    modules = defaultdict(list)
+    for _ in range(args.runs):
+        # Run from an empty directory so startup creates its files there
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, PYTHONPATH=repo, SQLITE_DB_PATH=os.path.join(directory, "bench.db"))
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", _STARTUP_SCRIPT], cwd=directory,
+                                    env=env, capture_output=True, text=True, timeout=120)
+        if result.returncode:
+            raise RuntimeError(f"Startup failed:\n{result.stderr[-2000:]}")
+        for phase, seconds in json.loads(result.stdout.strip().splitlines()[-1]).items():
+            phases[phase].append(seconds)
+        # -X importtime lists a module after the modules it imported
+        children, after_main = [], False
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            sample = (name.strip(), int(own) / 1e6, int(cumulative) / 1e6)
+            if depth == 1:
+                children.append(sample)
+            elif depth == 0:
+                if sample[0] == "main":
+                    after_main = True
+                    for child, child_own, child_cumulative in children + [sample]:
+                        modules[(child, "import")].append((child_own, child_cumulative))
+                elif after_main:
+                    # Imported lazily, during startup or the warmup
+                    modules[(sample[0], "startup")].append(sample[1:])
+                children = []
+
+    print("\n" + "=" * 80)
+    print(f"  STARTUP: {args.runs} cold starts in fresh interpreters (medians, with -X importtime)")
+    print("=" * 80)
+    for phase, label in (("import", "import main"), ("startup", "startup handlers"),
+                         ("warmup", "background warmup"), ("ready", "time to ready")):
+        print(f"{label:>20} {statistics.median(phases[phase]) * 1000:>9.1f} ms")
+    rows = []
+    for (name, when), samples in modules.items():
+        cumulative = statistics.median(cumulative for _, cumulative in samples)
+        if cumulative * 1000 >= args.min_ms:
+            rows.append((cumulative, statistics.median(own for own, _ in samples), name, when))
+    print(f"\n{'module':>32} {'self ms':>9} {'cumulative ms':>14} {'imported':>9}")
+    for cumulative, own, name, when in sorted(rows, reverse=True)[:args.top]:
+        print(f"{name:>32} {own * 1000:>9.1f} {cumulative * 1000:>14.1f} {when:>9}")
+    print()
+
+
+def bench_sessions(args):
+    """Session memory: unbounded vs LRU-bounded store, approximate vs traced bytes (no SQLite flush)"""
+    import tracemalloc
+    from memory import SessionMemory, SessionStore
+
+    rng = random.Random(3)
+    print("\n" + "=" * 80)
+    print(f"  SESSIONS: {args.sessions} sessions x {args.turns} turns")
+    print("=" * 80)
+    print(f"{'capacity':>9} {'kept':>7} {'approx MB':>10} {'traced MB':>10} {'peak MB':>8} {'evictions':>10}")
+    for capacity in [0] + args.capacity:
+        memory = SessionMemory(SessionStore(capacity=capacity, ttl=0, max_bytes=0))
+        tracemalloc.start()
+        for i in range(args.sessions):
+            session_id = f"bench-{i}"
+            for turn in range(args.turns):
+                memory.add_message(session_id, "scammer", f"{rng.choice(SAMPLE_MESSAGES)} Ref {i}-{turn}",
+                                   "2026-01-01T00:00:00Z")
+                memory.update_intelligence(session_id, {"upiIds": [f"pay{i}.{turn}@ybl"],
+                                                        "suspiciousKeywords": ["urgent", "blocked"]})
+                memory.add_message(session_id, "user", "Wait, why would my account be blocked?",
+                                   "2026-01-01T00:00:01Z")
+        traced, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = memory.stats()
+        print(f"{capacity or 'none':>9} {stats['sessions']:>7} {stats['bytes'] / 1e6:>10.1f} {traced / 1e6:>10.1f} "
+              f"{peak / 1e6:>8.1f} {sum(stats['evictions'].values()):>10}")
+        del memory
+    print()
+
+
+def bench_prompt(args):
+    """Prompt size and build time per turn: last-4-messages prompt vs token-budgeted builder"""
+    from agent import agent
+    from prompt_builder import PromptBuilder, estimate_tokens
+    from text_analysis import analyze
+
+    rng = random.Random(9)
+    opener = "Hello, I am calling from SBI head office. Pay Rs 4,999 penalty or your account is blocked."
+
+    def last_four(history, message):
+        # The previous prompt: system prompt plus the last 4 messages
+        context = agent.system_prompt + "\n\nPrevious conversation:\n"
+        for msg in history[-4:]:
+            context += f"{'Scammer' if msg['sender'] == 'scammer' else 'You'}: {msg['text']}\n"
+        return f"{context}\nScammer: {message}\nYou (respond naturally in 1-2 sentences):"
+
+    print("\n" + "=" * 80)
+    print(f"  PROMPT BUILDER: budget {PromptBuilder().budget} tokens")
+    print("=" * 80)
+    print(f"{'turns':>6} {'old tokens':>11} {'new tokens':>11} {'new max':>8} {'old us':>8} {'new us':>8} "
+          f"{'bank kept':>10}")
+    for turns in args.turns:
+        history = []
+        builder = PromptBuilder()
+        old_tokens = new_tokens = new_max = 0
+        old_time = new_time = 0.0
+        old_kept = new_kept = False
+        for turn in range(turns):
+            text = opener if turn == 0 else (rng.choice(SAMPLE_MESSAGES) + " ") * rng.randint(1, 6)
+            history.append({"sender": "scammer", "text": text})
+            analysis = analyze(text)  # shared with detection in the endpoint
+            start = time.perf_counter()
+            old = last_four(history, text)
+            old_time += time.perf_counter() - start
+            start = time.perf_counter()
+            new = builder.build(agent.system_prompt, analysis, history, "bench")
+            new_time += time.perf_counter() - start
+            old_tokens += estimate_tokens(old)
+            new_tokens += new.tokens
+            new_max = max(new_max, new.tokens)
+            old_kept, new_kept = "SBI" in old, "SBI" in new.text
+            history.append({"sender": "user", "text": "Hmm, okay. What do I need to do exactly?"})
+        print(f"{turns:>6} {old_tokens / turns:>11.0f} {new_tokens / turns:>11.0f} {new_max:>8} "
+              f"{old_time / turns * 1e6:>8.1f} {new_time / turns * 1e6:>8.1f} "
+              f"{('yes' if new_kept else 'no') + '/' + ('yes' if old_kept else 'no'):>10}")
+    print("  (bank kept: new/old prompt still names the bank claimed in the first message)")
+    print()
+
+
+BENCHMARKS = {
+    "keywords": bench_keywords,
+    "batch": bench_batch,
+    "cache": bench_cache,
+    "classifier": bench_classifier,
+    "templates": bench_templates,
+    "extract": bench_extract,
+    "writes": bench_writes,
+    "intel": bench_intel,
+    "knownbad": bench_knownbad,
+    "stream": bench_stream,
+    "llm": bench_llm,
+    "replies": bench_replies,
+    "fallback": bench_fallback,
+    "pipeline": bench_pipeline,
+    "prompt": bench_prompt,
+    "sse": bench_sse,
+    "batching": bench_batching,
+    "breaker": bench_breaker,
+    "load": bench_load,
+    "startup": bench_startup,
+    "sessions": bench_sessions,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Honeypot performance benchmarks")
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("keywords", help=bench_keywords.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[140, 500, 1000, 2000, 5000])
+    p.add_argument("--repeat", type=int, default=200)
+
+    p = sub.add_parser("batch", help=bench_batch.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    p.add_argument("--repeats", type=int, default=10)
+
+    p = sub.add_parser("cache", help=bench_cache.__doc__)
+    p.add_argument("--messages", type=int, default=50000)
+    p.add_argument("--capacity", type=int, default=10000)
+
+    p = sub.add_parser("classifier", help=bench_classifier.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+
+    p = sub.add_parser("templates", help=bench_templates.__doc__)
+    p.add_argument("--sessions", type=int, default=500)
+    p.add_argument("--turns", type=int, default=20)
+
+    p = sub.add_parser("extract", help=bench_extract.__doc__)
+    p.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+
+    p = sub.add_parser("writes", help=bench_writes.__doc__)
+    p.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200])
+
+    p = sub.add_parser("intel", help=bench_intel.__doc__)
+    p.add_argument("--indicators", type=int, nargs="+", default=[100000, 1000000])
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("stream", help=bench_stream.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[8, 32], help="export sizes in MB")
+    p.add_argument("--chunk-size", type=int, default=1 << 20)
+
+    p = sub.add_parser("llm", help=bench_llm.__doc__)
+    p.add_argument("--sessions", type=int, default=64)
+    p.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds per call")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    p.add_argument("--timeout", type=float, default=8.0, help="per-reply deadline in seconds")
+
+    p = sub.add_parser("replies", help=bench_replies.__doc__)
+    p.add_argument("--messages", type=int, default=2000)
+    p.add_argument("--sessions", type=int, default=32, help="replies generated concurrently")
+    p.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds per call")
+    p.add_argument("--variants", type=int, nargs="+", default=[1, 3])
+
+    p = sub.add_parser("fallback", help=bench_fallback.__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[60, 140, 1000, 5000])
+    p.add_argument("--repeat", type=int, default=2000)
+
+    p = sub.add_parser("pipeline", help=bench_pipeline.__doc__)
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--sessions", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.05, help="fake LLM seconds per call")
+
+    p = sub.add_parser("prompt", help=bench_prompt.__doc__)
+    p.add_argument("--turns", type=int, nargs="+", default=[5, 20, 100, 500])
+
+    p = sub.add_parser("sse", help=bench_sse.__doc__)
+    p.add_argument("--requests", type=int, default=40)
+    p.add_argument("--latency", type=float, default=0.8, help="fake LLM seconds per full reply")
+    p.add_argument("--first-token", type=float, default=0.2, help="fake LLM seconds until the first chunk")
+
+    p = sub.add_parser("batching", help=bench_batching.__doc__)
+    p.add_argument("--requests", type=int, default=256)
+    p.add_argument("--sessions", type=int, nargs="+", default=[4, 64, 256], help="replies requested concurrently")
+    p.add_argument("--slots", type=int, default=8, help="LLM_MAX_CONCURRENCY")
+    p.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds per call")
+    p.add_argument("--item-cost", type=float, default=0.002, help="extra seconds per additional prompt in a batch")
+    p.add_argument("--batch", type=int, nargs="+", default=[8, 32])
+    p.add_argument("--wait", type=float, nargs="+", default=[2, 10], help="max wait in milliseconds")
+
+    p = sub.add_parser("breaker", help=bench_breaker.__doc__)
+    p.add_argument("--duration", type=float, default=9.0, help="seconds of traffic")
+    p.add_argument("--interval", type=float, default=0.01, help="seconds between replies")
+    p.add_argument("--latency", type=float, default=0.1, help="healthy fake LLM seconds per call")
+    p.add_argument("--slow-latency", type=float, default=3.0, help="degraded fake LLM seconds per call")
+    p.add_argument("--timeout", type=float, default=2.0, help="per-reply deadline in seconds")
+    p.add_argument("--slow-seconds", type=float, default=0.5, help="LLM_BREAKER_SLOW_SECONDS")
+    p.add_argument("--cooldown", type=float, default=1.0, help="LLM_BREAKER_COOLDOWN_SECONDS")
+    p.add_argument("--hedge", type=float, default=0.3, help="LLM_HEDGE_SECONDS")
+
+    p = sub.add_parser("load", help=bench_load.__doc__)
+    p.add_argument("--sessions", type=int, default=50, help="concurrent sessions")
+    p.add_argument("--turns", type=int, default=6, help="sequential turns per session")
+    p.add_argument("--scripts", type=int, default=3, help="distinct scam scripts the sessions follow")
+    p.add_argument("--slots", type=int, default=16, help="LLM_MAX_CONCURRENCY")
+    p.add_argument("--latency", type=float, default=0.3, help="median fake LLM seconds per call")
+    p.add_argument("--sigma", type=float, default=0.4, help="spread of the lognormal latency")
+    p.add_argument("--slow-latency", type=float, default=4.0, help="seconds a slow-tail call takes")
+    p.add_argument("--timeout", type=float, default=3.0, help="per-reply deadline in seconds")
+    p.add_argument("--slow-seconds", type=float, default=1.5, help="LLM_BREAKER_SLOW_SECONDS")
+    p.add_argument("--cooldown", type=float, default=2.0, help="LLM_BREAKER_COOLDOWN_SECONDS")
+
+    p = sub.add_parser("startup", help=bench_startup.__doc__)
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=25, help="modules listed")
+    p.add_argument("--min-ms", type=float, default=1.0, help="smallest cumulative import time listed")
+
+    p = sub.add_parser("sessions", help=bench_sessions.__doc__)
+    p.add_argument("--sessions", type=int, default=50000)
+    p.add_argument("--turns", type=int, default=4, help="turns per session")
+    p.add_argument("--capacity", type=int, nargs="+", default=[10000, 1000], help="SESSION_STORE_SIZE")
+
+    p = sub.add_parser("knownbad", help=bench_knownbad.__doc__)
+    p.add_argument("--entries", type=int, nargs="+", default=[100000, 1000000, 10000000])
+    p.add_argument("--repeat", type=int, default=5)
+
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Circuit Breaker Module - Latency- and error-aware circuit breaker for the LLM backend
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+# Recent calls judged, and how many are needed before the breaker may trip
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", 20))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", 10))
+# Share of failed (error/timeout) or slow calls in the window that trips it
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", 0.5))
+LLM_BREAKER_SLOW_RATE = float(os.getenv("LLM_BREAKER_SLOW_RATE", 0.5))
+# A successful call taking this long or longer counts as slow
+LLM_BREAKER_SLOW_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", 3))
+# Seconds the breaker stays open before letting a probe call through
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a backend that is failing or too slow, and probes it to recover
+
+    Closed: calls go through and their outcomes fill a rolling window. Once
+    the window holds min_calls outcomes and the failure or slow share reaches
+    its limit, the breaker opens. Open: calls are refused until the cooldown
+    has passed, then the breaker is half-open. Half-open: a single probe call
+    is let through; success closes the breaker with a fresh window, failure
+    (or a slow reply) opens it for another cooldown.
+    """
+
+    def __init__(self,
+                 window: int = None,
+                 min_calls: int = None,
+                 error_rate: float = None,
+                 slow_rate: float = None,
+                 slow_seconds: float = None,
+                 cooldown: float = None):
+        """
+        Args:
+            window: Override for LLM_BREAKER_WINDOW
+            min_calls: Override for LLM_BREAKER_MIN_CALLS
+            error_rate: Override for LLM_BREAKER_ERROR_RATE
+            slow_rate: Override for LLM_BREAKER_SLOW_RATE
+            slow_seconds: Override for LLM_BREAKER_SLOW_SECONDS
+            cooldown: Override for LLM_BREAKER_COOLDOWN_SECONDS
+        """
+        self.window = max(1, LLM_BREAKER_WINDOW if window is None else window)
+        self.min_calls = max(1, min(self.window, LLM_BREAKER_MIN_CALLS if min_calls is None else min_calls))
+        self.error_rate = LLM_BREAKER_ERROR_RATE if error_rate is None else error_rate
+        self.slow_rate = LLM_BREAKER_SLOW_RATE if slow_rate is None else slow_rate
+        self.slow_seconds = LLM_BREAKER_SLOW_SECONDS if slow_seconds is None else slow_seconds
+        self.cooldown = LLM_BREAKER_COOLDOWN_SECONDS if cooldown is None else cooldown
+        # (failed, slow) per recent call
+        self._outcomes: Deque[tuple] = deque(maxlen=self.window)
+        self._failures = 0
+        self._slow = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+        self.probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now
+
+        Returns:
+            True if closed, or half-open with no probe in flight (the caller
+            is then the probe and must report its outcome with record)
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            now = time.monotonic()
+            # A probe that never reported back (e.g. cancelled) is replaced after a cooldown
+            if state == HALF_OPEN and (not self._probing or now - self._probe_started >= self.cooldown):
+                self._probing = True
+                self._probe_started = now
+                self.probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, seconds: float, ok: bool):
+        """
+        Report the outcome of a call that allow() let through
+
+        Args:
+            seconds: How long the call took
+            ok: False for errors and timeouts
+        """
+        slow = ok and seconds >= self.slow_seconds
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN and self._probing:
+                self._probing = False
+                if ok and not slow:
+                    self._reset(CLOSED)
+                else:
+                    self._trip()
+                return
+            if state != CLOSED:
+                # A call from before the breaker opened
+                return
+            if len(self._outcomes) == self.window:
+                failed_before, slow_before = self._outcomes[0]
+                self._failures -= failed_before
+                self._slow -= slow_before
+            self._outcomes.append((not ok, slow))
+            self._failures += not ok
+            self._slow += slow
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and (self._failures >= self.error_rate * calls
+                                            or self._slow >= self.slow_rate * calls):
+                self._trip()
+
+    def _trip(self):
+        self._reset(OPEN)
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def _reset(self, state: str):
+        self._state = state
+        self._probing = False
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def stats(self) -> Dict:
+        """Snapshot of the breaker state and window"""
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            retry_in: Optional[float] = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self.cooldown - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+                "slow_rate": round(self._slow / calls, 3) if calls else 0.0,
+                "slow_seconds": self.slow_seconds,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "probes": self.probes,
+                "retry_in_seconds": retry_in
+            }
@@ -0,0 +1,204 @@
+"""
+Linear Classifier Module - Hashed n-gram features scored by a logistic model
+"""
+
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scam_detector import risk_level_for
+
+try:
+    import numpy as np
+except ImportError:
+    print("Warning: numpy not available, linear classifier engine disabled")
+    np = None
+
+CLASSIFIER_MODEL_PATH = os.getenv("CLASSIFIER_MODEL_PATH", os.path.join("data", "scam_classifier.npz"))
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingVectorizer:
+    """Maps text to a fixed-width sparse vector of hashed word n-grams
+
+    No vocabulary is stored: each n-gram is hashed (CRC32, stable across
+    processes) into one of n_features columns, with the sign taken from the
+    top hash bit so collisions tend to cancel out. Hashes of frequent
+    n-grams are memoized, which keeps the per-message Python work small.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_max: int = 2, memo_size: int = 200000):
+        if n_features & (n_features - 1):
+            raise ValueError("n_features must be a power of two")
+        self.n_features = n_features
+        self.ngram_max = ngram_max
+        self._memo: Dict[str, int] = {}
+        self._memo_size = memo_size
+
+    def ngrams(self, text: str) -> List[str]:
+        """Distinct word 1..ngram_max-grams of the lowercased text"""
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = set(tokens)
+        for n in range(2, self.ngram_max + 1):
+            grams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return list(grams)
+
+    def transform(self, texts: Iterable[str]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Hash many texts into CSR arrays
+
+        Each n-gram contributes +-1/sqrt(n-gram count) to its column, so
+        rows have unit norm before collisions. Colliding entries are left as
+        duplicate column indices; the sparse products below sum them.
+
+        Args:
+            texts: Message texts
+
+        Returns:
+            (indptr, indices, data) of a len(texts) x n_features CSR matrix
+        """
+        memo = self._memo
+        indptr = [0]
+        hashes: List[int] = []
+        for text in texts:
+            for gram in self.ngrams(text):
+                h = memo.get(gram)
+                if h is None:
+                    h = zlib.crc32(gram.encode("utf-8", "surrogatepass"))
+                    if len(memo) < self._memo_size:
+                        memo[gram] = h
+                hashes.append(h)
+            indptr.append(len(hashes))
+
+        indptr = np.asarray(indptr, dtype=np.int64)
+        hashes = np.asarray(hashes, dtype=np.int64)
+        counts = np.diff(indptr)
+        scale = np.repeat(1.0 / np.sqrt(np.maximum(counts, 1)), counts)
+        data = np.where(hashes & 0x80000000, 1.0, -1.0) * scale
+        return indptr, hashes & (self.n_features - 1), data
+
+
+def _csr_dot(indptr: "np.ndarray", indices: "np.ndarray", data: "np.ndarray", weights: "np.ndarray") -> "np.ndarray":
+    """Sparse matrix (CSR) times dense vector"""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    return np.bincount(rows, weights=data * weights[indices], minlength=len(indptr) - 1)
+
+
+def _sigmoid(z: "np.ndarray") -> "np.ndarray":
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35.0, 35.0)))
+
+
+class LinearScamClassifier:
+    """Logistic regression over hashed n-gram features
+
+    Exposes the same detect()/detect_batch() interface as ScamDetector so
+    either engine can serve a request. Batches are scored with one sparse
+    matrix-vector product.
+    """
+
+    def __init__(self, vectorizer: HashingVectorizer = None, threshold: float = 0.5):
+        if np is None:
+            raise RuntimeError("numpy is required for the linear classifier")
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.weights = np.zeros(self.vectorizer.n_features)
+        self.bias = 0.0
+        self.threshold = threshold
+
+    def fit(self,
+            texts: List[str],
+            labels: List[int],
+            epochs: int = 300,
+            learning_rate: float = 0.5,
+            l2: float = 1e-4) -> "LinearScamClassifier":
+        """
+        Train with full-batch gradient descent on the logistic loss
+
+        Args:
+            texts: Training messages
+            labels: 1 for scam, 0 for benign
+            epochs: Gradient steps
+            learning_rate: Step size
+            l2: L2 regularization strength
+
+        Returns:
+            self
+        """
+        indptr, indices, data = self.vectorizer.transform(texts)
+        y = np.asarray(labels, dtype=np.float64)
+        rows = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        n = max(len(texts), 1)
+
+        # Balance classes so a skewed dataset doesn't just learn the prior
+        positives = y.sum()
+        negatives = len(y) - positives
+        sample_weight = np.where(y == 1, n / (2 * max(positives, 1)), n / (2 * max(negatives, 1)))
+
+        for _ in range(epochs):
+            z = np.bincount(rows, weights=data * self.weights[indices], minlength=len(texts)) + self.bias
+            residual = (_sigmoid(z) - y) * sample_weight
+            gradient = np.bincount(indices, weights=data * residual[rows], minlength=self.vectorizer.n_features) / n
+            self.weights -= learning_rate * (gradient + l2 * self.weights)
+            self.bias -= learning_rate * residual.mean()
+        return self
+
+    def predict_proba(self, texts: List[str]) -> "np.ndarray":
+        """Scam probability per text"""
+        indptr, indices, data = self.vectorizer.transform(texts)
+        return _sigmoid(_csr_dot(indptr, indices, data, self.weights) + self.bias)
+
+    def _verdict(self, probability: float) -> Dict:
+        confidence = round(float(probability), 2)
+        return {
+            "is_scam": bool(probability >= self.threshold),
+            "confidence": confidence,
+            "detected_keywords": [],
+            "risk_level": risk_level_for(confidence),
+            "score": float(np.log(max(probability, 1e-12) / max(1.0 - probability, 1e-12))),
+            "engine": "linear"
+        }
+
+    def detect(self, message: str) -> Dict:
+        """Score a single message (same verdict shape as ScamDetector.detect)"""
+        return self.detect_batch([message])[0]
+
+    def detect_batch(self, messages: List[str]) -> List[Dict]:
+        """Score many messages with one sparse matrix product"""
+        if not messages:
+            return []
+        return [self._verdict(p) for p in self.predict_proba(messages)]
+
+    def save(self, path: str):
+        """Write weights and vectorizer settings to an .npz file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=np.float64(self.bias),
+            threshold=np.float64(self.threshold),
+            n_features=np.int64(self.vectorizer.n_features),
+            ngram_max=np.int64(self.vectorizer.ngram_max),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScamClassifier":
+        """Load a model written by save()"""
+        with np.load(path) as archive:
+            vectorizer = HashingVectorizer(int(archive["n_features"]), int(archive["ngram_max"]))
+            model = cls(vectorizer, threshold=float(archive["threshold"]))
+            model.weights = archive["weights"].astype(np.float64)
+            model.bias = float(archive["bias"])
+        return model
+
+
+def load_default_model(path: str = None) -> Optional[LinearScamClassifier]:
+    """Load the configured model, or None if numpy or the model file is missing"""
+    path = path or CLASSIFIER_MODEL_PATH
+    if np is None or not os.path.exists(path):
+        return None
+    try:
+        return LinearScamClassifier.load(path)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load classifier model {path}: {e}")
+        return None
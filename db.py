@@ -5,10 +5,18 @@ SQLite Persistence Module - Stores sessions, messages, and extracted intelligenc
 import json
 import os
 import sqlite3
-from typing import Dict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 
 DB_PATH = os.getenv("SQLITE_DB_PATH", os.path.join("data", "honeypot.db"))
 
+# Session fields needed to resume a session evicted from memory
+SESSION_STATE_COLUMNS = (("session_score", "REAL"), ("scored_turns", "INTEGER"), ("final_result_sent", "INTEGER"))
+
+# Typed intelligence kinds stored one value per row (knownBad too, so a
+# reloaded session does not report its listed indicators again)
+INTELLIGENCE_KINDS = ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords", "knownBad"]
+
 
 def _connect() -> sqlite3.Connection:
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
@@ -29,7 +37,10 @@ def init_db() -> None:
                 scam_detected INTEGER,
                 confidence REAL,
                 agent_notes TEXT,
-                message_count INTEGER
+                message_count INTEGER,
+                session_score REAL,
+                scored_turns INTEGER,
+                final_result_sent INTEGER
             )
             """
         )
@@ -51,47 +62,80 @@ def init_db() -> None:
                 session_id TEXT,
                 kind TEXT,
                 value TEXT,
+                seen_at TEXT,
                 UNIQUE(session_id, kind, value)
             )
             """
         )
+        # Databases created before seen_at was recorded
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(intelligence)")}
+        if "seen_at" not in columns:
+            conn.execute("ALTER TABLE intelligence ADD COLUMN seen_at TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_intelligence_kind_value ON intelligence (kind, value)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id)")
+        # Databases created before evicted sessions could be reloaded
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+        for column, kind in SESSION_STATE_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {kind}")
         conn.commit()
 
 
+def _write_session(conn: sqlite3.Connection, session: Dict) -> None:
+    conn.execute(
+        """
+        INSERT INTO sessions (
+            session_id,
+            created_at,
+            updated_at,
+            metadata_json,
+            scam_detected,
+            confidence,
+            agent_notes,
+            message_count,
+            session_score,
+            scored_turns,
+            final_result_sent
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(session_id) DO UPDATE SET
+            updated_at=excluded.updated_at,
+            metadata_json=excluded.metadata_json,
+            scam_detected=excluded.scam_detected,
+            confidence=excluded.confidence,
+            agent_notes=excluded.agent_notes,
+            message_count=excluded.message_count,
+            session_score=excluded.session_score,
+            scored_turns=excluded.scored_turns,
+            final_result_sent=excluded.final_result_sent
+        """
+        ,
+        (
+            session.get("sessionId"),
+            session.get("created_at"),
+            session.get("updated_at"),
+            json.dumps(session.get("metadata", {}), ensure_ascii=True),
+            1 if session.get("scam_detected") else 0,
+            session.get("confidence", 0.0),
+            session.get("agent_notes", ""),
+            session.get("message_count", 0),
+            session.get("session_score", 0.0),
+            session.get("scored_turns", 0),
+            1 if session.get("final_result_sent") else 0
+        )
+    )
+
+
+def _write_intelligence(conn: sqlite3.Connection, items: List[Tuple[str, str, str]], seen_at: Optional[str]) -> None:
+    seen_at = seen_at or datetime.now().isoformat()
+    conn.executemany(
+        "INSERT OR IGNORE INTO intelligence (session_id, kind, value, seen_at) VALUES (?, ?, ?, ?)",
+        [item + (seen_at,) for item in items]
+    )
+
+
 def persist_session(session: Dict) -> None:
     with _connect() as conn:
-        conn.execute(
-            """
-            INSERT INTO sessions (
-                session_id,
-                created_at,
-                updated_at,
-                metadata_json,
-                scam_detected,
-                confidence,
-                agent_notes,
-                message_count
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(session_id) DO UPDATE SET
-                updated_at=excluded.updated_at,
-                metadata_json=excluded.metadata_json,
-                scam_detected=excluded.scam_detected,
-                confidence=excluded.confidence,
-                agent_notes=excluded.agent_notes,
-                message_count=excluded.message_count
-            """
-            ,
-            (
-                session.get("sessionId"),
-                session.get("created_at"),
-                session.get("updated_at"),
-                json.dumps(session.get("metadata", {}), ensure_ascii=True),
-                1 if session.get("scam_detected") else 0,
-                session.get("confidence", 0.0),
-                session.get("agent_notes", ""),
-                session.get("message_count", 0)
-            )
-        )
+        _write_session(conn, session)
         conn.commit()
 
 
@@ -104,21 +148,123 @@ def persist_message(session_id: str, sender: str, text: str, timestamp: str) ->
         conn.commit()
 
 
-def persist_intelligence(session_id: str, intelligence: Dict) -> None:
+def intelligence_rows(session_id: str, intelligence: Dict) -> List[Tuple[str, str, str]]:
+    """(session_id, kind, value) rows written for an intelligence dict"""
     items = []
-    for key in ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords"]:
+    for key in INTELLIGENCE_KINDS:
         for value in intelligence.get(key, []):
             items.append((session_id, key, str(value)))
 
     for tactic in intelligence.get("tactics_used", []):
         items.append((session_id, "tactic", json.dumps(tactic, ensure_ascii=True)))
+    return items
 
+
+def persist_intelligence(session_id: str, intelligence: Dict, seen_at: Optional[str] = None) -> None:
+    items = intelligence_rows(session_id, intelligence)
     if not items:
         return
 
+    with _connect() as conn:
+        _write_intelligence(conn, items, seen_at)
+        conn.commit()
+
+
+def persist_turn(session: Dict,
+                 messages: List[Tuple[str, str, str]],
+                 intelligence: Optional[Dict] = None,
+                 seen_at: Optional[str] = None) -> None:
+    """Write (sender, text, timestamp) messages, new intelligence and the session row in one transaction"""
+    session_id = session.get("sessionId")
+    items = intelligence_rows(session_id, intelligence) if intelligence else []
     with _connect() as conn:
         conn.executemany(
-            "INSERT OR IGNORE INTO intelligence (session_id, kind, value) VALUES (?, ?, ?)",
-            items
+            "INSERT INTO messages (session_id, sender, text, timestamp) VALUES (?, ?, ?, ?)",
+            [(session_id,) + tuple(message) for message in messages]
         )
+        if items:
+            _write_intelligence(conn, items, seen_at)
+        _write_session(conn, session)
         conn.commit()
+
+
+def load_intelligence(kinds: List[str] = None) -> Iterator[Tuple[str, str, str, Optional[str]]]:
+    """Stream stored (session_id, kind, value, seen_at) rows, oldest first"""
+    query = "SELECT session_id, kind, value, seen_at FROM intelligence"
+    params: List[str] = []
+    if kinds:
+        query += f" WHERE kind IN ({', '.join('?' for _ in kinds)})"
+        params.extend(kinds)
+    query += " ORDER BY id"
+    with _connect() as conn:
+        yield from conn.execute(query, params)
+
+
+def load_messages(sender: str = "scammer", limit: int = None) -> List[str]:
+    """Texts of stored messages from one sender, oldest first"""
+    query = "SELECT text FROM messages WHERE sender = ? AND text IS NOT NULL AND text != '' ORDER BY id"
+    params = [sender]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    with _connect() as conn:
+        return [row[0] for row in conn.execute(query, params)]
+
+
+def load_session(session_id: str) -> Optional[Dict]:
+    """
+    Rebuild a stored session (as SessionMemory holds it) from its rows
+
+    Args:
+        session_id: Session ID
+
+    Returns:
+        Session dict with its conversation history and intelligence, or None
+        if the session was never stored
+    """
+    with _connect() as conn:
+        row = conn.execute(
+            """
+            SELECT created_at, updated_at, metadata_json, scam_detected, confidence, agent_notes, message_count,
+                   session_score, scored_turns, final_result_sent
+            FROM sessions WHERE session_id = ?
+            """,
+            (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        history = [
+            {"sender": sender, "text": text, "timestamp": timestamp}
+            for sender, text, timestamp in conn.execute(
+                "SELECT sender, text, timestamp FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+            )
+        ]
+        intelligence = {key: [] for key in INTELLIGENCE_KINDS + ["tactics_used"]}
+        for kind, value in conn.execute(
+            "SELECT kind, value FROM intelligence WHERE session_id = ? ORDER BY id", (session_id,)
+        ):
+            if kind == "tactic":
+                intelligence["tactics_used"].append(json.loads(value))
+            elif kind in intelligence:
+                intelligence[kind].append(value)
+
+    (created_at, updated_at, metadata_json, scam_detected, confidence, agent_notes, message_count,
+     session_score, scored_turns, final_result_sent) = row
+    return {
+        "sessionId": session_id,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "conversation_history": history,
+        "metadata": json.loads(metadata_json) if metadata_json else {},
+        "scam_detected": bool(scam_detected),
+        "confidence": confidence or 0.0,
+        # Rows from before the running score was stored start from the last
+        # confidence, counted as one turn
+        "session_score": (confidence or 0.0) if session_score is None else session_score,
+        "scored_turns": 1 if session_score is None else scored_turns or 0,
+        "extracted_intelligence": intelligence,
+        "agent_notes": agent_notes or "",
+        # The history is what was written; a turn cut short may not have counted yet
+        "message_count": max(message_count or 0, len(history)),
+        "final_result_sent": bool(final_result_sent)
+    }
@@ -2,21 +2,169 @@
 Intelligence Extraction Module - Parses scam-related data from messages
 """
 
-import re
-from typing import Dict, List
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Union
+
+from indicator_scanner import INTELLIGENCE_KEYS, VARIANT_KINDS, iter_fused_matches, iter_nested_phones, scanner
+from known_bad import known_bad
+from text_analysis import MessageAnalysis, analyze, fold
+
+# Characters read per chunk when streaming files
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 1 << 20))
+
+# Streams are cut at whitespace at least this many characters before the end
+# of the buffered text: longer than any indicator or keyword that can contain
+# whitespace (card numbers, multi-word keywords), so none is split
+_STREAM_OVERLAP = 256
+# A run without whitespace longer than this is cut anyway (bounds memory)
+_STREAM_MAX_CARRY = 1 << 16
+_WHITESPACE = (" ", "\n", "\t", "\r")
+
+class ExtractionResult(NamedTuple):
+    """Cumulative intelligence of a session and what the last turns added"""
+    intelligence: Dict
+    delta: Dict
+
+
+class _ExtractionState:
+    """Per-session cursor and dedup state for incremental extraction"""
+    
+    __slots__ = ("cursor", "values", "seen", "keywords", "tactics", "known_bad", "tail")
+    
+    def __init__(self, indicator_keys):
+        self.cursor = 0
+        self.values: Dict[str, List[str]] = {key: [] for key in indicator_keys}
+        self.seen: Dict[str, Set[str]] = {key: set() for key in indicator_keys}
+        self.keywords: Dict[str, None] = {}  # insertion-ordered set
+        self.tactics: Dict[str, str] = {}  # category -> first keyword in list order
+        self.known_bad: List[str] = []  # indicator values found in the known-bad feed
+        self.tail = ""
+
+
+class StreamedIndicator(NamedTuple):
+    """An indicator seen for the first time in a stream"""
+    key: str         # intelligence key, e.g. "upiIds"
+    value: str
+    offset: int      # character offset of its first occurrence
+    known_bad: bool  # listed in the known-bad feed
+
+
+class IntelligenceStream:
+    """Push-style extraction over text too large to hold in memory
+
+    feed() accepts text in arbitrary pieces and returns the indicators
+    that became final; close() flushes the rest. Only a short carry (from
+    the last whitespace cut) is buffered between pieces, and the cut always
+    falls on whitespace, so results equal extract_intelligence over the
+    whole text. A run of over _STREAM_MAX_CARRY characters without
+    whitespace is the exception: it is cut where it stands.
+    """
+    
+    def __init__(self, extractor: "IntelligenceExtractor"):
+        self._extractor = extractor
+        self.state = _ExtractionState(extractor.indicator_keys)
+        self._buffer = ""
+        self._pending: List[str] = []  # pieces not yet joined onto _buffer
+        self._pending_length = 0
+        self._wait_until = 0  # buffered length worth attempting a cut at
+        self._base = 0      # stream offset of _buffer[0]
+        self._scan_from = 0  # buffer index where the indicator scan resumes
+        self._fold_from = 0  # buffer index where keyword folding resumes
+        self.characters = 0
+    
+    def feed(self, text: str) -> List[StreamedIndicator]:
+        """
+        Add the next piece of text
+        
+        Args:
+            text: Next piece of the stream (any size, any boundary)
+            
+        Returns:
+            Indicators first seen in the text that is now final
+        """
+        self.characters += len(text)
+        self._pending.append(text)
+        self._pending_length += len(text)
+        if len(self._buffer) + self._pending_length < self._wait_until:
+            # Small pieces are joined in batches, so tiny chunks stay linear
+            return []
+        buffer = self._join()
+        limit = len(buffer) - _STREAM_OVERLAP
+        # The cut must move past the previous one (kept at _scan_from)
+        cut = max(buffer.rfind(ch, self._scan_from + 1, limit) for ch in _WHITESPACE)
+        if cut <= self._scan_from:
+            if len(buffer) - self._scan_from <= _STREAM_MAX_CARRY:
+                # No whitespace to cut at yet: wait for the buffer to grow
+                self._wait_until = len(buffer) + max(_STREAM_OVERLAP, len(buffer) - self._scan_from)
+                return []
+            cut = limit
+        return self._advance(buffer, cut)
+    
+    def close(self) -> List[StreamedIndicator]:
+        """Flush the buffered text, returning its new indicators"""
+        buffer = self._join()
+        return self._advance(buffer, len(buffer), final=True)
+    
+    def _join(self) -> str:
+        """Append the pending pieces to the buffer"""
+        if self._pending:
+            self._buffer = self._buffer + "".join(self._pending)
+            self._pending = []
+            self._pending_length = 0
+        return self._buffer
+    
+    def intelligence(self) -> Dict:
+        """Intelligence extracted so far (complete after close())"""
+        state = self.state
+        # Lexicon order, as for a single message scanned in one pass
+        keywords = {kw: None for kw in self._extractor._keyword_categories if kw in state.keywords}
+        return self._extractor._snapshot(state.values, keywords, state.tactics, state.known_bad)
+    
+    def _advance(self, buffer: str, cut: int, final: bool = False) -> List[StreamedIndicator]:
+        """Finalize buffer[:cut]: every match starting before cut, and its keywords"""
+        extractor = self._extractor
+        state = self.state
+        found = []
+        resume = cut
+        for match in iter_fused_matches(buffer, self._scan_from):
+            if match.start() >= cut and not final:
+                break
+            for indicator in (match, *iter_nested_phones(buffer, match)):
+                key = INTELLIGENCE_KEYS[VARIANT_KINDS[indicator.lastgroup]]
+                value = indicator.group()
+                known_before = len(state.known_bad)
+                if extractor._record_indicator(state, key, value):
+                    found.append(StreamedIndicator(key, value, self._base + indicator.start(),
+                                                   len(state.known_bad) > known_before))
+            resume = max(resume, match.end())
+        
+        # Keywords over the folded text, prefixed with the previous tail
+        # (no separator: the stream is one continuous text)
+        window = state.tail + fold(buffer[self._fold_from:cut])
+        matched = [kw for kw in extractor._keyword_categories if kw not in state.keywords and kw in window]
+        extractor._record_keywords(state, matched, {}, set())
+        state.tail = window[-extractor._tail_length:] if extractor._tail_length else ""
+        
+        # Keep one character before the resume point so lookbehinds and
+        # word boundaries see the same context as in a single pass
+        keep = max(min(cut, resume) - 1, 0)
+        self._buffer = buffer[keep:]
+        self._base += keep
+        self._scan_from = resume - keep
+        self._fold_from = cut - keep
+        self._wait_until = 0
+        return found
+
 
 class IntelligenceExtractor:
     """Extracts structured intelligence from scam conversations"""
     
     def __init__(self):
-        # Regex patterns for different data types
-        self.patterns = {
-            "phoneNumbers": r'\+91\d{10}|\b91\d{10}|(\()?(\d{3})(-)?(\d{3})(-)?(\d{4})\)?',
-            "bankAccounts": r'[A-Z]{2}\d{10,}|\d{4}[\s-]\d{4}[\s-]\d{4}[\s-]\d{4}',
-            "upiIds": r'[\w.-]+@[a-zA-Z]{3,}|[a-zA-Z0-9._-]+@(upi|okaxis|ibl|okhdfcbank)',
-            "phishingLinks": r'https?://[^\s]+|www\.[^\s]+',
-            "emails": r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        }
+        # Fused single-pass regex scanner (shared with the scam detector)
+        self.scanner = scanner
+        
+        # Known-bad feed that every new indicator is checked against
+        self.known_bad = known_bad
         
         # Suspicious keywords that indicate scam tactics
         self.suspicious_keywords = {
@@ -27,6 +175,21 @@ class IntelligenceExtractor:
             "personal_info": ["otp", "pin", "password", "cvv", "account number"],
             "phishing": ["click link", "download app", "visit site", "open attachment"]
         }
+        # keyword -> (category, position in its category list)
+        self._keyword_categories = {
+            keyword: (category, position)
+            for category, keywords in self.suspicious_keywords.items()
+            for position, keyword in enumerate(keywords)
+        }
+        # A keyword spanning two messages starts within this many characters
+        # of the end of the earlier one
+        self._tail_length = max(map(len, self._keyword_categories)) - 1
+        
+        # Typed indicator lists reported per conversation
+        self.indicator_keys = ("bankAccounts", "upiIds", "phishingLinks", "phoneNumbers")
+        
+        # Incremental extraction state per session
+        self._sessions: Dict[str, _ExtractionState] = {}
     
     def extract_intelligence(self, conversation_history: List[Dict]) -> Dict:
         """
@@ -38,73 +201,195 @@ class IntelligenceExtractor:
         Returns:
             Dict with extracted intelligence
         """
-        intelligence = {
-            "bankAccounts": [],
-            "upiIds": [],
-            "phishingLinks": [],
-            "phoneNumbers": [],
-            "suspiciousKeywords": [],
-            "tactics_used": []
-        }
+        state = _ExtractionState(self.indicator_keys)
+        self._consume(state, conversation_history)
+        return self._snapshot(state.values, state.keywords, state.tactics, state.known_bad)
+    
+    def extract_incremental(self,
+                            session_id: str,
+                            conversation_history: List[Dict],
+                            known_shapes: Dict[str, Dict] = None) -> ExtractionResult:
+        """
+        Extract intelligence scanning only the turns added since the last call
+        
+        Per-session state keeps a cursor into the history and the values
+        found so far, so each turn costs the same however long the
+        conversation is. Keywords spanning two messages are still found
+        (the tail of the previous message is kept). The cumulative result
+        matches extract_intelligence over the full history.
+        
+        Args:
+            session_id: Session ID
+            conversation_history: Full history of the session (append-only)
+            known_shapes: Optional message text -> keywords/tactics shape for
+                          messages whose keywords are already known (the
+                          keyword scan is skipped for them)
+            
+        Returns:
+            ExtractionResult with the cumulative intelligence and the values
+            first seen in this call
+        """
+        state = self._sessions.get(session_id)
+        if state is None or state.cursor > len(conversation_history):
+            # New session, or its history was replaced: start over
+            state = self._sessions[session_id] = _ExtractionState(self.indicator_keys)
         
-        # Combine all messages
-        full_text = " ".join([msg.get("text", "") for msg in conversation_history])
+        known_bad_before = len(state.known_bad)
+        new_values, new_keywords, new_categories = self._consume(state, conversation_history, known_shapes)
+        return ExtractionResult(
+            self._snapshot(state.values, state.keywords, state.tactics, state.known_bad),
+            self._snapshot(new_values, new_keywords, {category: state.tactics[category] for category in new_categories},
+                           state.known_bad[known_bad_before:])
+        )
+    
+    def reset_session(self, session_id: str):
+        """Drop the incremental extraction state of a session"""
+        self._sessions.pop(session_id, None)
+    
+    def _consume(self, state: "_ExtractionState", conversation_history: List[Dict], known_shapes: Dict[str, Dict] = None):
+        """Scan history[state.cursor:] into state, returning what was new"""
+        new_values = {key: [] for key in state.values}
+        new_keywords = {}
+        new_categories = set()
         
-        # Extract phone numbers
-        phone_matches = re.findall(self.patterns["phoneNumbers"], full_text)
-        for match in phone_matches:
-            if isinstance(match, tuple):
-                # Handle tuple returns from complex patterns
-                phone = ''.join(filter(None, match))
+        for msg in conversation_history[state.cursor:]:
+            text = msg.get("text", "")
+            
+            # Typed indicators: the scanner memoizes by text, so the current
+            # message reuses the detector's scan
+            for match in self.scanner.scan(text):
+                key = INTELLIGENCE_KEYS[match.kind]
+                if self._record_indicator(state, key, match.value):
+                    new_values[key].append(match.value)
+            
+            # Suspicious keywords over the shared folded form, prefixed with
+            # the tail of the conversation so far (messages are joined by a
+            # space, as if scanning the whole conversation at once)
+            folded = analyze(text).folded
+            window = f"{state.tail} {folded}" if state.cursor else folded
+            shape = known_shapes.get(text) if known_shapes else None
+            if shape is not None:
+                found = [kw for kw in shape.get("suspiciousKeywords", []) if kw in self._keyword_categories]
             else:
-                phone = match
-            if phone and phone not in intelligence["phoneNumbers"]:
-                intelligence["phoneNumbers"].append(phone)
-        
-        # Extract UPI IDs
-        upi_matches = re.findall(self.patterns["upiIds"], full_text)
-        for upi in set(upi_matches):
-            if upi and upi not in intelligence["upiIds"]:
-                intelligence["upiIds"].append(upi)
-        
-        # Extract bank accounts
-        bank_matches = re.findall(self.patterns["bankAccounts"], full_text)
-        for bank in set(bank_matches):
-            if bank and bank not in intelligence["bankAccounts"]:
-                intelligence["bankAccounts"].append(bank)
-        
-        # Extract phishing links
-        link_matches = re.findall(self.patterns["phishingLinks"], full_text)
-        for link in set(link_matches):
-            if link and link not in intelligence["phishingLinks"]:
-                intelligence["phishingLinks"].append(link)
-        
-        # Extract suspicious keywords
-        detected_keywords = set()
-        full_text_lower = full_text.lower()
-        
-        for category, keywords in self.suspicious_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in full_text_lower:
-                    detected_keywords.add(keyword)
-                    if category not in [t["category"] for t in intelligence.get("tactics_used", [])]:
-                        intelligence["tactics_used"].append({"category": category, "keyword": keyword})
-        
-        intelligence["suspiciousKeywords"] = list(detected_keywords)
+                found = [kw for kw in self._keyword_categories if kw not in state.keywords and kw.lower() in window]
+            self._record_keywords(state, found, new_keywords, new_categories)
+            
+            state.tail = window[-self._tail_length:] if self._tail_length else ""
+            state.cursor += 1
         
+        return new_values, new_keywords, new_categories
+    
+    def _record_indicator(self, state: "_ExtractionState", key: str, value: str) -> bool:
+        """Add an indicator to state, returning True if it was new"""
+        seen = state.seen.get(key)
+        if seen is None or value in seen:
+            return False
+        seen.add(value)
+        state.values[key].append(value)
+        if self.known_bad.contains(key, value):
+            state.known_bad.append(value)
+        return True
+    
+    def _record_keywords(self, state: "_ExtractionState", found: List[str], new_keywords: Dict, new_categories: Set[str]):
+        """Add matched keywords (and the tactics they imply) to state"""
+        for keyword in found:
+            if keyword in state.keywords:
+                continue
+            state.keywords[keyword] = None
+            new_keywords[keyword] = None
+            category, position = self._keyword_categories[keyword]
+            current = state.tactics.get(category)
+            if current is None:
+                new_categories.add(category)
+            if current is None or position < self._keyword_categories[current][1]:
+                state.tactics[category] = keyword
+    
+    def _snapshot(self,
+                  values: Dict[str, List],
+                  keywords: Dict[str, None],
+                  tactics: Dict[str, str],
+                  known_bad: List[str]) -> Dict:
+        """Build an intelligence dict (fresh lists, safe for callers to keep)"""
+        intelligence = {key: list(items) for key, items in values.items()}
+        intelligence["suspiciousKeywords"] = list(keywords)
+        # Indicators listed in the known-bad feed (checked when first seen)
+        intelligence["knownBad"] = list(known_bad)
+        # A category's tactic names its first keyword (in list order) that
+        # has been seen anywhere in the conversation
+        intelligence["tactics_used"] = [
+            {"category": category, "keyword": tactics[category]}
+            for category in self.suspicious_keywords
+            if category in tactics
+        ]
         return intelligence
     
-    def extract_from_message(self, message: str) -> Dict:
+    def extract_from_message(self, message: Union[str, MessageAnalysis]) -> Dict:
         """
         Extract intelligence from single message
         
         Args:
-            message: Single message text
+            message: Single message text, or its shared analysis
             
         Returns:
             Dict with extracted data from this message
         """
-        return self.extract_intelligence([{"text": message}])
+        return self.extract_intelligence([{"text": analyze(message).text}])
+
+    def known_bad_indicators(self, message: Union[str, MessageAnalysis]) -> List[str]:
+        """
+        Indicators of a single message that are in the known-bad feed
+        
+        Args:
+            message: Single message text, or its shared analysis
+            
+        Returns:
+            List of listed indicator values (empty if none or no feed)
+        """
+        found = []
+        for match in self.scanner.scan(analyze(message).text):
+            key = INTELLIGENCE_KEYS[match.kind]
+            if match.value not in found and self.known_bad.contains(key, match.value):
+                found.append(match.value)
+        return found
+
+    def open_stream(self) -> IntelligenceStream:
+        """Start a push-style extraction (see IntelligenceStream)"""
+        return IntelligenceStream(self)
+    
+    def stream_indicators(self, chunks: Iterable[str], stream: IntelligenceStream = None) -> Iterator[StreamedIndicator]:
+        """
+        Extract indicators from text arriving in chunks, yielding as it goes
+        
+        Memory stays bounded by the chunk size, so multi-GB exports can be
+        processed. Pass a stream to read its intelligence() afterwards.
+        
+        Args:
+            chunks: Pieces of one text (e.g. successive file reads)
+            stream: Optional stream to feed (a new one by default)
+            
+        Yields:
+            StreamedIndicator for the first occurrence of each indicator
+        """
+        stream = stream or self.open_stream()
+        for chunk in chunks:
+            yield from stream.feed(chunk)
+        yield from stream.close()
+    
+    def extract_stream(self, chunks: Iterable[str]) -> Dict:
+        """
+        Extract all intelligence from text arriving in chunks
+        
+        Args:
+            chunks: Pieces of one text
+            
+        Returns:
+            Dict with extracted intelligence (same as extract_intelligence
+            on the whole text as one message)
+        """
+        stream = self.open_stream()
+        for _ in self.stream_indicators(chunks, stream):
+            pass
+        return stream.intelligence()
     
     def get_scammer_tactics(self, intelligence: Dict) -> str:
         """
@@ -155,3 +440,49 @@ def extract_intelligence(conversation_history: List[Dict]) -> Dict:
 def get_tactics_summary(intelligence: Dict) -> str:
     """Convenience function"""
     return extractor.get_scammer_tactics(intelligence)
+
+
+def read_chunks(file, chunk_size: int = None) -> Iterator[str]:
+    """Read an open text file in chunks of chunk_size characters"""
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    import argparse
+    import json
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Stream intelligence out of large text/SMS exports as NDJSON")
+    parser.add_argument("files", nargs="+", help="text files to scan ('-' for stdin)")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="characters read at a time")
+    parser.add_argument("--summary-only", action="store_true", help="print only the final intelligence per file")
+    args = parser.parse_args()
+
+    for path in args.files:
+        start = time.perf_counter()
+        stream = extractor.open_stream()
+        file = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+        try:
+            for indicator in extractor.stream_indicators(read_chunks(file, args.chunk_size), stream):
+                if not args.summary_only:
+                    print(json.dumps({"file": path, **indicator._asdict()}, ensure_ascii=True))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        elapsed = time.perf_counter() - start
+        print(json.dumps({
+            "file": path,
+            "characters": stream.characters,
+            "seconds": round(elapsed, 3),
+            "intelligence": stream.intelligence()
+        }, ensure_ascii=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Fake LLM Module - Local stand-in for the Gemini model in benchmarks and tests
+
+Run as a script to serve the Gemini REST API locally, then point the agent
+at it with LLM_BACKEND=gemini-http and LLM_BASE_URL:
+
+    python fake_llm.py --port 8089 --latency 0.8 --distribution lognormal --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Latency shapes FakeModel can draw from
+DISTRIBUTIONS = ("fixed", "lognormal")
+
+
+class FakeLLMError(Exception):
+    """Injected model failure (the stand-in server answers 503 UNAVAILABLE)"""
+
+
+class FakeResponse:
+    """Mimics the `text` attribute of a Gemini response"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """Mimics an async streamed Gemini response: chunks spread over a delay"""
+
+    def __init__(self, chunks: List[str], seconds: float):
+        self._chunks = chunks
+        self._gap = seconds / max(1, len(chunks) - 1)
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        for position, chunk in enumerate(self._chunks):
+            if position:
+                await asyncio.sleep(self._gap)
+            yield FakeResponse(chunk)
+
+
+class FakeModel:
+    """Drop-in for genai.GenerativeModel with a configurable latency
+
+    generate_content sleeps (blocking, like the real client) and
+    generate_content_async awaits; both return a canned reply. With
+    stream=True the async call returns after first_token seconds and the
+    reply's words arrive over the rest of the latency. Set async_client=False
+    to exercise the thread pool path, and batch_client=True to add a
+    generate_content_batch_async call answering several prompts in one round
+    trip (latency plus batch_item_cost per extra prompt). With echo=True each
+    reply quotes the prompt's last scammer line, so callers can check that
+    replies reach the request that asked.
+
+    Latency is either fixed (latency plus up to jitter) or lognormal around a
+    median of latency with spread sigma; slow_rate of the calls take
+    slow_latency instead, for a heavy tail. error_rate of the calls raise
+    FakeLLMError after first_token seconds, like a quickly rejected request.
+    """
+
+    REPLIES = [
+        "Wait, why would my account be blocked?",
+        "Hmm, which bank did you say you are from?",
+        "How do I know this is really from my bank?",
+        "That doesn't sound right. Can you explain?",
+    ]
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, async_client: bool = True, seed: Optional[int] = None,
+                 first_token: Optional[float] = None, batch_client: bool = False, batch_item_cost: float = 0.0,
+                 echo: bool = False, distribution: str = "fixed", sigma: float = 0.5, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds each call takes
+            jitter: Extra random seconds added per call (0 to jitter)
+            async_client: Whether to expose generate_content_async
+            seed: Seed for reply choice and jitter
+            first_token: Seconds until a streamed call's first chunk (defaults to a quarter of latency)
+            batch_client: Whether to expose generate_content_batch_async
+            batch_item_cost: Extra seconds per additional prompt in a batch call
+            echo: Reply with "You said: <last scammer line>" instead of a canned reply
+            distribution: "fixed" or "lognormal" latency
+            sigma: Spread of the lognormal distribution
+            error_rate: Share of calls that fail
+            slow_rate: Share of calls that take slow_latency instead
+            slow_latency: Seconds a slow call takes
+        """
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {distribution!r}")
+        self.latency = latency
+        self.jitter = jitter
+        self.first_token = latency / 4 if first_token is None else first_token
+        self.batch_item_cost = batch_item_cost
+        self.echo = echo
+        self.distribution = distribution
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.prompts = 0
+        self.errors = 0
+        if not async_client:
+            self.generate_content_async = None
+        if not batch_client:
+            self.generate_content_batch_async = None
+
+    def _delay(self) -> float:
+        """Seconds the next call takes; raises FakeLLMError for an injected failure"""
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            raise FakeLLMError("The model is overloaded. Please try again later.")
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            return self.slow_latency
+        if self.distribution == "lognormal":
+            return self._random.lognormvariate(math.log(max(self.latency, 1e-6)), self.sigma)
+        return self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+
+    def _fail_fast(self) -> float:
+        return min(self.first_token, self.latency)
+
+    def _reply(self, prompt: str) -> str:
+        if self.echo:
+            said = [line for line in prompt.splitlines() if line.startswith("Scammer: ")]
+            return "You said: " + (said[-1][len("Scammer: "):] if said else "")
+        return self._random.choice(self.REPLIES)
+
+    def generate_content(self, prompt: str, generation_config=None) -> FakeResponse:
+        self.calls += 1
+        self.prompts += 1
+        try:
+            delay = self._delay()
+        except FakeLLMError:
+            time.sleep(self._fail_fast())
+            raise
+        time.sleep(delay)
+        return FakeResponse(self._reply(prompt))
+
+    async def generate_content_async(self, prompt: str, generation_config=None, stream: bool = False):
+        self.calls += 1
+        self.prompts += 1
+        try:
+            delay = self._delay()
+        except FakeLLMError:
+            await asyncio.sleep(self._fail_fast())
+            raise
+        reply = self._reply(prompt)
+        if not stream:
+            await asyncio.sleep(delay)
+            return FakeResponse(reply)
+        first_token = min(self.first_token, delay)
+        await asyncio.sleep(first_token)
+        return FakeStream(re.findall(r"\S+\s*", reply), delay - first_token)
+
+    async def generate_content_batch_async(self, prompts: List[str], generation_config=None) -> List[FakeResponse]:
+        self.calls += 1
+        self.prompts += len(prompts)
+        try:
+            delay = self._delay()
+        except FakeLLMError:
+            await asyncio.sleep(self._fail_fast())
+            raise
+        await asyncio.sleep(delay + self.batch_item_cost * (len(prompts) - 1))
+        return [FakeResponse(self._reply(prompt)) for prompt in prompts]
+
+
+def _candidate(text: str, finished: bool = True) -> Dict:
+    """generateContent response body carrying text"""
+    candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    return {"candidates": [candidate]}
+
+
+def create_fake_gemini_app(model: FakeModel) -> FastAPI:
+    """
+    Serve a FakeModel over the Gemini REST API
+
+    Implements POST /v1beta/models/{model}:generateContent and
+    :streamGenerateContent?alt=sse with Gemini's response and error bodies
+    (injected failures answer 503 UNAVAILABLE), plus GET /stats with the
+    model's call counters. The API key header is accepted and ignored.
+
+    Args:
+        model: Stand-in deciding latency, failures and reply text
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(title="Fake Gemini")
+
+    def unavailable(error: Exception) -> JSONResponse:
+        return JSONResponse(status_code=503,
+                            content={"error": {"code": 503, "message": str(error), "status": "UNAVAILABLE"}})
+
+    @app.post("/v1beta/models/{target}")
+    async def generate(target: str, request: Request):
+        _, _, method = target.partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unknown method {method!r}",
+                                                                    "status": "NOT_FOUND"}})
+        body = await request.json()
+        prompt = "\n".join(part.get("text", "") for content in body.get("contents", [])
+                           for part in content.get("parts", []))
+        config = body.get("generationConfig")
+        try:
+            if method == "generateContent":
+                response = await model.generate_content_async(prompt, generation_config=config)
+                return JSONResponse(_candidate(response.text))
+            stream = await model.generate_content_async(prompt, generation_config=config, stream=True)
+        except FakeLLMError as e:
+            return unavailable(e)
+
+        async def events():
+            async for chunk in stream:
+                yield f"data: {json.dumps(_candidate(chunk.text, finished=False))}\r\n\r\n"
+            yield f"data: {json.dumps(_candidate(''))}\r\n\r\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": model.calls, "prompts": model.prompts, "errors": model.errors}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a fake Gemini REST API for offline load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per reply (median for lognormal)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per reply (fixed)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--sigma", type=float, default=0.5, help="spread of the lognormal latency")
+    parser.add_argument("--first-token", type=float, default=None, help="seconds until the first streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of calls taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stand_in = FakeModel(latency=args.latency, jitter=args.jitter, seed=args.seed, first_token=args.first_token,
+                         distribution=args.distribution, sigma=args.sigma, error_rate=args.error_rate,
+                         slow_rate=args.slow_rate, slow_latency=args.slow_latency)
+    uvicorn.run(create_fake_gemini_app(stand_in), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,210 @@
+"""
+Indicator Index Module - Cross-session inverted index of extracted indicators
+"""
+
+import re
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Intelligence keys that identify a scammer across sessions (keywords and
+# tactics are shared by every campaign, so they are not indexed)
+INDEXED_KINDS = ("bankAccounts", "upiIds", "phishingLinks", "phoneNumbers")
+
+# Lookup aliases for the indexed kinds
+KIND_ALIASES = {
+    "account": "bankAccounts",
+    "bank": "bankAccounts",
+    "upi": "upiIds",
+    "url": "phishingLinks",
+    "link": "phishingLinks",
+    "phone": "phoneNumbers",
+}
+
+_NON_DIGITS_RE = re.compile(r"\D")
+_SEPARATORS_RE = re.compile(r"[\s-]")
+_URL_PREFIX_RE = re.compile(r"^(?:https?://)?(?:www\.)?", re.IGNORECASE)
+
+
+def resolve_kind(kind: str) -> Optional[str]:
+    """Indexed intelligence key for a kind or alias (None if not indexed)"""
+    if kind in INDEXED_KINDS:
+        return kind
+    return KIND_ALIASES.get(kind.lower())
+
+
+def normalize_indicator(kind: str, value: str) -> str:
+    """
+    Canonical form of an indicator, so spelling variants share one entry
+
+    Phone numbers keep their last 10 digits (dropping +91 / 0 prefixes and
+    separators), accounts drop separators and are uppercased, UPI IDs are
+    lowercased, and links lose their scheme, "www." and trailing slash or
+    punctuation.
+
+    Args:
+        kind: Intelligence key (e.g. "upiIds") or alias (e.g. "upi")
+        value: Indicator as extracted or typed by an analyst
+
+    Returns:
+        Normalized indicator ("" if nothing is left)
+    """
+    kind = resolve_kind(kind) or kind
+    value = value.strip()
+    if kind == "phoneNumbers":
+        digits = _NON_DIGITS_RE.sub("", value)
+        return digits[-10:] if len(digits) > 10 else digits
+    if kind == "bankAccounts":
+        return _SEPARATORS_RE.sub("", value).upper()
+    if kind == "upiIds":
+        return value.lower()
+    if kind == "phishingLinks":
+        return _URL_PREFIX_RE.sub("", value).rstrip("/.,;:!?)'\"").lower()
+    return value
+
+
+class IndicatorEntry:
+    """Sessions that reported one indicator, and when"""
+
+    __slots__ = ("first_seen", "last_seen", "sessions")
+
+    def __init__(self):
+        self.first_seen: Optional[str] = None
+        self.last_seen: Optional[str] = None
+        # session_id -> when the session first reported it (insertion ordered)
+        self.sessions: Dict[str, Optional[str]] = {}
+
+    def record(self, session_id: str, seen_at: Optional[str]):
+        """Merge one sighting (order independent, so loads may interleave with updates)"""
+        if session_id not in self.sessions:
+            self.sessions[session_id] = seen_at
+        else:
+            current = self.sessions[session_id]
+            if seen_at and (current is None or seen_at < current):
+                self.sessions[session_id] = seen_at
+        if seen_at:
+            if self.first_seen is None or seen_at < self.first_seen:
+                self.first_seen = seen_at
+            if self.last_seen is None or seen_at > self.last_seen:
+                self.last_seen = seen_at
+
+
+class IndicatorIndex:
+    """In-memory map from normalized indicator to the sessions that used it
+
+    One dict per kind keyed by the normalized value, so a lookup is a
+    normalization plus one hash probe regardless of index size. Timestamps
+    are ISO strings (as stored in SQLite), compared lexicographically.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, IndicatorEntry]] = {kind: {} for kind in INDEXED_KINDS}
+        self._lock = threading.Lock()
+        self.lookups = 0
+
+    def record(self, session_id: str, kind: str, value: str, seen_at: Optional[str] = None) -> bool:
+        """
+        Add one sighting of an indicator
+
+        Args:
+            session_id: Session that reported the indicator
+            kind: Intelligence key (non-indexed kinds are ignored)
+            value: Indicator value
+            seen_at: ISO timestamp of the sighting (defaults to now)
+
+        Returns:
+            True if the indicator was indexed
+        """
+        entries = self._entries.get(kind)
+        if entries is None:
+            return False
+        normalized = normalize_indicator(kind, str(value))
+        if not normalized:
+            return False
+        with self._lock:
+            entry = entries.get(normalized)
+            if entry is None:
+                entry = entries[normalized] = IndicatorEntry()
+            entry.record(session_id, seen_at)
+        return True
+
+    def add(self, session_id: str, intelligence: Dict, seen_at: Optional[str] = None) -> int:
+        """
+        Index the indicators of an intelligence dict
+
+        Args:
+            session_id: Session ID
+            intelligence: Dict of intelligence lists (typically a turn's delta)
+            seen_at: ISO timestamp (defaults to now)
+
+        Returns:
+            Number of indicators indexed
+        """
+        seen_at = seen_at or datetime.now().isoformat()
+        count = 0
+        for kind in INDEXED_KINDS:
+            for value in intelligence.get(kind, ()):
+                count += self.record(session_id, kind, value, seen_at)
+        return count
+
+    def load(self, rows: Iterable[Tuple[str, str, str, Optional[str]]]) -> int:
+        """Index (session_id, kind, value, seen_at) rows, returning how many were indexed"""
+        count = 0
+        for session_id, kind, value, seen_at in rows:
+            count += self.record(session_id, kind, value, seen_at)
+        return count
+
+    def lookup(self, value: str, kind: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        Find the sessions that reported an indicator
+
+        Args:
+            value: Indicator as typed (normalized the same way as on insert)
+            kind: Intelligence key or alias; None checks every indexed kind
+                  (an unknown kind matches nothing)
+            limit: Maximum session IDs listed per match (oldest first)
+
+        Returns:
+            One dict per matching kind with the normalized indicator,
+            first/last seen times, session count and session IDs
+        """
+        if kind:
+            kinds = (resolve_kind(kind),)
+            if kinds[0] is None:
+                return []
+        else:
+            kinds = INDEXED_KINDS
+        matches = []
+        with self._lock:
+            self.lookups += 1
+            for key in kinds:
+                normalized = normalize_indicator(key, value)
+                entry = self._entries[key].get(normalized) if normalized else None
+                if entry is None:
+                    continue
+                sessions = list(islice(entry.sessions, limit))
+                matches.append({
+                    "kind": key,
+                    "indicator": normalized,
+                    "first_seen": entry.first_seen,
+                    "last_seen": entry.last_seen,
+                    "session_count": len(entry.sessions),
+                    "sessions": sessions
+                })
+        return matches
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def stats(self) -> Dict:
+        """Snapshot of entry counts per kind"""
+        return {
+            "indicators": len(self),
+            "by_kind": {kind: len(entries) for kind, entries in self._entries.items()},
+            "lookups": self.lookups
+        }
+
+
+# Singleton instance
+indicator_index = IndicatorIndex()
@@ -0,0 +1,187 @@
+"""
+Indicator Scanner Module - Single-pass regex scan for scam indicators
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class IndicatorMatch(NamedTuple):
+    """A typed indicator found in a message"""
+    kind: str       # email / url / phone / account / upi
+    value: str
+    start: int
+    end: int
+    variant: str    # name of the alternative that matched
+
+
+_PHONE_ALTERNATIVES = (
+    r"(?P<phone_intl>\+91\d{10})"
+    r"|(?P<phone_run>\b\d{10,}\b)"
+    r"|(?P<phone>\(?\d{3}-?\d{3}-?\d{4}\)?)"
+)
+
+# Named alternatives, tried left to right at each position. More specific
+# shapes come first so e.g. an email address is not also reported as a UPI
+# handle, and an account number is not also reported as a phone number.
+# The lookbehinds on email/UPI only let those alternatives start at the
+# beginning of a token, which avoids re-scanning every word suffix.
+FUSED_PATTERN = re.compile(
+    r"(?P<url>https?://[^\s]+)"
+    r"|(?P<url_www>www\.[^\s]+)"
+    r"|(?P<email>(?<![\w.%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})"
+    r"|(?P<upi>(?<![\w.-])[\w.-]+@[a-zA-Z]{3,})"
+    r"|(?P<account>[A-Z]{2}\d{10,})"
+    r"|(?P<card>\d{4}[\s-]\d{4}[\s-]\d{4}[\s-]\d{4})"
+    r"|" + _PHONE_ALTERNATIVES
+)
+
+# Fused matches never overlap, but a phone number inside a link, UPI ID or
+# email (9876543210@paytm) is still a phone number: these spans are rescanned
+# with the phone alternatives alone
+PHONE_PATTERN = re.compile(_PHONE_ALTERNATIVES)
+_PHONE_CARRIERS = frozenset({"url", "url_www", "email", "upi"})
+
+# Alternative (group) name -> indicator kind
+VARIANT_KINDS = {
+    "url": "url",
+    "url_www": "url",
+    "email": "email",
+    "upi": "upi",
+    "account": "account",
+    "card": "account",
+    "phone_intl": "phone",
+    "phone_run": "phone",
+    "phone": "phone",
+}
+
+# Indicator kind -> key used in the extracted intelligence output
+INTELLIGENCE_KEYS = {
+    "phone": "phoneNumbers",
+    "account": "bankAccounts",
+    "upi": "upiIds",
+    "url": "phishingLinks",
+    "email": "emails",
+}
+
+
+# Every alternative needs a digit, "@", "http" or "www." and stays within one
+# whitespace-delimited token, except card numbers (digit groups separated by
+# single whitespace characters). Whitespace-delimited tokens holding one of
+# those anchors are the only places a match can be.
+_ANCHOR_TOKEN_RE = re.compile(r"(?<!\S)\S*?(?:[\d@]|http|www\.)\S*")
+_TOKEN_REST_RE = re.compile(r"\S*")
+
+
+def iter_fused_matches(text: str, pos: int = 0, endpos: Optional[int] = None) -> Iterator[re.Match]:
+    """
+    Same matches as FUSED_PATTERN.finditer(text, pos, endpos), faster on long text
+
+    Plain words are skipped by a cheap token prefilter and the fused pattern
+    only runs over windows of anchored tokens (adjacent ones merged, so card
+    numbers stay whole). pos must be a point where a full scan would resume,
+    e.g. 0 or the end of a previous match.
+
+    Args:
+        text: Text to scan
+        pos: Index to start at
+        endpos: Index to stop at (defaults to the end of text)
+
+    Yields:
+        re.Match objects of FUSED_PATTERN in order of occurrence
+    """
+    if endpos is None:
+        endpos = len(text)
+    window_start = window_end = None
+    if 0 < pos < endpos and not text[pos - 1].isspace():
+        # pos is inside a token the prefilter (which starts at token starts) would miss
+        window_start, window_end = pos, _TOKEN_REST_RE.match(text, pos, endpos).end()
+    for token in _ANCHOR_TOKEN_RE.finditer(text, window_end or pos, endpos):
+        if window_end is not None and token.start() - window_end <= 1:
+            window_end = token.end()
+            continue
+        if window_end is not None:
+            yield from FUSED_PATTERN.finditer(text, window_start, window_end)
+        window_start, window_end = token.start(), token.end()
+    if window_end is not None:
+        yield from FUSED_PATTERN.finditer(text, window_start, window_end)
+
+
+def iter_nested_phones(text: str, match: re.Match) -> Iterator[re.Match]:
+    """
+    Phone numbers inside a fused link, UPI ID or email match
+
+    Args:
+        text: Text the match was found in
+        match: FUSED_PATTERN match
+
+    Yields:
+        PHONE_PATTERN matches within the match's span
+    """
+    if match.lastgroup in _PHONE_CARRIERS:
+        yield from PHONE_PATTERN.finditer(text, match.start(), match.end())
+
+
+def token_end(text: str, pos: int) -> int:
+    """End of the whitespace-delimited token running on from pos"""
+    return _TOKEN_REST_RE.match(text, pos).end()
+
+
+class IndicatorScanner:
+    """Finds emails, URLs, phone numbers, accounts and UPI IDs in one finditer pass"""
+
+    def __init__(self, pattern: re.Pattern = FUSED_PATTERN, cache_size: int = 2048):
+        self.pattern = pattern
+        # The detector and the extractor both look at the current message in
+        # the same request; memoizing by text means it is regex-scanned once.
+        self._cached_scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    def _scan(self, text: str) -> Tuple[IndicatorMatch, ...]:
+        matches = []
+        matches_iter = iter_fused_matches(text) if self.pattern is FUSED_PATTERN else self.pattern.finditer(text)
+        for match in matches_iter:
+            variant = match.lastgroup
+            matches.append(IndicatorMatch(VARIANT_KINDS[variant], match.group(), match.start(), match.end(), variant))
+            for phone in iter_nested_phones(text, match):
+                matches.append(IndicatorMatch("phone", phone.group(), phone.start(), phone.end(), phone.lastgroup))
+        return tuple(matches)
+
+    def scan(self, text: str) -> Tuple[IndicatorMatch, ...]:
+        """
+        Scan text for all indicators
+
+        Args:
+            text: Message text (original case)
+
+        Returns:
+            Tuple of IndicatorMatch in order of occurrence, including the
+            phone numbers inside links, UPI IDs and emails
+        """
+        if not text:
+            return ()
+        return self._cached_scan(text)
+
+    def group_by_kind(self, matches) -> Dict[str, List[str]]:
+        """
+        Group matched values by indicator kind, de-duplicated in order
+
+        Args:
+            matches: Iterable of IndicatorMatch
+
+        Returns:
+            Dict of kind -> list of unique values
+        """
+        grouped: Dict[str, Dict[str, None]] = {}
+        for match in matches:
+            grouped.setdefault(match.kind, {})[match.value] = None
+        return {kind: list(values) for kind, values in grouped.items()}
+
+
+# Singleton instance
+scanner = IndicatorScanner()
+
+
+def scan_indicators(text: str) -> Tuple[IndicatorMatch, ...]:
+    """Convenience function"""
+    return scanner.scan(text)
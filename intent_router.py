@@ -0,0 +1,240 @@
+"""
+Intent Router Module - Declarative stage/intent rules for scripted replies
+
+Rules live in intent_rules.json: per conversation stage, an ordered list of
+intents (keywords + reply) and a default reply, plus the keywords and limits
+of the continue decision. Every keyword of the table is compiled into one
+Aho-Corasick automaton, so a message is scanned once for both the routing and
+the continue decision, and an edited file is picked up without a restart.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from keyword_engine import KeywordAutomaton
+from text_analysis import MessageAnalysis, analyze, fold
+
+INTENT_RULES_PATH = os.getenv(
+    "INTENT_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_rules.json")
+)
+# Seconds between checks of the rules file for changes (0 disables reload)
+INTENT_RULES_POLL_SECONDS = float(os.getenv("INTENT_RULES_POLL_SECONDS", 5))
+
+
+class IntentRoute(NamedTuple):
+    """Scripted reply chosen for a message"""
+    stage: str
+    intent: Optional[str]  # None when the stage default was used
+    reply: str
+
+
+class _Stage:
+    """One conversation stage: (keyword, rule rank) probes in rule order"""
+
+    __slots__ = ("name", "max_turns", "intents", "replies", "default", "probes", "ranks")
+
+    def __init__(self, name: str, max_turns: Optional[int], default: str):
+        self.name = name
+        self.max_turns = max_turns
+        self.default = default
+        self.intents: List[str] = []
+        self.replies: List[str] = []
+        # A keyword listed by several rules only probes for the first one
+        self.probes: Tuple[Tuple[str, int], ...] = ()
+        # Automaton keyword index -> rule rank, for this stage's probes
+        self.ranks: Dict[int, int] = {}
+
+
+class IntentRules:
+    """Compiled rule table (immutable once built, swapped as a whole)"""
+
+    def __init__(self, data: Dict, source: str = "<rules>"):
+        """
+        Args:
+            data: Parsed rules document
+            source: Name used in error messages
+
+        Raises:
+            ValueError: If the document is not a valid rule table
+        """
+        self.version = data.get("version") if isinstance(data, dict) else None
+        if not isinstance(self.version, str) or not self.version:
+            raise ValueError(f"Intent rules {source} have no version")
+
+        def folded(keyword) -> str:
+            if not isinstance(keyword, str) or not keyword.strip():
+                raise ValueError(f"Intent rules {source} have an empty keyword")
+            # Messages are matched in folded form (see text_analysis.fold)
+            return fold(keyword)
+
+        stages = data.get("stages")
+        if not isinstance(stages, list) or not stages:
+            raise ValueError(f"Intent rules {source} have no stages")
+        self.stages: List[_Stage] = []
+        for position, spec in enumerate(stages):
+            if not isinstance(spec, dict) or not isinstance(spec.get("default"), str):
+                raise ValueError(f"Intent rules {source} stage {position} needs a default reply")
+            max_turns = spec.get("max_turns")
+            if max_turns is None and position != len(stages) - 1:
+                raise ValueError(f"Intent rules {source}: only the last stage may omit max_turns")
+            stage = _Stage(str(spec.get("name", position)), max_turns, spec["default"])
+            ranks: Dict[str, int] = {}
+            for rule in spec.get("rules", []):
+                if not isinstance(rule, dict) or not isinstance(rule.get("reply"), str):
+                    raise ValueError(f"Intent rules {source} stage {stage.name} has a rule without a reply")
+                rank = len(stage.replies)
+                stage.intents.append(str(rule.get("intent", rank)))
+                stage.replies.append(rule["reply"])
+                for keyword in rule.get("keywords", []):
+                    ranks.setdefault(folded(keyword), rank)
+            stage.probes = tuple(ranks.items())
+            self.stages.append(stage)
+
+        spec = data.get("continue", {})
+        self.max_messages = spec.get("max_messages")
+        self.continue_default = bool(spec.get("default", True))
+        self.continue_keywords = tuple(dict.fromkeys(folded(keyword) for keyword in spec.get("keywords", [])))
+
+        # One automaton over every stage's probes and the continue keywords
+        keywords = dict.fromkeys(keyword for stage in self.stages for keyword, _ in stage.probes)
+        keywords.update(dict.fromkeys(self.continue_keywords))
+        self.automaton = KeywordAutomaton({keyword: 0.0 for keyword in keywords}, version=self.version)
+        index_of = {keyword: index for index, keyword in enumerate(self.automaton.keywords)}
+        for stage in self.stages:
+            stage.ranks = {index_of[keyword]: rank for keyword, rank in stage.probes}
+        self.continue_indices = frozenset(index_of[keyword] for keyword in self.continue_keywords)
+        # Last scanned text and its keyword hits: route() and should_continue()
+        # for the same message share one pass
+        self._last: Tuple[Optional[str], List[int]] = (None, [])
+
+    @classmethod
+    def load(cls, path: str) -> "IntentRules":
+        """Read and compile a rules file"""
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls(json.load(handle), source=path)
+
+    def stage_for(self, turn_count: int) -> _Stage:
+        """Stage of a conversation with turn_count earlier messages"""
+        for stage in self.stages:
+            if stage.max_turns is None or turn_count <= stage.max_turns:
+                return stage
+        return self.stages[-1]
+
+    def matches(self, analysis: MessageAnalysis) -> List[int]:
+        """Automaton keyword indices present in a message (one pass, memoized for the last message)"""
+        text = analysis.folded
+        last = self._last
+        if last[0] != text:
+            last = (text, self.automaton.matched_indices(text))
+            self._last = last
+        return last[1]
+
+    def route(self, analysis: MessageAnalysis, turn_count: int) -> IntentRoute:
+        """Scripted reply for a message: the stage's first rule with a matching keyword"""
+        stage = self.stage_for(turn_count)
+        ranks = stage.ranks
+        hits = [ranks[index] for index in self.matches(analysis) if index in ranks]
+        if hits:
+            rank = min(hits)
+            return IntentRoute(stage.name, stage.intents[rank], stage.replies[rank])
+        return IntentRoute(stage.name, None, stage.default)
+
+    def should_continue(self, analysis: MessageAnalysis, message_count: int) -> bool:
+        """Continue decision: stop at max_messages, continue on a keyword, else the default"""
+        if self.max_messages is not None and message_count >= self.max_messages:
+            return False
+        if not self.continue_indices.isdisjoint(self.matches(analysis)):
+            return True
+        return self.continue_default
+
+
+class IntentRouter:
+    """Serves the active rule table, recompiling it when the file changes
+
+    The file's identity is checked at most every poll_seconds. A file that
+    fails to compile keeps the previous table active.
+    """
+
+    def __init__(self, path: str = None, poll_seconds: float = None):
+        """
+        Args:
+            path: Rules file (defaults to INTENT_RULES_PATH)
+            poll_seconds: Override for INTENT_RULES_POLL_SECONDS
+        """
+        self.path = path or INTENT_RULES_PATH
+        self.poll_seconds = INTENT_RULES_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._checked_at = time.monotonic()
+        self.rules = IntentRules.load(self.path)
+        self.loads = 1
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def reload(self) -> str:
+        """Recompile the rules file now, returning its version"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stamp = self._file_stamp()
+            self.rules = IntentRules.load(self.path)
+            self._stamp = stamp
+            self.loads += 1
+            return self.rules.version
+
+    def _current(self) -> IntentRules:
+        """The active table, recompiled first if the file changed"""
+        if self.poll_seconds > 0 and time.monotonic() - self._checked_at >= self.poll_seconds:
+            self._checked_at = time.monotonic()
+            stamp = self._file_stamp()
+            if stamp != self._stamp:
+                try:
+                    version = self.reload()
+                    print(f"✓ Loaded intent rules version {version}")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Warning: Keeping intent rules {self.rules.version}, reload failed: {e}")
+                    self._stamp = stamp
+        return self.rules
+
+    def stage(self, turn_count: int) -> str:
+        """Name of the conversation stage after turn_count messages"""
+        return self._current().stage_for(turn_count).name
+
+    def route(self, message: Union[str, MessageAnalysis], turn_count: int) -> IntentRoute:
+        """
+        Pick the scripted reply for a message
+
+        Args:
+            message: Scammer message (text or its shared analysis)
+            turn_count: Messages earlier in the conversation
+
+        Returns:
+            IntentRoute with the stage, matched intent and reply
+        """
+        return self._current().route(analyze(message), turn_count)
+
+    def should_continue(self, message: Union[str, MessageAnalysis], message_count: int) -> bool:
+        """Whether to keep engaging after message_count messages"""
+        return self._current().should_continue(analyze(message), message_count)
+
+    def stats(self) -> Dict:
+        """Snapshot of the active table"""
+        rules = self._current()
+        return {
+            "path": self.path,
+            "version": rules.version,
+            "stages": [stage.name for stage in rules.stages],
+            "probes": sum(len(stage.probes) for stage in rules.stages) + len(rules.continue_keywords),
+            "loads": self.loads
+        }
+
+
+# Singleton instance
+intent_router = IntentRouter()
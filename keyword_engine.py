@@ -0,0 +1,154 @@
+"""
+Keyword Engine Module - Multi-pattern keyword matching in a single pass
+"""
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class KeywordHit(NamedTuple):
+    """A single keyword occurrence found in the scanned text"""
+    start: int
+    end: int
+    keyword: str
+    weight: float
+    index: int
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton compiled from a weighted keyword lexicon
+
+    The automaton is built once and then finds every keyword occurrence
+    (including overlapping ones) in a single left-to-right pass over the
+    text, instead of one substring scan per keyword.
+    """
+
+    def __init__(self, keywords: Dict[str, float], version: str = ""):
+        """
+        Compile the automaton
+
+        Args:
+            keywords: Mapping of keyword -> weight. Iteration order is kept
+                      as the keyword index so callers can reproduce the
+                      lexicon order of the original dict.
+            version: Optional lexicon version tag
+        """
+        self.version = version
+        self.keywords: List[str] = list(keywords.keys())
+        self.weights: List[float] = [keywords[k] for k in self.keywords]
+
+        # Trie: one transition dict per state, state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._output.append(())
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state] = self._output[state] + (index,)
+
+        self._build_transitions()
+
+    def _build_transitions(self):
+        """Compute failure links and fold them into a full transition table"""
+        fail = [0] * len(self._goto)
+        queue = deque()
+
+        for state in self._goto[0].values():
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[fail[next_state]]
+
+        # Breadth-first order guarantees a state's failure target is complete
+        # before the state itself, so each state can inherit its fallback's
+        # transitions. Afterwards matching never has to follow failure links.
+        order = []
+        queue.append(0)
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            queue.extend(self._goto[state].values())
+
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in range(len(self._goto) - 1)]
+        for state in order[1:]:
+            inherited = dict(self._delta[fail[state]])
+            inherited.update(self._goto[state])
+            self._delta[state] = inherited
+
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states (trie nodes)"""
+        return len(self._goto)
+
+    def iter_matches(self, text: str):
+        """
+        Yield every keyword occurrence in text
+
+        Args:
+            text: Text to scan (already lowercased by the caller)
+
+        Yields:
+            (end_position, keyword_index) pairs, end_position exclusive
+        """
+        delta = self._delta
+        output = self._output
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for index in output[state]:
+                    yield position + 1, index
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """
+        Find all keyword occurrences with their weights and positions
+
+        Args:
+            text: Text to scan (already lowercased by the caller)
+
+        Returns:
+            List of KeywordHit in order of occurrence
+        """
+        keywords = self.keywords
+        weights = self.weights
+        return [
+            KeywordHit(end - len(keywords[index]), end, keywords[index], weights[index], index)
+            for end, index in self.iter_matches(text)
+        ]
+
+    def matched_indices(self, text: str) -> List[int]:
+        """
+        Get the distinct keyword indices present in text, in lexicon order
+
+        Args:
+            text: Text to scan (already lowercased by the caller)
+
+        Returns:
+            Sorted list of keyword indices
+        """
+        delta = self._delta
+        output = self._output
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return sorted(found)
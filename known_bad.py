@@ -0,0 +1,292 @@
+"""
+Known-Bad Indicator Module - Blocklist feed lookups over a memory-mapped file
+
+Feeds are compiled into a sorted array of 64-bit indicator hashes:
+
+    python known_bad.py build data/known_bad.bin feed.csv [--kind upi ...]
+
+Input lines are "kind,value" (kind: upi, phone, account, domain or url), or
+bare values when --kind is given. The file is memory-mapped read-only, so
+every uvicorn worker shares the same page-cache copy, and replaced files
+(written atomically by the builder) are picked up without a restart.
+"""
+
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from indicator_index import normalize_indicator, resolve_kind
+
+KNOWN_BAD_PATH = os.getenv("KNOWN_BAD_PATH", os.path.join("data", "known_bad.bin"))
+# Seconds between checks of the feed file for a new version (0 disables)
+KNOWN_BAD_POLL_SECONDS = float(os.getenv("KNOWN_BAD_POLL_SECONDS", 5))
+
+_MAGIC = b"HPKBAD01"
+_HEADER_SIZE = 16  # magic + little-endian uint64 entry count
+# Hashes sorted per run while building; runs are then merged into the file
+_BUILD_RUN_SIZE = 1 << 20
+
+# Intelligence keys checked against the feed; links are checked by domain
+CHECKED_KINDS = ("bankAccounts", "upiIds", "phoneNumbers", "phishingLinks")
+
+
+def indicator_hash(kind: str, normalized: str) -> int:
+    """Stable 64-bit hash of a normalized indicator"""
+    digest = hashlib.blake2b(f"{kind}\0{normalized}".encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def link_domains(link: str) -> List[str]:
+    """Host of a link and its parent domains (most specific first)"""
+    host = normalize_indicator("phishingLinks", link).split("/", 1)[0]
+    host = host.split("?", 1)[0].split("#", 1)[0].rsplit("@", 1)[-1].split(":", 1)[0]
+    labels = [label for label in host.split(".") if label]
+    return [".".join(labels[i:]) for i in range(len(labels) - 1)] or labels
+
+
+def feed_hashes(kind: str, value: str) -> List[int]:
+    """Hashes a feed entry is stored under (empty for unknown kinds)"""
+    kind = kind.strip().lower()
+    if kind == "domain":
+        return [indicator_hash("domain", value.strip().lower().lstrip("."))]
+    key = resolve_kind(kind)
+    if key == "phishingLinks":
+        domains = link_domains(value)
+        return [indicator_hash("domain", domains[0])] if domains else []
+    if key is None:
+        return []
+    normalized = normalize_indicator(key, value)
+    return [indicator_hash(key, normalized)] if normalized else []
+
+
+def _lookup_hashes(kind: str, value: str) -> List[int]:
+    """Hashes to probe for an extracted indicator"""
+    if kind == "phishingLinks":
+        return [indicator_hash("domain", domain) for domain in link_domains(value)]
+    normalized = normalize_indicator(kind, value)
+    return [indicator_hash(kind, normalized)] if normalized else []
+
+
+class _Feed:
+    """One opened feed file: a read-only mapping viewed as sorted uint64s"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapping[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not a known-bad feed file")
+        self.count = int.from_bytes(self.mapping[len(_MAGIC):_HEADER_SIZE], "little")
+        if _HEADER_SIZE + self.count * 8 != len(self.mapping):
+            raise ValueError(f"{path} is truncated")
+        if sys.byteorder != "little":
+            raise ValueError("known-bad feeds are little-endian; this platform is not")
+        self.hashes = memoryview(self.mapping)[_HEADER_SIZE:].cast("Q")
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_left(self.hashes, value)
+        return i < self.count and self.hashes[i] == value
+
+
+class KnownBadFilter:
+    """Checks extracted indicators against the known-bad feed file
+
+    A missing feed simply matches nothing. The file's identity is checked
+    at most every poll_seconds, and a replaced file is mapped and swapped in
+    as a whole; lookups in flight keep using the mapping they started with.
+    """
+
+    def __init__(self, path: str = None, poll_seconds: float = None):
+        """
+        Args:
+            path: Feed file (defaults to KNOWN_BAD_PATH)
+            poll_seconds: Override for KNOWN_BAD_POLL_SECONDS
+        """
+        self.path = path or KNOWN_BAD_PATH
+        self.poll_seconds = KNOWN_BAD_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self._feed: Optional[_Feed] = None
+        self._stamp = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def reload(self) -> int:
+        """Map the feed file now, returning its entry count (0 if missing)"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stamp = self._file_stamp()
+            self._feed = _Feed(self.path) if stamp is not None else None
+            self._stamp = stamp
+            self.loads += 1
+            return self._feed.count if self._feed else 0
+
+    def _current(self) -> Optional[_Feed]:
+        """The active feed, remapped first if the file changed"""
+        checked_at = self._checked_at
+        if checked_at is None or (self.poll_seconds > 0 and time.monotonic() - checked_at >= self.poll_seconds):
+            self._checked_at = time.monotonic()
+            stamp = self._file_stamp()
+            if stamp != self._stamp or checked_at is None:
+                try:
+                    self.reload()
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Warning: Keeping known-bad feed, reload failed: {e}")
+                    self._stamp = stamp
+        return self._feed
+
+    def contains(self, kind: str, value: str) -> bool:
+        """
+        Check one extracted indicator
+
+        Args:
+            kind: Intelligence key (e.g. "upiIds"); other keys never match
+            value: Indicator as extracted (links match on their domain)
+
+        Returns:
+            True if the indicator is in the feed
+        """
+        if kind not in CHECKED_KINDS:
+            return False
+        feed = self._current()
+        if feed is None or not feed.count:
+            return False
+        return any(h in feed for h in _lookup_hashes(kind, str(value)))
+
+    def matches(self, intelligence: Dict) -> List[str]:
+        """Values of an intelligence dict that are in the feed, in key order"""
+        return [
+            value
+            for kind in CHECKED_KINDS
+            for value in intelligence.get(kind, ())
+            if self.contains(kind, value)
+        ]
+
+    def stats(self) -> Dict:
+        """Snapshot of the active feed"""
+        feed = self._current()
+        return {
+            "path": self.path,
+            "entries": feed.count if feed else 0,
+            "loads": self.loads
+        }
+
+
+def build_feed(output_path: str, entries: Iterable[tuple]) -> int:
+    """
+    Compile (kind, value) feed entries into a feed file
+
+    The file is written next to output_path and renamed over it, so
+    running workers never map a half-written feed.
+
+    Args:
+        output_path: Feed file to (re)place
+        entries: (kind, value) pairs
+
+    Returns:
+        Number of distinct entries written
+    """
+    # Hashes are kept as packed uint64 runs (8 bytes each) rather than a set
+    # of Python ints, each run sorted once it is full
+    runs: List[array] = []
+    run = array("Q")
+    for kind, value in entries:
+        run.extend(feed_hashes(kind, value))
+        if len(run) >= _BUILD_RUN_SIZE:
+            runs.append(array("Q", sorted(run)))
+            run = array("Q")
+    if run:
+        runs.append(array("Q", sorted(run)))
+    del run
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{output_path}.tmp{os.getpid()}"
+    count = 0
+    with open(temp_path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(bytes(8))  # entry count, filled in once the merge is done
+        previous = None
+        block = array("Q")
+        for value in heapq.merge(*runs):
+            if value == previous:
+                continue
+            previous = value
+            block.append(value)
+            if len(block) >= _BUILD_RUN_SIZE:
+                count += _write_block(f, block)
+                block = array("Q")
+        count += _write_block(f, block)
+        f.seek(len(_MAGIC))
+        f.write(count.to_bytes(8, "little"))
+    os.replace(temp_path, output_path)
+    return count
+
+
+def _write_block(f, block: array) -> int:
+    """Append sorted hashes to a feed file in its little-endian layout"""
+    if sys.byteorder != "little":
+        block.byteswap()
+    block.tofile(f)
+    return len(block)
+
+
+def _read_entries(paths: List[str], kind: Optional[str]):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if kind:
+                    yield kind, line
+                elif "," in line:
+                    yield tuple(part.strip() for part in line.split(",", 1))
+
+
+# Singleton instance
+known_bad = KnownBadFilter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Known-bad indicator feeds")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="compile feed files into a memory-mappable feed")
+    p.add_argument("output", help="feed file to write (e.g. data/known_bad.bin)")
+    p.add_argument("inputs", nargs="+", help="text feeds with 'kind,value' lines")
+    p.add_argument("--kind", help="kind of every line, for feeds of bare values (upi, phone, account, domain, url)")
+
+    p = sub.add_parser("check", help="check indicators against a feed file")
+    p.add_argument("feed")
+    p.add_argument("kind", help="upi, phone, account or url")
+    p.add_argument("values", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        start = time.perf_counter()
+        count = build_feed(args.output, _read_entries(args.inputs, args.kind))
+        print(f"✓ Wrote {count:,} entries to {args.output} in {time.perf_counter() - start:.1f}s")
+    else:
+        feed = KnownBadFilter(args.feed, poll_seconds=0)
+        kind = resolve_kind(args.kind) or args.kind
+        for value in args.values:
+            print(f"{value}: {'KNOWN BAD' if feed.contains(kind, value) else 'not listed'}")
+
+
+if __name__ == "__main__":
+    main()
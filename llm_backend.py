@@ -0,0 +1,238 @@
+"""
+LLM Backend Module - Pluggable model backends for the engagement agent
+
+A backend is any object with the subset of genai.GenerativeModel the agent
+uses (see LLMBackend), so the Gemini SDK model is used as is. The REST
+backend speaks the Gemini HTTP API directly and can be pointed at the local
+stand-in server in fake_llm.py for offline load tests.
+
+The client libraries are imported when a backend is created, not with this
+module: google.generativeai alone takes most of a second to import.
+"""
+
+import json
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, Protocol
+
+if TYPE_CHECKING:
+    import httpx
+
+# Which backend to use: "gemini" (SDK) or "gemini-http" (REST over httpx)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-pro")
+# REST endpoint of the gemini-http backend (e.g. http://127.0.0.1:8089 for fake_llm.py)
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", GEMINI_BASE_URL)
+# Connections the gemini-http backend keeps open to the API
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 100))
+
+_CONFIG_FIELDS = {"temperature": "temperature", "max_output_tokens": "maxOutputTokens", "top_p": "topP",
+                  "top_k": "topK", "candidate_count": "candidateCount", "stop_sequences": "stopSequences"}
+
+
+def _import_genai():
+    """google.generativeai, or None if it is not installed"""
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        print("Warning: google.generativeai not available, using fallback responses")
+        return None
+    return genai
+
+
+class LLMBackendError(Exception):
+    """A model call the backend reported as failed (HTTP error, blocked prompt, bad response)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LLMResponse:
+    """Reply text in the shape of a Gemini response (and of one streamed chunk)"""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class LLMBackend(Protocol):
+    """Interface between ScamEngagementAgent and a model
+
+    Required:
+        generate_content(prompt, generation_config=None) -> response with .text
+
+    Optional (missing or None when unsupported; the agent falls back):
+        generate_content_async(prompt, generation_config=None, stream=False)
+            -> response with .text, or with stream=True an async iterable of
+               chunks with .text
+        generate_content_batch_async(prompts, generation_config=None)
+            -> list of responses, one per prompt
+
+    generation_config is a dict of snake_case sampling settings
+    (temperature, max_output_tokens, top_p). A backend may also have a
+    name, reported in the agent stats.
+    """
+
+    def generate_content(self, prompt: str, generation_config: Dict = None) -> Any:
+        ...
+
+
+class GeminiHTTPBackend:
+    """Gemini REST API (generateContent / streamGenerateContent) over httpx"""
+
+    name = "gemini-http"
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 model: str = None,
+                 base_url: str = None,
+                 timeout: float = 30.0,
+                 max_connections: int = None):
+        """
+        Args:
+            api_key: API key (sent as x-goog-api-key; the local stand-in ignores it)
+            model: Override for LLM_MODEL
+            base_url: Override for LLM_BASE_URL
+            timeout: HTTP timeout in seconds (the agent applies its own deadline)
+            max_connections: Override for LLM_HTTP_MAX_CONNECTIONS
+
+        Raises:
+            RuntimeError: If httpx is not installed
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("httpx is required for the gemini-http backend")
+        self._httpx = httpx
+        self.model = model or LLM_MODEL
+        self.base_url = (base_url or LLM_BASE_URL).rstrip("/")
+        self._headers = {"x-goog-api-key": api_key} if api_key else {}
+        self._timeout = timeout
+        self._limits = httpx.Limits(max_connections=max_connections or LLM_HTTP_MAX_CONNECTIONS,
+                                    max_keepalive_connections=max_connections or LLM_HTTP_MAX_CONNECTIONS)
+        self._client: Optional["httpx.Client"] = None
+        self._async_client: Optional["httpx.AsyncClient"] = None
+        self._async_loop = None
+
+    def _url(self, method: str) -> str:
+        return f"{self.base_url}/v1beta/models/{self.model}:{method}"
+
+    @staticmethod
+    def _body(prompt: str, generation_config: Optional[Dict]) -> Dict:
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if generation_config:
+            body["generationConfig"] = {_CONFIG_FIELDS.get(key, key): value for key, value in generation_config.items()}
+        return body
+
+    @staticmethod
+    def _text(payload: Dict) -> str:
+        """Reply text of a (streamed chunk of a) generateContent response"""
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            reason = (payload.get("promptFeedback") or {}).get("blockReason", "no candidates")
+            raise LLMBackendError(f"Gemini returned no reply: {reason}")
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def _error(status: int, body: bytes) -> LLMBackendError:
+        try:
+            message = json.loads(body)["error"]["message"]
+        except (ValueError, KeyError, TypeError):
+            message = body[:200].decode("utf-8", "replace")
+        return LLMBackendError(f"Gemini HTTP {status}: {message}", status)
+
+    def _async(self) -> "httpx.AsyncClient":
+        """AsyncClient for the running event loop (connections cannot move between loops)"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = self._httpx.AsyncClient(headers=self._headers, timeout=self._timeout,
+                                                         limits=self._limits)
+            self._async_loop = loop
+        return self._async_client
+
+    def generate_content(self, prompt: str, generation_config: Dict = None) -> LLMResponse:
+        if self._client is None:
+            self._client = self._httpx.Client(headers=self._headers, timeout=self._timeout, limits=self._limits)
+        response = self._client.post(self._url("generateContent"), json=self._body(prompt, generation_config))
+        if response.status_code >= 400:
+            raise self._error(response.status_code, response.content)
+        return LLMResponse(self._text(response.json()))
+
+    async def generate_content_async(self, prompt: str, generation_config: Dict = None, stream: bool = False):
+        client = self._async()
+        body = self._body(prompt, generation_config)
+        if not stream:
+            response = await client.post(self._url("generateContent"), json=body)
+            if response.status_code >= 400:
+                raise self._error(response.status_code, response.content)
+            return LLMResponse(self._text(response.json()))
+
+        request = client.build_request("POST", self._url("streamGenerateContent"), params={"alt": "sse"}, json=body)
+        response = await client.send(request, stream=True)
+        if response.status_code >= 400:
+            content = await response.aread()
+            await response.aclose()
+            raise self._error(response.status_code, content)
+        return _SSEChunks(response)
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "model": self.model, "base_url": self.base_url}
+
+
+class _SSEChunks:
+    """Async iterable of LLMResponse chunks from a streamGenerateContent?alt=sse response"""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+
+    async def __aiter__(self) -> AsyncIterator[LLMResponse]:
+        try:
+            async for line in self._response.aiter_lines():
+                if line.startswith("data:"):
+                    yield LLMResponse(GeminiHTTPBackend._text(json.loads(line[5:])))
+        finally:
+            await self._response.aclose()
+
+
+def create_backend(name: str = None, api_key: Optional[str] = None) -> Optional[LLMBackend]:
+    """
+    Build the configured model backend
+
+    Args:
+        name: Override for LLM_BACKEND
+        api_key: Validated API key, or None if there is none
+
+    Returns:
+        Backend, or None if it cannot be used (the agent then uses its
+        scripted fallback replies)
+    """
+    name = (name or LLM_BACKEND).lower()
+    if name == "gemini":
+        genai = _import_genai() if api_key else None
+        if genai is None:
+            return None
+        try:
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel(LLM_MODEL)
+            print("✓ Using Gemini API for realistic responses")
+            return model
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to configure Gemini API: {str(e)}")
+            return None
+    if name == "gemini-http":
+        # Only Google's endpoint needs a key; a local stand-in does not
+        if not api_key and LLM_BASE_URL.rstrip("/") == GEMINI_BASE_URL:
+            return None
+        try:
+            backend = GeminiHTTPBackend(api_key)
+            print(f"✓ Using Gemini REST API at {backend.base_url}")
+            return backend
+        except RuntimeError as e:
+            print(f"⚠️  Warning: {e}")
+            return None
+    print(f"⚠️  Warning: Unknown LLM_BACKEND {name!r}")
+    return None
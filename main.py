@@ -1,10 +1,16 @@
 """Honeypot API - Full version with scam detection"""
 
+import asyncio
+import codecs
+import contextlib
+import json
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -23,25 +29,54 @@ os.environ['API_KEY'] = VALIDATION_API_KEY
 os.environ['GEMINI_API_KEY'] = GEMINI_API_KEY or ''
 
 # NOW import FastAPI and other modules
-from fastapi import FastAPI, Header, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Header, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel
 
 # Import our modules (they now have env vars set)
 try:
-    from scam_detector import detect_scam
-    from agent import generate_agent_reply, should_continue
+    from scam_detector import (
+        DETECTION_ENGINE, DETECTION_ENGINES, ScamDetector, apply_known_bad, detect_scam, detect_scam_batch, detector,
+        get_engine, install_lexicon, load_linear_classifier, verdict_cache
+    )
+    from template_index import template_index
+    from indicator_index import INDEXED_KINDS, indicator_index, resolve_kind
+    from known_bad import known_bad
+    from intent_router import intent_router
+    from text_analysis import analyze
+    from agent import (
+        agent as engagement_agent, generate_agent_reply_async, should_continue, stream_agent_reply_async
+    )
     from memory import create_session, get_session, memory
-    from extractor import extract_intelligence, get_tactics_summary
+    from prompt_builder import prompt_builder
+    from extractor import extractor, get_tactics_summary
     from callback import send_final_result, should_send_callback
-    from db import init_db, persist_intelligence, persist_message, persist_session
+    from db import (
+        init_db, load_intelligence, load_messages, load_session, persist_intelligence, persist_message,
+        persist_session, persist_turn
+    )
     from logger import log_event
+    from timings import RequestTimer, pipeline_timings
     MODULES_LOADED = True
 except Exception as e:
     print(f"Warning: Could not load all modules: {e}")
     MODULES_LOADED = False
 
+# Batch detection limits
+BATCH_MAX_MESSAGES = int(os.getenv('BATCH_MAX_MESSAGES', 10000))
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', 500))
+
+# Seconds between checks of the keyword lexicon file (0 disables hot reload)
+LEXICON_POLL_SECONDS = float(os.getenv('LEXICON_POLL_SECONDS', 5))
+
+# Queued SQLite writes above which a request waits for its own writes
+DB_WRITE_BACKLOG = int(os.getenv('DB_WRITE_BACKLOG', 500))
+
+# Reuse stored verdicts for near-duplicates of known scam templates
+TEMPLATE_FAST_PATH = os.getenv('TEMPLATE_FAST_PATH', '1').lower() not in ('0', 'false', 'no')
+
 # Create scam conversations directory
 os.makedirs('scam_conversations', exist_ok=True)
 
@@ -61,14 +96,269 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# Initialize persistence if modules loaded
-if MODULES_LOADED:
+# ============ Startup and Readiness ============
+
+# Importing this module stays cheap; the database, indexes and LLM client are
+# set up by the startup handlers below, the LLM client in a background
+# warmup. /ready answers 503 until all of it has finished.
+startup_steps: Dict[str, Optional[float]] = {}  # step -> seconds taken (None while running)
+startup_errors: Dict[str, str] = {}
+
+
+@contextlib.contextmanager
+def startup_step(name: str):
+    """Time a startup step for /ready, recording its error if it fails"""
+    startup_steps[name] = None
+    start = time.perf_counter()
     try:
-        init_db()
+        yield
+    except Exception as e:
+        startup_errors[name] = str(e)
+        raise
+    finally:
+        startup_steps[name] = round(time.perf_counter() - start, 3)
+
+
+@app.on_event("startup")
+async def init_database():
+    """Initialize persistence before anything reads from it"""
+    if not MODULES_LOADED:
+        return
+    try:
+        with startup_step("database"):
+            await asyncio.to_thread(init_db)
     except Exception as e:
         print(f"Warning: Could not initialize database: {e}")
 
 
+# ============ SQLite Writer ============
+
+# SQLite takes one writer at a time, so writes go through a single thread:
+# they never contend for the lock, and they land in submission order (message
+# ids follow the conversation even when a turn's writes finish after its
+# response was sent)
+db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+pending_writes = 0
+
+
+def _write(func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+    finally:
+        pipeline_timings.record("db_write", time.perf_counter() - start)
+
+
+def _write_done(future: asyncio.Future):
+    global pending_writes
+    pending_writes -= 1
+    if not future.cancelled() and future.exception() is not None:
+        print(f"⚠️  Warning: SQLite write failed: {future.exception()}")
+
+
+def submit_write(func, *args) -> asyncio.Future:
+    """Queue a blocking persistence call on the writer thread (failures are logged)"""
+    global pending_writes
+    future = asyncio.get_running_loop().run_in_executor(db_writer, _write, func, *args)
+    pending_writes += 1
+    future.add_done_callback(_write_done)
+    return future
+
+
+@app.on_event("shutdown")
+def drain_writes():
+    """Finish queued writes before the process exits"""
+    # The writer runs jobs in order, so once this one ran the queue is empty
+    db_writer.submit(lambda: None).result()
+
+
+# ============ Callback Sender ============
+
+# Callbacks are blocking I/O, so they are sent from their own thread after the
+# reply is ready instead of holding up the response; one thread keeps each
+# session's callbacks in turn order
+callback_sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="callback")
+
+
+def _send_callback(payload: Dict) -> Dict:
+    start = time.perf_counter()
+    try:
+        return send_final_result(payload)
+    finally:
+        pipeline_timings.record("callback", time.perf_counter() - start)
+
+
+def _callback_done(future: asyncio.Future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is None and not future.result().get("success", False):
+        error = future.result().get("error")
+    if error is not None:
+        print(f"⚠️  Warning: Callback failed: {error}")
+
+
+def submit_callback(payload: Dict) -> asyncio.Future:
+    """Queue a callback on the sender thread (failures are logged)"""
+    future = asyncio.get_running_loop().run_in_executor(callback_sender, _send_callback, payload)
+    future.add_done_callback(_callback_done)
+    return future
+
+
+@app.on_event("shutdown")
+def drain_callbacks():
+    """Send queued callbacks before the process exits"""
+    callback_sender.submit(lambda: None).result()
+
+
+# ============ Session Eviction ============
+
+# Sessions evicted from memory whose SQLite flush is still queued
+evicted_flushes: Dict[str, asyncio.Future] = {}
+
+
+def flush_evicted_session(session_id: str, session: Dict, reason: str):
+    """Write a session leaving memory to SQLite and drop its state in the other per-session caches"""
+    extractor.reset_session(session_id)
+    prompt_builder.reset_session(session_id)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Outside the API's event loop (scripts): write it right away
+        persist_session(dict(session))
+        return
+    # Queued behind the session's earlier writes, so once this one is done
+    # everything about the session is in SQLite
+    flush = evicted_flushes[session_id] = submit_write(persist_session, dict(session))
+    flush.add_done_callback(
+        lambda _: evicted_flushes.pop(session_id) if evicted_flushes.get(session_id) is flush else None
+    )
+
+
+async def reload_session(session_id: str) -> Optional[Dict]:
+    """Bring a session not in memory back from SQLite (evicted earlier, or from before a restart)"""
+    flush = evicted_flushes.get(session_id)
+    if flush is not None:
+        await asyncio.wait([flush])
+    stored = await asyncio.to_thread(load_session, session_id)
+    return memory.restore_session(stored) if stored is not None else None
+
+
+async def sweep_sessions():
+    """Evict idle sessions even while no new session arrives to trigger it"""
+    while True:
+        await asyncio.sleep(min(60.0, memory.sessions.ttl))
+        memory.sessions.sweep()
+
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    if MODULES_LOADED and memory.sessions.ttl:
+        app.state.session_sweeper = asyncio.create_task(sweep_sessions())
+
+
+if MODULES_LOADED:
+    memory.sessions.add_listener(flush_evicted_session)
+
+
+# ============ Keyword Lexicon Hot Reload ============
+
+def _lexicon_stamp(path: str):
+    """File identity used to notice a replaced lexicon"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        return None
+
+
+async def reload_lexicon_async(path: str = None) -> str:
+    """Compile the lexicon in a worker thread, then swap it in on the event loop"""
+    automaton = await asyncio.to_thread(ScamDetector.compile_lexicon, path or detector.lexicon_path)
+    return install_lexicon(automaton)
+
+
+async def watch_lexicon():
+    """Poll the lexicon file and hot-swap it when it changes"""
+    path = detector.lexicon_path
+    stamp = _lexicon_stamp(path)
+    while True:
+        await asyncio.sleep(LEXICON_POLL_SECONDS)
+        current = _lexicon_stamp(path)
+        if current is None or current == stamp:
+            continue
+        stamp = current
+        try:
+            version = await reload_lexicon_async(path)
+            print(f"✓ Loaded keyword lexicon version {version}")
+        except Exception as e:
+            print(f"⚠️  Warning: Keeping lexicon {detector.lexicon_version}, reload failed: {e}")
+
+
+@app.on_event("startup")
+async def start_lexicon_watcher():
+    if MODULES_LOADED and LEXICON_POLL_SECONDS > 0:
+        app.state.lexicon_watcher = asyncio.create_task(watch_lexicon())
+
+
+# ============ Scam Template Index ============
+
+@app.on_event("startup")
+async def load_template_index():
+    """Index previously seen scammer messages so campaign repeats hit the fast path"""
+    if not (MODULES_LOADED and TEMPLATE_FAST_PATH):
+        return
+    try:
+        with startup_step("template_index"):
+            messages = await asyncio.to_thread(load_messages, "scammer")
+            indexed = await asyncio.to_thread(template_index.add_many, messages)
+        print(f"✓ Template index: {len(template_index)} templates from {indexed} stored messages")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load template index: {e}")
+
+
+# ============ Cross-Session Indicator Index ============
+
+@app.on_event("startup")
+async def load_indicator_index():
+    """Rebuild the indicator -> sessions index from stored intelligence"""
+    if not MODULES_LOADED:
+        return
+    try:
+        with startup_step("indicator_index"):
+            indexed = await asyncio.to_thread(lambda: indicator_index.load(load_intelligence(list(INDEXED_KINDS))))
+        print(f"✓ Indicator index: {len(indicator_index)} indicators from {indexed} stored rows")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load indicator index: {e}")
+
+
+# ============ Background Warmup ============
+
+async def warmup():
+    """Create the LLM client (and load the linear model if it is the default
+    engine) off the request path; replies use the fallback until it is ready"""
+    if DETECTION_ENGINE.lower() == "linear":
+        try:
+            with startup_step("linear_model"):
+                await asyncio.to_thread(load_linear_classifier)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not load the linear model: {e}")
+    if engagement_agent is None:
+        return
+    try:
+        with startup_step("llm_backend"):
+            await asyncio.to_thread(engagement_agent.connect)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not create the LLM backend: {e}")
+
+
+@app.on_event("startup")
+async def start_warmup():
+    # Registered last: the server takes requests while this runs
+    if MODULES_LOADED:
+        app.state.warmup = asyncio.create_task(warmup())
+
+
 # ============ Request/Response Models ============
 
 class MessageModel(BaseModel):
@@ -91,6 +381,7 @@ class HoneypotRequest(BaseModel):
     message: MessageModel
     conversationHistory: Optional[List[MessageModel]] = []
     metadata: Optional[MetadataModel] = None
+    engine: Optional[str] = None  # "keyword" or "linear"; defaults to DETECTION_ENGINE
 
 
 class HoneypotResponse(BaseModel):
@@ -102,17 +393,35 @@ class HoneypotResponse(BaseModel):
     extracted_intelligence: Dict
     message_count: int
     callback_sent: bool = False
+    session_confidence: float = 0.0
+
+
+class TemplateLookupRequest(BaseModel):
+    """Template lookup request model"""
+    message: str
+
+
+class IntelLookupRequest(BaseModel):
+    """Indicator lookup request model"""
+    value: str
+    kind: Optional[str] = None  # e.g. "upiIds" or "upi"; all indexed kinds if omitted
+    limit: int = 100
+
+
+class BatchDetectRequest(BaseModel):
+    """Batch detection request model"""
+    messages: List[str]
+    engine: Optional[str] = None
 
 
 # ============ Main Honeypot Endpoint ============
 
-@app.post("/api/honeypot", response_model=HoneypotResponse)
-async def honeypot_endpoint(
-    request: HoneypotRequest,
-    api_key: str = Header(None, alias="x-api-key")
-):
-    """Main honeypot endpoint - detects scams and engages with scammers"""
+def check_honeypot_request(request: HoneypotRequest, api_key: Optional[str]) -> Optional[HoneypotResponse]:
+    """Validate a honeypot request, returning an error response if the service is not ready
     
+    Raises:
+        HTTPException: If the API key or detection engine is invalid
+    """
     # Check if modules are loaded
     if not MODULES_LOADED:
         return HoneypotResponse(
@@ -132,32 +441,139 @@ async def honeypot_endpoint(
             detail="Invalid API key"
         )
     
+    if request.engine and request.engine.lower() not in DETECTION_ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown detection engine: {request.engine}"
+        )
+    return None
+
+
+@app.post("/api/honeypot", response_model=HoneypotResponse)
+async def honeypot_endpoint(
+    request: HoneypotRequest,
+    response: Response,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Main honeypot endpoint - detects scams and engages with scammers"""
+    
+    error = check_honeypot_request(request, api_key)
+    if error is not None:
+        return error
+    
+    request_timer = pipeline_timings.start()
+    result = await process_turn(request, request_timer)
+    if result.status == "success":
+        response.headers["Server-Timing"] = request_timer.server_timing()
+    return result
+
+
+async def process_turn(request: HoneypotRequest,
+                       request_timer: "RequestTimer",
+                       on_reply_piece: Callable[[str], None] = None) -> HoneypotResponse:
+    """
+    Run one honeypot turn: detection, engagement reply, extraction, callback and persistence
+    
+    Args:
+        request: Validated honeypot request
+        request_timer: Timer for the turn's stages (finished here on success)
+        on_reply_piece: If given, the reply is streamed and each piece is
+                        passed to it as the model produces it
+    
+    Returns:
+        HoneypotResponse (status "error" if the turn failed)
+    """
+    # The session stays in memory until the turn is done with it
+    with memory.pinned(request.sessionId):
+        return await _run_turn(request, request_timer, on_reply_piece)
+
+
+async def _run_turn(request: HoneypotRequest,
+                    request_timer: "RequestTimer",
+                    on_reply_piece: Callable[[str], None] = None) -> HoneypotResponse:
+    """process_turn with the session pinned in memory"""
+    reply_task = None
     try:
         session_id = request.sessionId
         current_message = request.message.text
+        # Normalized once, shared by the detector, agent and extractor
+        analysis = analyze(current_message)
         metadata = request.metadata.dict() if request.metadata else {}
         
-        # Initialize or retrieve session
+        # Initialize or retrieve session (reloading it if it was evicted)
+        if get_session(session_id) is None:
+            await reload_session(session_id)
         session = create_session(session_id, metadata)
         
         # Add current message to history
         memory.add_message(session_id, "scammer", current_message, request.message.timestamp)
-        persist_message(session_id, "scammer", current_message, request.message.timestamp)
+        conv_history = list(memory.get_conversation_history(session_id))
         
-        # Detect scam intent
-        scam_result = detect_scam(current_message)
-        is_scam = scam_result["is_scam"]
-        confidence = scam_result["confidence"]
+        # The reply depends only on the message and history, so the LLM call
+        # starts first and detection and extraction run while it is in flight
+        if on_reply_piece is None:
+            reply = generate_agent_reply_async(analysis, conv_history, metadata.get("language"), session_id)
+        else:
+            reply = stream_agent_reply_async(analysis, conv_history, metadata.get("language"), session_id,
+                                             on_reply_piece)
+        reply_task = asyncio.create_task(request_timer.timed("llm", reply))
+        # Blocking SQLite writes are queued on the writer thread
+        submit_write(persist_message, session_id, "scammer", current_message, request.message.timestamp)
+        await asyncio.sleep(0)  # let the LLM request go out before the CPU-bound stages
         
-        # Update session with scam detection
-        memory.update_scam_detection(session_id, is_scam, confidence)
+        with request_timer.stage("detect"):
+            # Near-duplicates of a known template reuse its stored verdict and
+            # intelligence shape instead of running the detector and extractor
+            engine_name = get_engine(request.engine)[0]
+            template = template_index.add(current_message) if TEMPLATE_FAST_PATH else None
+            known_verdict = None
+            if template is not None and template.shape is not None:
+                known_verdict = template.verdict_for(engine_name, detector.lexicon_version)
+            
+            # Detect scam intent
+            if known_verdict is not None:
+                scam_result = {**known_verdict, "detected_keywords": list(known_verdict["detected_keywords"])}
+            else:
+                scam_result = detect_scam(analysis, request.engine)
+                if template is not None:
+                    template.verdicts[engine_name] = (detector.lexicon_version, scam_result)
+            
+            # Indicators on the known-bad feed raise this message's verdict
+            scam_result = apply_known_bad(scam_result, extractor.known_bad_indicators(analysis))
+            is_scam = scam_result["is_scam"]
+            confidence = scam_result["confidence"]
+            
+            # Fold this turn into the running session score; once a session is
+            # flagged it stays flagged
+            session_confidence = memory.update_session_score(session_id, confidence)
+            session_scam = session["scam_detected"] or is_scam or session_confidence >= 0.3
+            memory.update_scam_detection(session_id, session_scam, session_confidence)
+        
+        with request_timer.stage("extract"):
+            # Extract intelligence from the turns added since the last request;
+            # a known template's keywords are reused instead of rescanned
+            known_shapes = {current_message: template.shape} if known_verdict is not None else None
+            extraction = extractor.extract_incremental(session_id, memory.get_conversation_history(session_id), known_shapes)
+            if template is not None and template.shape is None:
+                message_intelligence = extractor.extract_from_message(analysis)
+                template.shape = {
+                    "suspiciousKeywords": message_intelligence["suspiciousKeywords"],
+                    "tactics_used": message_intelligence["tactics_used"]
+                }
+            
+            # Only values new to the session are written to SQLite, indexed
+            # and reported in the callback
+            new_intelligence = memory.update_intelligence(session_id, extraction.delta)
+            seen_at = datetime.now().isoformat()
+            indicator_index.add(session_id, new_intelligence, seen_at)
+        submit_write(persist_intelligence, session_id, new_intelligence, seen_at)
         
-        # Generate agent reply
-        conv_history = memory.get_conversation_history(session_id)
+        # Wait for the agent reply (only the part of the call not already
+        # overlapped with the stages above counts as waiting)
         agent_reply = None
         try:
-            print(f"[DEBUG] Calling generate_agent_reply for session {session_id}")
-            agent_reply = generate_agent_reply(current_message, conv_history, metadata.get("language"))
+            with request_timer.stage("llm_wait"):
+                agent_reply = await reply_task
             print(f"[DEBUG] Agent returned: {repr(agent_reply)}")
             
             # Ensure we have a non-empty reply
@@ -182,35 +598,43 @@ async def honeypot_endpoint(
         # Add agent reply to history
         agent_timestamp = datetime.now().isoformat() + "Z"
         memory.add_message(session_id, "user", agent_reply, agent_timestamp)
-        persist_message(session_id, "user", agent_reply, agent_timestamp)
-        
-        # Extract intelligence from conversation
-        conv_history = memory.get_conversation_history(session_id)
-        intelligence = extract_intelligence(conv_history)
         
-        # Update session with intelligence
-        memory.update_intelligence(session_id, intelligence)
-        persist_intelligence(session_id, intelligence)
+        with request_timer.stage("extract"):
+            # The reply is part of the conversation too: scan it and fold
+            # anything new into this turn's delta
+            extraction = extractor.extract_incremental(session_id, memory.get_conversation_history(session_id))
+            intelligence = extraction.intelligence
+            reply_intelligence = memory.update_intelligence(session_id, extraction.delta)
+            indicator_index.add(session_id, reply_intelligence, seen_at)
+            new_intelligence = {key: new_intelligence[key] + reply_intelligence[key] for key in new_intelligence}
         
-        # Send callback result
-        callback_sent = False
+        # Queue the callback; it is sent after the response goes out
         payload = {
             "sessionId": session_id,
             "scamDetected": session["scam_detected"],
             "totalMessagesExchanged": session["message_count"],
-            "extractedIntelligence": session["extracted_intelligence"],
+            "extractedIntelligence": new_intelligence,
             "agentNotes": session["agent_notes"]
         }
         try:
-            result = send_final_result(payload)
-            callback_sent = result.get("success", False)
+            submit_callback(payload)
+            callback_sent = True
         except Exception as e:
-            pass
+            print(f"⚠️  Warning: Could not queue callback: {e}")
+            callback_sent = False
         
-        # Persist session and log event
+        # Persist the reply and session in one transaction, and log the event;
+        # both are queued behind this turn's earlier writes and only awaited
+        # when the writer has fallen behind
         session["updated_at"] = datetime.now().isoformat()
-        persist_session(session)
-        log_event(session_id, current_message, agent_reply, is_scam, confidence, session["message_count"], callback_sent, intelligence, metadata)
+        submit_write(persist_turn, dict(session), [("user", agent_reply, agent_timestamp)], reply_intelligence, seen_at)
+        logged = submit_write(log_event, session_id, current_message, agent_reply, is_scam, confidence,
+                              session["message_count"], callback_sent, intelligence, metadata)
+        if pending_writes > DB_WRITE_BACKLOG:
+            with request_timer.stage("write_backlog"):
+                await asyncio.wait([logged])
+        
+        request_timer.finish()
         
         # Return response
         return HoneypotResponse(
@@ -220,10 +644,13 @@ async def honeypot_endpoint(
             confidence=confidence,
             extracted_intelligence=intelligence,
             message_count=session["message_count"],
-            callback_sent=callback_sent
+            callback_sent=callback_sent,
+            session_confidence=session_confidence
         )
     except Exception as e:
-        print(f"Error in honeypot_endpoint: {e}")
+        print(f"Error in process_turn: {e}")
+        if reply_task is not None:
+            reply_task.cancel()
         return HoneypotResponse(
             status="error",
             reply="An error occurred processing your message",
@@ -235,16 +662,332 @@ async def honeypot_endpoint(
         )
 
 
+# ============ Streaming Honeypot Endpoint ============
+
+# Turns whose client disconnected mid-stream; they run to completion so the
+# session, database and callback stay consistent
+orphaned_turns: Set[asyncio.Task] = set()
+
+
+def _sse(event: str, data: Dict) -> str:
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=True)}\n\n"
+
+
+@app.post("/api/honeypot/stream")
+async def honeypot_stream_endpoint(
+    request: HoneypotRequest,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Honeypot turn as server-sent events
+    
+    Same pipeline as /api/honeypot, but the agent reply is sent as `reply`
+    events while the model generates it, followed by one `result` event
+    with the full response (detection, intelligence, callback) and the
+    turn's stage timings, including time to first reply piece (`ttft`).
+    """
+    
+    error = check_honeypot_request(request, api_key)
+    if error is not None:
+        return error
+    
+    request_timer = pipeline_timings.start()
+    pieces: asyncio.Queue = asyncio.Queue()
+    
+    def on_reply_piece(piece: str):
+        if "ttft" not in request_timer.durations:
+            request_timer.add("ttft", time.perf_counter() - request_timer.started)
+        pieces.put_nowait(piece)
+    
+    turn = asyncio.create_task(process_turn(request, request_timer, on_reply_piece))
+    
+    async def stream_events():
+        finished = False
+        try:
+            while not (turn.done() and pieces.empty()):
+                if pieces.empty():
+                    # Wake up for the next piece or the end of the turn
+                    next_piece = asyncio.ensure_future(pieces.get())
+                    await asyncio.wait({next_piece, turn}, return_when=asyncio.FIRST_COMPLETED)
+                    if not next_piece.done():
+                        next_piece.cancel()
+                        continue
+                    piece = next_piece.result()
+                else:
+                    piece = pieces.get_nowait()
+                yield _sse("reply", {"text": piece})
+            result = turn.result()
+            timings = {stage: round(seconds * 1000, 1) for stage, seconds in request_timer.durations.items()}
+            yield _sse("result", {**result.dict(), "timings_ms": timings})
+            finished = True
+        finally:
+            if not finished and not turn.done():
+                orphaned_turns.add(turn)
+                turn.add_done_callback(orphaned_turns.discard)
+    
+    return StreamingResponse(stream_events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # stop reverse proxies from buffering the stream
+    })
+
+
+# ============ Template Lookup Endpoint ============
+
+@app.post("/api/templates/lookup")
+async def template_lookup_endpoint(
+    request: TemplateLookupRequest,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Nearest known scam template and campaign for a message (read-only)"""
+    
+    if not MODULES_LOADED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service not fully initialized"
+        )
+    
+    if api_key and api_key != VALIDATION_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    match = template_index.lookup(request.message)
+    if match is None:
+        return {"matched": False, "template": None}
+    return {
+        "matched": match.similarity >= template_index.threshold,
+        "template": match._asdict()
+    }
+
+
+# ============ Indicator Lookup Endpoint ============
+
+@app.post("/api/intel/lookup")
+async def intel_lookup_endpoint(
+    request: IntelLookupRequest,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Sessions that reported an indicator (UPI ID, phone number, account or link)"""
+    
+    if not MODULES_LOADED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service not fully initialized"
+        )
+    
+    if api_key and api_key != VALIDATION_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    if request.kind and resolve_kind(request.kind) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown indicator kind: {request.kind}"
+        )
+    
+    matches = indicator_index.lookup(request.value, request.kind, max(0, request.limit))
+    return {"value": request.value, "found": bool(matches), "matches": matches}
+
+
+# ============ Streaming Extraction Endpoint ============
+
+class _UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body generator is still reading the request
+    
+    StreamingResponse listens for a client disconnect on the receive
+    channel while it streams, which would swallow the request body. Here
+    the generator reads it instead and stops when request.stream() raises
+    ClientDisconnect.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@app.post("/api/extract/stream")
+async def extract_stream_endpoint(
+    request: Request,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Extract indicators from a raw text upload (e.g. an exported SMS archive) as NDJSON
+    
+    The body is scanned chunk by chunk as it arrives and the indicators
+    found in each chunk are written out straight away, so memory only grows
+    with the number of distinct indicators, not with the upload. The
+    response has one line per distinct indicator (first occurrence order)
+    and a final summary line with the intelligence.
+    """
+    
+    if not MODULES_LOADED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service not fully initialized"
+        )
+    
+    if api_key and api_key != VALIDATION_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    stream = extractor.open_stream()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    def lines(found):
+        return "".join(json.dumps(item._asdict(), ensure_ascii=True) + "\n" for item in found)
+    
+    async def stream_indicators():
+        received = 0
+        try:
+            async for body in request.stream():
+                received += len(body)
+                # Scanning a chunk is CPU work; keep it off the event loop
+                found = await asyncio.to_thread(stream.feed, decoder.decode(body))
+                if found:
+                    yield lines(found)
+        except ClientDisconnect:
+            return
+        found = stream.feed(decoder.decode(b"", final=True)) + stream.close()
+        if found:
+            yield lines(found)
+        summary = {
+            "done": True,
+            "bytes": received,
+            "characters": stream.characters,
+            "intelligence": stream.intelligence()
+        }
+        yield json.dumps(summary, ensure_ascii=True) + "\n"
+    
+    return _UploadStreamingResponse(stream_indicators(), media_type="application/x-ndjson")
+
+
+# ============ Batch Detection Endpoint ============
+
+@app.post("/api/detect/batch")
+async def detect_batch_endpoint(
+    request: BatchDetectRequest,
+    api_key: str = Header(None, alias="x-api-key")
+):
+    """Stateless scam verdicts for many messages, streamed as NDJSON lines"""
+    
+    if not MODULES_LOADED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service not fully initialized"
+        )
+    
+    if api_key and api_key != VALIDATION_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    messages = request.messages
+    if len(messages) > BATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {BATCH_MAX_MESSAGES} messages"
+        )
+    
+    if request.engine and request.engine.lower() not in DETECTION_ENGINES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown detection engine: {request.engine}"
+        )
+    
+    def stream_verdicts():
+        # Score chunk by chunk so the first lines go out before the whole
+        # batch is done; each chunk shares one lowercase/automaton/regex pass
+        for offset in range(0, len(messages), BATCH_CHUNK_SIZE):
+            verdicts = detect_scam_batch(messages[offset:offset + BATCH_CHUNK_SIZE], request.engine)
+            lines = []
+            for index, verdict in enumerate(verdicts, offset):
+                lines.append(json.dumps({"index": index, **verdict}, ensure_ascii=True))
+            yield "\n".join(lines) + "\n"
+    
+    return StreamingResponse(stream_verdicts(), media_type="application/x-ndjson")
+
+
+# ============ Lexicon Reload Endpoint ============
+
+@app.post("/api/lexicon/reload")
+async def reload_lexicon_endpoint(api_key: str = Header(None, alias="x-api-key")):
+    """Reload the keyword lexicon file now instead of waiting for the watcher"""
+    
+    if not MODULES_LOADED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service not fully initialized"
+        )
+    
+    if api_key != VALIDATION_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    try:
+        version = await reload_lexicon_async()
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Lexicon reload failed: {e}"
+        )
+    
+    return {"status": "success", "lexicon_version": version}
+
+
 # ============ Health Check ============
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {
+    health = {
         "status": "healthy",
         "service": "Agentic Honeypot",
         "timestamp": datetime.now().isoformat()
     }
+    if MODULES_LOADED:
+        health["lexicon_version"] = detector.lexicon_version
+        health["verdict_cache"] = verdict_cache.stats()
+        health["template_index"] = template_index.stats()
+        health["indicator_index"] = indicator_index.stats()
+        health["known_bad"] = known_bad.stats()
+        health["intent_rules"] = intent_router.stats()
+        health["pipeline"] = pipeline_timings.stats()
+        health["pending_writes"] = pending_writes
+        health["sessions"] = memory.stats()
+        if engagement_agent is not None:
+            health["llm"] = engagement_agent.stats()
+    return health
+
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """Readiness endpoint: 503 until startup and warmup have finished (or if the database failed)"""
+    warmup_task = getattr(app.state, "warmup", None)
+    if not MODULES_LOADED or "database" in startup_errors:
+        state = "unavailable"
+    elif warmup_task is None or not warmup_task.done():
+        state = "starting"
+    else:
+        state = "ready"
+    if state != "ready":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    ready = {
+        "status": state,
+        "startup_seconds": startup_steps,
+        "startup_errors": startup_errors,
+        "timestamp": datetime.now().isoformat()
+    }
+    if MODULES_LOADED and engagement_agent is not None:
+        ready["llm_backend"] = engagement_agent.stats()["backend"]
+    return ready
 
 
 # ============ Root Endpoint ============
@@ -2,15 +2,280 @@
 Memory Management Module - Tracks sessions and conversation state
 """
 
-from typing import Dict, List, Optional
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
 from datetime import datetime
 
+# Sessions kept in memory at most, seconds a session may sit idle before it is
+# evicted, and approximate bytes of session state kept at most (0 disables a
+# bound). Evicted sessions are written to SQLite and reloaded if they return.
+SESSION_STORE_SIZE = int(os.getenv("SESSION_STORE_SIZE", 10000))
+SESSION_STORE_TTL = float(os.getenv("SESSION_STORE_TTL", 3600))
+SESSION_STORE_MAX_BYTES = int(os.getenv("SESSION_STORE_MAX_BYTES", 0))
+
+# Approximate in-memory cost of a new session (with its intelligence dedup
+# sets), of a message on top of its text, and of an intelligence item on top
+# of its text (measured with tracemalloc on CPython 3.11)
+_SESSION_BYTES = 3000
+_MESSAGE_BYTES = 250
+_ITEM_BYTES = 80
+
+# Weight kept by the running session score per new scammer turn (0 = only the
+# latest message counts, 1 = never forget)
+SESSION_SCORE_DECAY = float(os.getenv("SESSION_SCORE_DECAY", 0.5))
+
+# Intelligence list keys kept per session
+INTELLIGENCE_KEYS = (
+    "bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords", "knownBad", "tactics_used"
+)
+
+
+def _identity(key: str, item):
+    """Dedup key of an intelligence item (one tactic per category)"""
+    return item.get("category") if key == "tactics_used" and isinstance(item, dict) else item
+
+
+class IntelligenceAccumulator:
+    """Insertion-ordered, set-backed store of a session's intelligence
+    
+    Appends to the session's own lists (so the session dict stays the
+    source of truth) while a set per key makes each dedup check O(1).
+    """
+    
+    def __init__(self, lists: Dict[str, List]):
+        """
+        Args:
+            lists: The session's extracted_intelligence dict (updated in place)
+        """
+        self.lists = lists
+        self._seen = {}
+        for key in INTELLIGENCE_KEYS:
+            items = lists.setdefault(key, [])
+            self._seen[key] = {_identity(key, item) for item in items}
+    
+    def add(self, intelligence: Dict) -> Dict:
+        """
+        Merge extracted intelligence
+        
+        Args:
+            intelligence: Dict of intelligence lists (cumulative or partial)
+            
+        Returns:
+            Dict with the same keys holding only the items that were new
+        """
+        delta = {key: [] for key in INTELLIGENCE_KEYS}
+        for key in INTELLIGENCE_KEYS:
+            values = intelligence.get(key)
+            if not isinstance(values, list):
+                continue
+            seen = self._seen[key]
+            target = self.lists[key]
+            for item in values:
+                identity = _identity(key, item)
+                if identity not in seen:
+                    seen.add(identity)
+                    target.append(item)
+                    delta[key].append(item)
+        return delta
+
+
+def _message_bytes(message: Dict) -> int:
+    return _MESSAGE_BYTES + len(message.get("text") or "") + len(message.get("timestamp") or "")
+
+
+def _item_bytes(item) -> int:
+    return _ITEM_BYTES + len(str(item))
+
+
+def session_bytes(session: Dict) -> int:
+    """Approximate memory held by a session dict (history and intelligence)"""
+    size = _SESSION_BYTES + len(session.get("agent_notes") or "")
+    size += sum(_message_bytes(message) for message in session.get("conversation_history", []))
+    for items in session.get("extracted_intelligence", {}).values():
+        size += sum(_item_bytes(item) for item in items)
+    return size
+
+
+# Called with (session_id, session, reason) before a session is evicted;
+# reason is "capacity", "bytes" or "expired"
+EvictionListener = Callable[[str, Dict, str], None]
+
+
+class SessionStore:
+    """Sessions by ID in least-recently-used order, bounded by count, idle time and size
+    
+    Reading a session refreshes it. Inserting or growing one evicts the least
+    recently used sessions over the count or byte bound, and any that have
+    been idle longer than the TTL. Eviction listeners run before a session is
+    dropped, so it can be written out first. Pinned sessions (a turn is in
+    progress) are never evicted. Used from the event loop only, like
+    SessionMemory.
+    """
+    
+    def __init__(self,
+                 capacity: int = None,
+                 ttl: float = None,
+                 max_bytes: int = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            capacity: Override for SESSION_STORE_SIZE
+            ttl: Override for SESSION_STORE_TTL
+            max_bytes: Override for SESSION_STORE_MAX_BYTES
+            clock: Monotonic time source (injectable for tests/benchmarks)
+        """
+        self.capacity = max(0, SESSION_STORE_SIZE if capacity is None else capacity)
+        ttl = SESSION_STORE_TTL if ttl is None else ttl
+        self.ttl = ttl if ttl > 0 else None
+        self.max_bytes = max(0, SESSION_STORE_MAX_BYTES if max_bytes is None else max_bytes)
+        self._clock = clock
+        # session_id -> [session, last used, approximate bytes]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._listeners: List[EvictionListener] = []
+        self.bytes = 0
+        self.evictions = {"capacity": 0, "bytes": 0, "expired": 0}
+        self.evicted_bytes = 0
+    
+    def add_listener(self, listener: EvictionListener):
+        """Run listener(session_id, session, reason) before each eviction"""
+        self._listeners.append(listener)
+    
+    def get(self, session_id: str) -> Optional[Dict]:
+        """Return a session (refreshing it), or None if absent or expired"""
+        entry = self._entries.get(session_id)
+        if entry is None:
+            return None
+        now = self._clock()
+        if self._expired(entry, now) and session_id not in self._pins:
+            self._evict(session_id, "expired")
+            return None
+        entry[1] = now
+        self._entries.move_to_end(session_id)
+        return entry[0]
+    
+    def put(self, session_id: str, session: Dict):
+        """Insert or replace a session, then evict down to the bounds"""
+        old = self._entries.pop(session_id, None)
+        if old is not None:
+            self.bytes -= old[2]
+        size = session_bytes(session)
+        self._entries[session_id] = [session, self._clock(), size]
+        self.bytes += size
+        self._enforce()
+    
+    def grow(self, session_id: str, nbytes: int):
+        """Account for a session getting nbytes bigger (or smaller, if negative)"""
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            entry[2] += nbytes
+            self.bytes += nbytes
+            if nbytes > 0 and self.max_bytes and self.bytes > self.max_bytes:
+                self._enforce()
+    
+    def size_of(self, session_id: str) -> int:
+        """Approximate bytes held by a session (0 if absent)"""
+        entry = self._entries.get(session_id)
+        return entry[2] if entry is not None else 0
+    
+    def pop(self, session_id: str) -> Optional[Dict]:
+        """Remove a session without counting it as an eviction"""
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return None
+        self.bytes -= entry[2]
+        return entry[0]
+    
+    def pin(self, session_id: str):
+        """Keep a session in memory until a matching unpin"""
+        self._pins[session_id] = self._pins.get(session_id, 0) + 1
+    
+    def unpin(self, session_id: str):
+        count = self._pins.pop(session_id, 0) - 1
+        if count > 0:
+            self._pins[session_id] = count
+    
+    def sweep(self) -> int:
+        """Evict expired sessions (also done on every insert); returns how many"""
+        before = self.evictions["expired"]
+        self._enforce()
+        return self.evictions["expired"] - before
+    
+    def _expired(self, entry: list, now: float) -> bool:
+        return self.ttl is not None and now - entry[1] >= self.ttl
+    
+    def _enforce(self):
+        now = self._clock()
+        # Oldest first; pinned sessions are skipped and moved to the back
+        for _ in range(len(self._entries)):
+            if not self._entries:
+                break
+            session_id, entry = next(iter(self._entries.items()))
+            if self._expired(entry, now):
+                reason = "expired"
+            elif self.capacity and len(self._entries) > self.capacity:
+                reason = "capacity"
+            elif self.max_bytes and self.bytes > self.max_bytes and len(self._entries) > 1:
+                reason = "bytes"
+            else:
+                break
+            if session_id in self._pins:
+                self._entries.move_to_end(session_id)
+                continue
+            self._evict(session_id, reason)
+    
+    def _evict(self, session_id: str, reason: str):
+        session, _, size = self._entries[session_id]
+        for listener in self._listeners:
+            try:
+                listener(session_id, session, reason)
+            except Exception as e:
+                print(f"⚠️  Warning: Session eviction listener failed: {e}")
+        self.pop(session_id)
+        self.evictions[reason] += 1
+        self.evicted_bytes += size
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+    
+    def stats(self) -> Dict:
+        """Snapshot of size and eviction counters"""
+        sessions = len(self._entries)
+        return {
+            "sessions": sessions,
+            "capacity": self.capacity,
+            "ttl_seconds": self.ttl,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "mean_session_bytes": round(self.bytes / sessions) if sessions else 0,
+            "pinned": len(self._pins),
+            "evictions": dict(self.evictions),
+            "evicted_bytes": self.evicted_bytes
+        }
+
+
 class SessionMemory:
     """Manages conversation state and intelligence extraction per session"""
     
-    def __init__(self):
-        # Store sessions: {sessionId: session_data}
-        self.sessions: Dict[str, Dict] = {}
+    def __init__(self, store: SessionStore = None):
+        """
+        Args:
+            store: Session store (defaults to one bounded by SESSION_STORE_*)
+        """
+        # Store sessions: {sessionId: session_data}, LRU/TTL bounded
+        self.sessions = store if store is not None else SessionStore()
+        # Dedup state for each session's extracted_intelligence
+        self._accumulators: Dict[str, IntelligenceAccumulator] = {}
+        self.sessions.add_listener(lambda session_id, session, reason: self._accumulators.pop(session_id, None))
     
     def create_session(self, session_id: str, metadata: Dict = None) -> Dict:
         """
@@ -23,8 +288,9 @@ class SessionMemory:
         Returns:
             Session object
         """
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = {
                 "sessionId": session_id,
                 "created_at": datetime.now().isoformat(),
                 "updated_at": datetime.now().isoformat(),
@@ -32,19 +298,49 @@ class SessionMemory:
                 "metadata": metadata or {},
                 "scam_detected": False,
                 "confidence": 0.0,
+                "session_score": 0.0,
+                "scored_turns": 0,
                 "extracted_intelligence": {
                     "bankAccounts": [],
                     "upiIds": [],
                     "phishingLinks": [],
                     "phoneNumbers": [],
-                    "suspiciousKeywords": []
+                    "suspiciousKeywords": [],
+                    "knownBad": [],
+                    "tactics_used": []
                 },
                 "agent_notes": "",
                 "message_count": 0,
                 "final_result_sent": False
             }
+            self.sessions.put(session_id, session)
         
-        return self.sessions[session_id]
+        return session
+    
+    def restore_session(self, session: Dict) -> Dict:
+        """
+        Put a stored session (e.g. one evicted earlier) back in memory
+        
+        Args:
+            session: Session dict as loaded from SQLite
+            
+        Returns:
+            The session in memory (the one already there, if it came back meanwhile)
+        """
+        current = self.sessions.get(session["sessionId"])
+        if current is not None:
+            return current
+        self.sessions.put(session["sessionId"], session)
+        return session
+    
+    @contextmanager
+    def pinned(self, session_id: str):
+        """Keep a session from being evicted while a turn works on it"""
+        self.sessions.pin(session_id)
+        try:
+            yield
+        finally:
+            self.sessions.unpin(session_id)
     
     def add_message(self, session_id: str, sender: str, text: str, timestamp: str):
         """
@@ -56,8 +352,7 @@ class SessionMemory:
             text: Message text
             timestamp: ISO format timestamp
         """
-        if session_id not in self.sessions:
-            self.create_session(session_id)
+        session = self.create_session(session_id)
         
         message = {
             "sender": sender,
@@ -65,37 +360,78 @@ class SessionMemory:
             "timestamp": timestamp
         }
         
-        self.sessions[session_id]["conversation_history"].append(message)
-        self.sessions[session_id]["message_count"] += 1
+        session["conversation_history"].append(message)
+        session["message_count"] += 1
+        self.sessions.grow(session_id, _message_bytes(message))
     
     def update_scam_detection(self, session_id: str, is_scam: bool, confidence: float):
         """Update scam detection status"""
-        if session_id in self.sessions:
-            self.sessions[session_id]["scam_detected"] = is_scam
-            self.sessions[session_id]["confidence"] = confidence
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session["scam_detected"] = is_scam
+            session["confidence"] = confidence
+    
+    def update_session_score(self, session_id: str, message_confidence: float, decay: float = None) -> float:
+        """
+        Fold one scammer turn into the running session score
+        
+        The running score decays by `decay` each turn and adds the new
+        message confidence, so earlier evidence keeps counting without
+        rescanning the conversation history. It is divided by the summed
+        turn weights, which makes the result a decay-weighted average of the
+        message confidences: steady turns at confidence c stay at c.
+        
+        Args:
+            session_id: Session ID
+            message_confidence: Detector confidence for the new message (0-1)
+            decay: Override for SESSION_SCORE_DECAY
+            
+        Returns:
+            Session-level confidence (0-1)
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return message_confidence
+        
+        if decay is None:
+            decay = SESSION_SCORE_DECAY
+        decay = min(max(decay, 0.0), 1.0)
+        
+        session["session_score"] = session["session_score"] * decay + message_confidence
+        session["scored_turns"] += 1
+        turns = session["scored_turns"]
+        weight = turns if decay >= 1.0 else (1.0 - decay ** turns) / (1.0 - decay)
+        return round(min(session["session_score"] / weight, 1.0), 2)
     
-    def update_intelligence(self, session_id: str, intelligence: Dict):
+    def update_intelligence(self, session_id: str, intelligence: Dict) -> Dict:
         """
         Update extracted intelligence
         
         Args:
             session_id: Session ID
             intelligence: Dict with keys for bankAccounts, upiIds, etc.
+            
+        Returns:
+            Dict with only the items that were new to the session (empty
+            lists if the session does not exist)
         """
-        if session_id in self.sessions:
-            for key, value in intelligence.items():
-                if key in self.sessions[session_id]["extracted_intelligence"]:
-                    existing = self.sessions[session_id]["extracted_intelligence"][key]
-                    if isinstance(value, list):
-                        # Add new items not already present
-                        for item in value:
-                            if item not in existing:
-                                existing.append(item)
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {key: [] for key in INTELLIGENCE_KEYS}
+        
+        accumulator = self._accumulators.get(session_id)
+        if accumulator is None or accumulator.lists is not session["extracted_intelligence"]:
+            accumulator = self._accumulators[session_id] = IntelligenceAccumulator(session["extracted_intelligence"])
+        delta = accumulator.add(intelligence)
+        self.sessions.grow(session_id, sum(_item_bytes(item) for items in delta.values() for item in items))
+        return delta
     
     def update_notes(self, session_id: str, notes: str):
         """Update agent notes"""
-        if session_id in self.sessions:
-            self.sessions[session_id]["agent_notes"] = notes
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.sessions.grow(session_id, len(notes) - len(session["agent_notes"]))
+            session["agent_notes"] = notes
     
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Retrieve session data"""
@@ -108,8 +444,9 @@ class SessionMemory:
     
     def mark_result_sent(self, session_id: str):
         """Mark final result as sent"""
-        if session_id in self.sessions:
-            self.sessions[session_id]["final_result_sent"] = True
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session["final_result_sent"] = True
     
     def get_payload_for_callback(self, session_id: str) -> Dict:
         """
@@ -135,8 +472,12 @@ class SessionMemory:
     
     def delete_session(self, session_id: str):
         """Delete session (cleanup)"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        self.sessions.pop(session_id)
+        self._accumulators.pop(session_id, None)
+    
+    def stats(self) -> Dict:
+        """Snapshot of the session store's size and evictions"""
+        return self.sessions.stats()
 
 
 # Singleton instance
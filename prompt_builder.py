@@ -0,0 +1,290 @@
+"""
+Prompt Builder Module - Token-budgeted LLM prompts with a rolling conversation summary
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from indicator_scanner import scanner
+from text_analysis import MessageAnalysis, analyze
+
+# Estimated tokens allowed per prompt (system prompt included)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 700))
+# Most recent messages quoted verbatim; older ones are summarized
+PROMPT_RECENT_TURNS = int(os.getenv("PROMPT_RECENT_TURNS", 4))
+# Longest quoted message (characters); longer ones keep their start
+PROMPT_MAX_MESSAGE_CHARS = int(os.getenv("PROMPT_MAX_MESSAGE_CHARS", 600))
+
+# Summary values kept per fact
+_SUMMARY_ITEMS = 5
+
+# Organizations scammers claim to be from, and what they ask for
+_ORGANIZATIONS = (
+    "sbi", "state bank", "hdfc", "icici", "axis", "kotak", "pnb", "bank of baroda", "canara", "yes bank",
+    "union bank", "paytm", "phonepe", "google pay", "gpay", "amazon", "flipkart", "rbi", "reserve bank",
+    "income tax", "customs", "police", "cbi", "cyber cell", "fedex", "dhl", "trai", "airtel", "jio", "vodafone",
+    "electricity board", "npci", "uidai",
+)
+_REQUESTS = (
+    "otp", "upi pin", "pin", "password", "cvv", "card number", "account number", "aadhaar", "pan card",
+    "anydesk", "teamviewer", "screen share", "remote app", "processing fee", "registration fee",
+)
+_AMOUNT_RE = re.compile(
+    r"(?:\brs\.?|\binr|₹)\s*\d[\d,]*(?:\.\d+)?|\b\d[\d,]*(?:\.\d+)?\s*(?:rs|rupees|inr|lakh|crore)\b", re.IGNORECASE
+)
+_INDICATOR_KINDS = frozenset(("upi", "phone", "url", "account", "email"))
+
+
+def _mentions(analysis: MessageAnalysis, names: tuple) -> List[str]:
+    """Names (single words or phrases) that occur as whole words in a message, in order of appearance"""
+    words = analysis.words
+    found = []
+    for name in names:
+        if " " in name:
+            position = analysis.folded.find(name)
+            if position >= 0 and all(part in words for part in name.split()):
+                found.append((position, name))
+        elif name in words:
+            found.append((analysis.folded.find(name), name))
+    return [name for _, name in sorted(found)]
+
+
+@lru_cache(maxsize=4096)
+def _message_facts(text: str) -> Tuple[Tuple[str, ...], ...]:
+    """(organizations, amounts, requests, details) named in one scammer message
+
+    Memoized because a message that no longer fits the quoted window is
+    folded into each turn's summary copy until it leaves the window.
+    """
+    analysis = analyze(text)
+    organizations = tuple(name.upper() if len(name) <= 4 else name.title()
+                          for name in _mentions(analysis, _ORGANIZATIONS))
+    amounts = tuple(" ".join(match.group().split()) for match in _AMOUNT_RE.finditer(text))
+    requests = tuple(name.upper() if len(name) <= 3 else name for name in _mentions(analysis, _REQUESTS))
+    details = tuple(match.value for match in scanner.scan(text) if match.kind in _INDICATOR_KINDS)
+    return organizations, amounts, requests, details
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text (about four characters per token, as for Gemini on English)"""
+    return (len(text) + 3) // 4
+
+
+class BuiltPrompt(NamedTuple):
+    """A prompt and how it was assembled"""
+    text: str
+    tokens: int           # estimated
+    summary_tokens: int
+    recent_turns: int     # messages quoted verbatim
+    summarized_turns: int  # older messages folded into the summary
+    build_seconds: float
+
+
+class ConversationSummary:
+    """Facts from the older part of a conversation, folded in one message at a time"""
+
+    __slots__ = ("cursor", "organizations", "amounts", "requests", "details")
+
+    def __init__(self):
+        self.cursor = 0  # messages folded so far
+        # value -> None dicts keep first-seen order with O(1) membership
+        self.organizations: Dict[str, None] = {}
+        self.amounts: Dict[str, None] = {}
+        self.requests: Dict[str, None] = {}
+        self.details: Dict[str, None] = {}
+
+    def fold(self, message: Dict):
+        """Add one message (only the scammer's messages carry facts)"""
+        self.cursor += 1
+        if message.get("sender") != "scammer":
+            return
+        for values, found in zip((self.organizations, self.amounts, self.requests, self.details),
+                                 _message_facts(message.get("text", ""))):
+            for value in found:
+                if len(values) >= _SUMMARY_ITEMS:
+                    break
+                values.setdefault(value, None)
+
+    def copy(self) -> "ConversationSummary":
+        clone = ConversationSummary()
+        clone.cursor = self.cursor
+        clone.organizations = dict(self.organizations)
+        clone.amounts = dict(self.amounts)
+        clone.requests = dict(self.requests)
+        clone.details = dict(self.details)
+        return clone
+
+    def render(self) -> str:
+        """Summary lines for the prompt ("" when nothing was summarized)"""
+        if not self.cursor:
+            return ""
+        lines = [f"Summary of the {self.cursor} earlier messages:"]
+        for label, values in (("They claimed to be from", self.organizations),
+                              ("Amounts mentioned", self.amounts),
+                              ("They asked for", self.requests),
+                              ("Details they gave", self.details)):
+            if values:
+                lines.append(f"- {label}: {', '.join(values)}")
+        return "\n".join(lines) + "\n"
+
+
+class PromptBuilder:
+    """Builds reply prompts within a token budget
+
+    The system prompt is rendered once. The newest PROMPT_RECENT_TURNS
+    messages are quoted (newest first, while they fit the budget); older
+    messages are represented by a per-session summary that is advanced
+    incrementally, so each turn only folds in the message that just left the
+    recent window instead of re-reading the conversation.
+    """
+
+    def __init__(self, budget: int = None, recent_turns: int = None, window: int = 1000):
+        """
+        Args:
+            budget: Override for PROMPT_TOKEN_BUDGET
+            recent_turns: Override for PROMPT_RECENT_TURNS
+            window: Recent prompts kept for the size/latency percentiles
+        """
+        self.budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+        self.recent_turns = max(0, PROMPT_RECENT_TURNS if recent_turns is None else recent_turns)
+        self._summaries: Dict[str, ConversationSummary] = {}
+        self._system_prompt: Optional[str] = None
+        self._system_tokens = 0
+        # (prompt tokens, LLM seconds or None, build seconds) per recorded turn
+        self._turns: Deque[tuple] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.built = 0
+        self.trimmed_turns = 0
+
+    def _summary(self, session_id: Optional[str], history: List[Dict], upto: int) -> ConversationSummary:
+        """Summary of history[:upto], advanced from the session's previous one"""
+        summary = self._summaries.get(session_id) if session_id is not None else None
+        if summary is None or summary.cursor > upto:
+            # New session, no session, or its history was replaced: start over
+            summary = ConversationSummary()
+            if session_id is not None:
+                self._summaries[session_id] = summary
+        for message in history[summary.cursor:upto]:
+            summary.fold(message)
+        return summary
+
+    def build(self,
+              system_prompt: str,
+              current_message: MessageAnalysis,
+              history: List[Dict],
+              session_id: Optional[str] = None) -> BuiltPrompt:
+        """
+        Build the prompt for a reply
+
+        Args:
+            system_prompt: Persona instructions (rendered once per distinct prompt)
+            current_message: Analysis of the scammer message being answered
+            history: Conversation so far; a trailing copy of the current
+                     message is ignored
+            session_id: Session whose summary to reuse (None summarizes from scratch)
+
+        Returns:
+            BuiltPrompt
+        """
+        start = time.perf_counter()
+        if system_prompt != self._system_prompt:
+            self._system_prompt = system_prompt
+            self._system_tokens = estimate_tokens(system_prompt)
+
+        end = len(history)
+        if end and history[-1].get("text") == current_message.text and history[-1].get("sender") == "scammer":
+            end -= 1
+        window_start = max(0, end - self.recent_turns)
+        with self._lock:
+            summary = self._summary(session_id, history, window_start)
+
+        current = _clip(current_message.text)
+        tail = f"\nScammer: {current}\nYou (respond naturally in 1-2 sentences):"
+        remaining = self.budget - self._system_tokens - estimate_tokens(tail) - 1
+        summary_text = summary.render()
+        # Up to a third of what is left is kept for the summary
+        quote_budget = remaining - min(estimate_tokens(summary_text), remaining // 3)
+
+        # Newest quoted messages first; messages that do not fit are folded
+        # into a copy of the summary so their facts are not lost
+        quoted = []
+        used = 0
+        for position in range(end - 1, window_start - 1, -1):
+            msg = history[position]
+            speaker = "Scammer" if msg.get("sender") == "scammer" else "You"
+            line = f"{speaker}: {_clip(msg.get('text', ''))}\n"
+            cost = estimate_tokens(line)
+            if used + cost > quote_budget:
+                break
+            quoted.append(line)
+            used += cost
+        dropped = end - window_start - len(quoted)
+        if dropped:
+            summary = summary.copy()
+            for message in history[window_start:window_start + dropped]:
+                summary.fold(message)
+            summary_text = summary.render()
+
+        summary_tokens = estimate_tokens(summary_text)
+        if summary_tokens > remaining - used:
+            summary_text, summary_tokens = "", 0
+
+        context = system_prompt + "\n\n" + summary_text
+        if quoted:
+            context += "Previous conversation:\n" + "".join(reversed(quoted))
+        text = context + tail
+        tokens = estimate_tokens(text)
+        with self._lock:
+            self.built += 1
+            self.trimmed_turns += dropped
+        return BuiltPrompt(text, tokens, summary_tokens, len(quoted), summary.cursor, time.perf_counter() - start)
+
+    def record(self, prompt: BuiltPrompt, llm_seconds: Optional[float]):
+        """Track one turn's prompt size and LLM latency (None if the call failed)"""
+        with self._lock:
+            self._turns.append((prompt.tokens, llm_seconds, prompt.build_seconds))
+
+    def reset_session(self, session_id: str):
+        """Drop the summary of a session"""
+        self._summaries.pop(session_id, None)
+
+    def stats(self) -> Dict:
+        """Prompt size and LLM latency percentiles over recent turns"""
+        with self._lock:
+            turns = list(self._turns)
+        tokens = sorted(turn[0] for turn in turns)
+        latencies = sorted(turn[1] for turn in turns if turn[1] is not None)
+        build = sorted(turn[2] for turn in turns)
+
+        def percentile(values, q):
+            return values[min(len(values) - 1, int(len(values) * q))] if values else None
+
+        return {
+            "budget_tokens": self.budget,
+            "recent_turns": self.recent_turns,
+            "built": self.built,
+            "trimmed_turns": self.trimmed_turns,
+            "sessions": len(self._summaries),
+            "tokens_p50": percentile(tokens, 0.5),
+            "tokens_p95": percentile(tokens, 0.95),
+            "tokens_max": tokens[-1] if tokens else None,
+            "build_us_p50": round(percentile(build, 0.5) * 1e6, 1) if build else None,
+            "llm_ms_p50": round(percentile(latencies, 0.5) * 1000, 1) if latencies else None,
+            "llm_ms_p95": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None
+        }
+
+
+def _clip(text: str) -> str:
+    """Message text cut to PROMPT_MAX_MESSAGE_CHARS"""
+    if len(text) <= PROMPT_MAX_MESSAGE_CHARS:
+        return text
+    return text[:PROMPT_MAX_MESSAGE_CHARS].rstrip() + " ..."
+
+
+# Singleton instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,142 @@
+"""
+Reply Cache Module - Reuses LLM replies across repeated scam script turns
+"""
+
+import hashlib
+import os
+import random
+import re
+from typing import Dict, List, Optional, Tuple
+
+from cache import LRUCache
+from intent_router import intent_router
+from scam_detector import message_template
+from text_analysis import MessageAnalysis
+
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", 5000))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", 1800))
+# Distinct replies collected per key before cached ones are served
+REPLY_CACHE_VARIANTS = int(os.getenv("REPLY_CACHE_VARIANTS", 3))
+
+# Words that change the wording of a script but not what it asks for
+_FILLER_WORDS = frozenset((
+    "a", "an", "the", "is", "are", "be", "to", "of", "for", "in", "on", "and", "or", "it", "this", "that",
+    "please", "pls", "plz", "kindly", "sir", "madam", "mam", "dear", "customer", "ji", "hello", "hi",
+))
+_WORD_RE = re.compile(r"[^\W_]+|<url>|<num>")
+# Replies that quote numbers or links may name one scammer's details
+_SPECIFIC_REPLY_RE = re.compile(r"\d{3}|https?://|www\.|@\w")
+
+ReplyKey = Tuple[str, str, bytes]
+
+
+def intent_fingerprint(analysis: MessageAnalysis) -> bytes:
+    """
+    Fingerprint what a scammer message asks for, ignoring its wording details
+
+    The folded text is templated (amounts, numbers and links collapsed),
+    filler words are dropped and the remaining words are taken as a set, so
+    "Dear customer, share OTP now" and "Share the OTP now please" match.
+
+    Args:
+        analysis: Shared analysis of the message
+
+    Returns:
+        16-byte digest
+    """
+    words = sorted(set(_WORD_RE.findall(message_template(analysis.folded))) - _FILLER_WORDS)
+    return hashlib.blake2b(" ".join(words).encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ReplyCache:
+    """LRU/TTL cache of LLM replies keyed by stage, language and intent
+
+    Each key collects up to `variants` distinct replies from the model; once
+    it is full, lookups return one of them at random so repeated scripts do
+    not get the exact same answer every time. Until then every lookup is a
+    miss and the model is called.
+    """
+
+    def __init__(self, capacity: int = None, ttl: float = None, variants: int = None):
+        """
+        Args:
+            capacity: Maximum keys kept (defaults to REPLY_CACHE_SIZE, 0 disables)
+            ttl: Seconds a key's replies stay valid (defaults to REPLY_CACHE_TTL)
+            variants: Override for REPLY_CACHE_VARIANTS
+        """
+        self._replies = LRUCache(REPLY_CACHE_SIZE if capacity is None else capacity,
+                                 ttl=REPLY_CACHE_TTL if ttl is None else ttl)
+        self.variants = max(1, REPLY_CACHE_VARIANTS if variants is None else variants)
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._replies.capacity > 0
+
+    @staticmethod
+    def key(analysis: MessageAnalysis, history_length: int, language: str) -> ReplyKey:
+        """Cache key of a reply to a message"""
+        return intent_router.stage(history_length), language.lower(), intent_fingerprint(analysis)
+
+    def get(self, key: ReplyKey) -> Optional[str]:
+        """A cached reply for key, or None until enough variants are collected"""
+        replies: Optional[List[str]] = self._replies.get(key)
+        if replies is None or len(replies) < self.variants:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return random.choice(replies)
+
+    def put(self, key: ReplyKey, reply: str) -> bool:
+        """
+        Store a model reply under key
+
+        Args:
+            key: Key from ReplyCache.key
+            reply: Cleaned model reply
+
+        Returns:
+            True if the reply was stored (replies quoting numbers or links
+            and duplicates are not)
+        """
+        if not self.enabled or _SPECIFIC_REPLY_RE.search(reply):
+            self.skipped += 1
+            return False
+        replies = self._replies.get(key)
+        if replies is None:
+            replies = []
+        elif reply in replies or len(replies) >= self.variants:
+            return False
+        # Lists are replaced, never mutated, so readers never see a partial one
+        self._replies.put(key, replies + [reply])
+        self.stored += 1
+        return True
+
+    def clear(self):
+        """Drop all cached replies"""
+        self._replies.clear()
+
+    def stats(self) -> Dict:
+        """Snapshot of hit rate and size"""
+        lookups = self.hits + self.misses
+        cache_stats = self._replies.stats()
+        return {
+            "keys": cache_stats["size"],
+            "capacity": cache_stats["capacity"],
+            "ttl_seconds": cache_stats["ttl_seconds"],
+            "variants": self.variants,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "skipped": self.skipped,
+            "evictions": cache_stats["evictions"],
+            "expirations": cache_stats["expirations"],
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton instance
+reply_cache = ReplyCache()
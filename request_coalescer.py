@@ -0,0 +1,125 @@
+"""
+Request Coalescer Module - Micro-batching of concurrent LLM reply requests
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+# Requests dispatched together at most, and how long the first one of a batch
+# waits for company (milliseconds, 0 disables coalescing)
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", 16))
+LLM_BATCH_MAX_WAIT_MS = float(os.getenv("LLM_BATCH_MAX_WAIT_MS", 0))
+
+# Dispatches a batch of prompts; one result (text or exception) per prompt, in order
+BatchDispatcher = Callable[[List[str]], Awaitable[List[Union[str, BaseException]]]]
+
+
+class RequestCoalescer:
+    """Collects prompts submitted within a short window and dispatches them together
+
+    The first prompt of a batch starts a max_wait timer; the batch goes out
+    when the timer fires or max_batch prompts are waiting, whichever comes
+    first. Identical prompts in one batch share a single slot in it. Every
+    caller gets its own future, so replies reach the session that asked no
+    matter how the batch is ordered or split by the dispatcher.
+    """
+
+    def __init__(self, dispatch: BatchDispatcher, max_batch: int = None, max_wait_ms: float = None):
+        """
+        Args:
+            dispatch: Coroutine function sending a batch of prompts to the model
+            max_batch: Override for LLM_BATCH_MAX_SIZE
+            max_wait_ms: Override for LLM_BATCH_MAX_WAIT_MS
+        """
+        self.dispatch = dispatch
+        self.max_batch = max(1, LLM_BATCH_MAX_SIZE if max_batch is None else max_batch)
+        self.max_wait = max(0.0, LLM_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self._loop = None
+        self._pending: Dict[str, asyncio.Future] = {}  # prompt -> result future, in arrival order
+        self._opened_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.shared = 0
+        self.batches = 0
+        self.dispatched = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait > 0 and self.max_batch > 1
+
+    async def submit(self, prompt: str) -> str:
+        """
+        Queue a prompt for the next batch and wait for its reply
+
+        Args:
+            prompt: Complete model prompt
+
+        Returns:
+            Raw model text for this prompt
+
+        Raises:
+            Exception: Whatever the dispatcher reported for this prompt
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Batches never span event loops (e.g. separate test clients)
+            self._loop, self._pending, self._timer = loop, {}, None
+        self.requests += 1
+        future = self._pending.get(prompt)
+        if future is not None:
+            self.shared += 1
+        else:
+            future = self._pending[prompt] = loop.create_future()
+            if len(self._pending) == 1:
+                self._opened_at = time.perf_counter()
+                self._timer = loop.call_later(self.max_wait, self._flush)
+            elif len(self._pending) >= self.max_batch:
+                self._flush()
+        # A caller giving up (deadline) must not cancel the batch for the others
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        """Send the waiting batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self.batches += 1
+        self.dispatched += len(batch)
+        self.wait_seconds += time.perf_counter() - self._opened_at
+        asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: Dict[str, asyncio.Future]):
+        prompts = list(batch)
+        try:
+            results = await self.dispatch(prompts)
+            if len(results) != len(prompts):
+                raise RuntimeError(f"Batch of {len(prompts)} prompts returned {len(results)} results")
+        except Exception as e:
+            results = [e] * len(prompts)
+        for prompt, result in zip(prompts, results):
+            future = batch[prompt]
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Snapshot of batching counters"""
+        return {
+            "enabled": self.enabled,
+            "max_batch": self.max_batch,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "requests": self.requests,
+            "shared": self.shared,
+            "batches": self.batches,
+            "mean_batch": round(self.dispatched / self.batches, 2) if self.batches else 0.0,
+            "mean_wait_ms": round(self.wait_seconds / self.batches * 1000, 2) if self.batches else 0.0
+        }
@@ -2,177 +2,153 @@
 Scam Detection Module - Identifies scam intent in messages
 """
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, Tuple
+import threading
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Set, Union
+
+from cache import LRUCache
+from indicator_scanner import iter_fused_matches, scan_indicators, token_end
+from keyword_engine import KeywordAutomaton
+from text_analysis import MessageAnalysis, analyze, caps_ratio, fold, fold_hinglish
+
+LEXICON_PATH = os.getenv("SCAM_LEXICON_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scam_lexicon.json"))
+DETECTION_ENGINE = os.getenv("DETECTION_ENGINE", "keyword")
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", 10000))
+VERDICT_CACHE_TTL = float(os.getenv("VERDICT_CACHE_TTL", 600))
+# Confidence added per indicator found in the known-bad feed
+KNOWN_BAD_BOOST = float(os.getenv("KNOWN_BAD_BOOST", 0.5))
+
+# Template normalization for campaign templates and verdict fingerprints
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_DIGITS_RE = re.compile(r"\d+")
+# Digit runs the danger patterns cannot tell apart: any 1-9 digits, any 10+
+_SHORT_RUN = "0"
+_LONG_RUN = "0" * 10
+
+
+def risk_level_for(confidence: float) -> str:
+    """Map a 0-1 confidence onto the detector's risk ladder"""
+    if confidence >= 0.7:
+        return "critical"
+    if confidence >= 0.5:
+        return "high"
+    if confidence >= 0.3:
+        return "medium"
+    return "low"
+
+
+def _digit_placeholder(match) -> str:
+    # 10+ digit runs are phone/account numbers to the detector, keep them distinct
+    return "<num>" if match.end() - match.start() >= 10 else "#"
+
 
 class ScamDetector:
     """Detects scam intent using keyword analysis and pattern matching"""
     
-    def __init__(self):
-        # High-confidence scam keywords (increased weights for better detection)
-        self.scam_keywords = {
-            # Urgency tactics
-            "urgent": 2.5,
-            "immediately": 2.5,
-            "now": 1.8,
-            "quickly": 1.8,
-            "asap": 2.5,
-            "expire": 2.2,
-            "expires": 2.2,
-            "limited time": 2.5,
-            "today": 1.6,
-            "24 hours": 2.0,
-            
-            # Account threats
-            "blocked": 2.8,
-            "suspended": 2.8,
-            "locked": 2.8,
-            "deactivated": 2.5,
-            "freeze": 2.5,
-            "expiry": 2.5,
-            "will be blocked": 3.0,
-            
-            # Verification requests
-            "verify": 2.2,
-            "verification": 2.2,
-            "confirm": 1.8,
-            "validate": 1.8,
-            "authenticate": 2.0,
-            "kyc": 2.5,
-            "update kyc": 3.0,
-            "kyc expired": 3.0,
-            
-            # Payment methods
-            "upi": 2.0,
-            "upi id": 2.5,
-            "bank account": 2.5,
-            "card": 1.6,
-            "credit card": 2.5,
-            "debit card": 2.5,
-            "transfer": 1.8,
-            "paytm": 1.8,
-            "phonepe": 1.8,
-            "gpay": 1.8,
-            
-            # Personal info requests
-            "mobile number": 2.2,
-            "phone number": 2.2,
-            "otp": 2.8,
-            "pin": 2.5,
-            "password": 2.5,
-            "cvv": 3.0,
-            "aadhaar": 2.5,
-            "pan card": 2.5,
-            
-            # Phishing indicators
-            "link": 1.8,
-            "click here": 2.5,
-            "download": 2.0,
-            "qr code": 2.5,
-            "scan": 2.0,
-            "approval": 1.8,
-            "authorize": 2.2,
-            
-            # Fake rewards
-            "reward": 1.8,
-            "cashback": 1.8,
-            "refund": 2.0,
-            "bonus": 1.8,
-            "credit": 1.6,
-            "won": 2.2,
-            "claim": 2.0,
-            "eligible": 1.8,
-            
-            # Threat language
-            "action required": 2.8,
-            "legal action": 2.5,
-            "fine": 2.0,
-            "penalty": 2.0,
-            "arrest": 2.8,
-            "compliance": 2.0,
-            "rbi": 2.2,
-            
-            # Customer service impersonation
-            "customer care": 2.0,
-            "support team": 2.0,
-            "security team": 2.2,
-            "customer service": 2.0,
-            
-            # E-commerce/Shopping scams
-            "order": 1.5,
-            "delivery": 1.5,
-            "cod": 2.0,
-            "cash on delivery": 2.5,
-            "package": 1.8,
-            "parcel": 1.8,
-            "customs": 2.2,
-            "clearance fee": 2.8,
-            "shipping": 1.6,
-            "shipping fee": 2.5,
-            "sale": 1.5,
-            "discount": 1.5,
-            "90% off": 2.5,
-            "80% off": 2.5,
-            "stock": 1.6,
-            "voucher": 1.8,
-            "coupon": 1.6,
-            "offer": 1.5,
-            "limited": 1.8,
-            "exclusive": 1.8,
-            "free": 1.6,
-            "renewal": 1.8,
-            "renew": 1.8,
-            "subscription": 1.6,
-            "membership": 1.6,
-            
-            # Job/Investment scams
-            "job": 1.8,
-            "work from home": 2.5,
-            "wfh": 2.5,
-            "earn": 2.0,
-            "salary": 1.6,
-            "per month": 1.6,
-            "registration fee": 2.8,
-            "training fee": 2.8,
-            "registration": 2.0,
-            "investment": 2.2,
-            "invest": 2.0,
-            "profit": 2.0,
-            "returns": 1.8,
-            "guaranteed": 2.5,
-            "double your money": 3.0,
-            "crypto": 2.0,
-            "cryptocurrency": 2.0,
-            "wallet": 1.8,
-            "bitcoin": 1.8,
-            "stock market": 2.0,
-            "stocks": 1.8,
-            "shares": 1.8,
-            "survey": 1.8,
-            "part-time": 1.6,
-            "mlm": 2.5,
-            "multi-level": 2.5,
-            "withdraw": 1.8,
-            "joining fee": 2.8,
-            "arrears": 2.0,
-            "pension": 1.6,
-        }
+    def __init__(self, lexicon_path: str = None):
+        """
+        Args:
+            lexicon_path: Versioned keyword lexicon file (defaults to SCAM_LEXICON_PATH)
+        """
+        self.lexicon_path = lexicon_path or LEXICON_PATH
         
-        # Patterns for dangerous requests
-        self.danger_patterns = [
+        # Patterns for dangerous requests. Each one that matches anywhere in
+        # the message counts once, and they may overlap (a phone number inside
+        # a UPI ID or link still counts). They are only searched from where
+        # the shared indicator scan found something to the end of that token.
+        self.danger_patterns = [re.compile(pattern) for pattern in [
             r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b',  # Email
             r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',  # URL
             r'\b\d{10,}\b',  # Phone numbers
             r'[A-Z]{2}\d{10}',  # Bank account pattern
             r'\b[\w.-]+@[\w.-]+\.\w+\b',  # Email pattern
-        ]
+        ]]
+        
+        # High-confidence scam keywords, compiled once so each message is
+        # scanned in a single pass. The compiled automaton is swapped as a
+        # whole on reload, so a request always sees one consistent lexicon.
+        self.keyword_automaton = self.compile_lexicon(self.lexicon_path)
+        self._digit_fragments = (None, frozenset())
+    
+    @property
+    def scam_keywords(self) -> Dict[str, float]:
+        """Active keyword -> weight mapping"""
+        automaton = self.keyword_automaton
+        return dict(zip(automaton.keywords, automaton.weights))
+    
+    @property
+    def lexicon_version(self) -> str:
+        """Version string of the active lexicon"""
+        return self.keyword_automaton.version
+    
+    @property
+    def digit_fragments(self) -> FrozenSet[str]:
+        """Digit runs inside the active lexicon's keywords (e.g. "24" of "24 hours")"""
+        automaton = self.keyword_automaton
+        if self._digit_fragments[0] is not automaton:
+            fragments = frozenset(run for keyword in automaton.keywords for run in _DIGITS_RE.findall(keyword))
+            self._digit_fragments = (automaton, fragments)
+        return self._digit_fragments[1]
     
-    def detect(self, message: str) -> Dict:
+    @staticmethod
+    def compile_lexicon(path: str) -> KeywordAutomaton:
+        """
+        Load and compile a keyword lexicon file
+        
+        The file is JSON with a "version" string and either a flat
+        "keywords" object or "categories" of keyword -> weight objects.
+        
+        Args:
+            path: Lexicon file path
+            
+        Returns:
+            Compiled KeywordAutomaton tagged with the lexicon version
+            
+        Raises:
+            ValueError: If the file is not a valid lexicon
+        """
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        
+        version = data.get("version") if isinstance(data, dict) else None
+        if not isinstance(version, str) or not version:
+            raise ValueError(f"Lexicon {path} has no version")
+        
+        groups = list(data.get("categories", {}).values())
+        if "keywords" in data:
+            groups.append(data["keywords"])
+        
+        keywords = {}
+        for group in groups:
+            if not isinstance(group, dict):
+                raise ValueError(f"Lexicon {path} has a malformed keyword group")
+            for keyword, weight in group.items():
+                if not isinstance(keyword, str) or not keyword.strip():
+                    raise ValueError(f"Lexicon {path} has an empty keyword")
+                if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+                    raise ValueError(f"Lexicon {path} has a non-numeric weight for {keyword!r}")
+                # Messages are matched in folded form (see text_analysis.fold)
+                keywords[fold(keyword)] = float(weight)
+        
+        if not keywords:
+            raise ValueError(f"Lexicon {path} has no keywords")
+        
+        return KeywordAutomaton(keywords, version=version)
+    
+    def swap_lexicon(self, automaton: KeywordAutomaton):
+        """Atomically replace the active compiled lexicon"""
+        self.keyword_automaton = automaton
+    
+    def detect(self, message: Union[str, MessageAnalysis]) -> Dict:
         """
         Detect scam intent in a message
         
         Args:
-            message: The message text to analyze
+            message: The message text to analyze, or its shared analysis
             
         Returns:
             Dict with keys:
@@ -181,26 +157,121 @@ class ScamDetector:
             - detected_keywords: list
             - risk_level: str (low/medium/high/critical)
         """
-        message_lower = message.lower()
+        analysis = analyze(message)
+        automaton = self.keyword_automaton
+        patterns = self.matched_patterns(analysis.text)
+        return self._score(automaton, automaton.matched_indices(analysis.folded), patterns, analysis.caps_ratio)
+    
+    def matched_patterns(self, text: str) -> Set[int]:
+        """
+        Find which danger patterns match a message
+        
+        Args:
+            text: Message text (original case)
+            
+        Returns:
+            Set of indices into danger_patterns
+        """
+        matched = set()
+        # The scan is memoized by text, so the extractor reuses it
+        for indicator in scan_indicators(text):
+            self._match_span(text, indicator.start, indicator.end, matched)
+        return matched
+    
+    def _match_span(self, text: str, start: int, end: int, matched: Set[int]):
+        """Add the danger patterns found from start to the end of its token to matched"""
+        if len(matched) == len(self.danger_patterns):
+            return
+        end = token_end(text, end)
+        for index, pattern in enumerate(self.danger_patterns):
+            if index not in matched and pattern.search(text, start, end):
+                matched.add(index)
+    
+    def detect_batch(self, messages: List[str]) -> List[Dict]:
+        """
+        Detect scam intent in many messages at once (stateless)
+        
+        Identical texts in the batch are scored once. The distinct texts are
+        joined into one newline-separated string so lowercasing and the
+        indicator scan each run once over the whole batch; hits are then
+        bucketed back to their messages. Results are identical to calling
+        detect() on each message.
+        
+        Args:
+            messages: List of message texts
+            
+        Returns:
+            List of verdict dicts (same shape as detect), in input order
+        """
+        if not messages:
+            return []
+        
+        automaton = self.keyword_automaton
+        unique = list(dict.fromkeys(messages))
+        separator = "\n"
+        joined = separator.join(unique)
+        
+        # Message i occupies joined[starts[i]:ends[i]]
+        starts = []
+        ends = []
+        position = 0
+        for message in unique:
+            starts.append(position)
+            position += len(message)
+            ends.append(position)
+            position += len(separator)
+        
+        if joined.isascii():
+            # ASCII lowercasing keeps offsets, so slice the joined text
+            joined_lower = joined.lower()
+            folded = [joined_lower[start:end] for start, end in zip(starts, ends)]
+            if fold_hinglish(joined_lower) is not joined_lower:
+                folded = [fold_hinglish(text) for text in folded]
+        else:
+            # Unicode folding can change lengths, so offsets into the joined
+            # text no longer line up; fold one by one
+            folded = [fold(message) for message in unique]
+        
+        patterns = [set() for _ in unique]
+        rescan = set()
+        for match in iter_fused_matches(joined):
+            owner = bisect_right(starts, match.start()) - 1
+            if match.end() > ends[owner]:
+                # Match crossed the separator: it is not a real match and may
+                # have swallowed the start of the next message
+                rescan.update((owner, owner + 1))
+                continue
+            # Tokens end at the separator, so the search stays in the message
+            self._match_span(joined, match.start(), match.end(), patterns[owner])
+        for owner in rescan:
+            if owner < len(unique):
+                patterns[owner] = self.matched_patterns(unique[owner])
+        
+        verdicts = {
+            message: self._score(automaton, automaton.matched_indices(folded[i]), patterns[i], caps_ratio(message))
+            for i, message in enumerate(unique)
+        }
+        # Hand out copies so callers can't mutate a verdict shared by duplicates
+        return [
+            {**verdicts[message], "detected_keywords": list(verdicts[message]["detected_keywords"])}
+            for message in messages
+        ]
+    
+    def _score(self, automaton: KeywordAutomaton, keyword_indices: List[int], patterns: Set[int], caps: float) -> Dict:
+        """Turn keyword hits and matched danger patterns into a verdict dict"""
         score = 0.0
         detected_keywords = []
         
-        # Check for scam keywords
-        for keyword, weight in self.scam_keywords.items():
-            if keyword in message_lower:
-                score += weight
-                detected_keywords.append(keyword)
+        # Check for scam keywords (single automaton pass, lexicon order kept)
+        for index in keyword_indices:
+            score += automaton.weights[index]
+            detected_keywords.append(automaton.keywords[index])
         
         # Check for dangerous patterns
-        pattern_count = 0
-        for pattern in self.danger_patterns:
-            if re.search(pattern, message):
-                pattern_count += 1
-                score += 1.5
+        score += 1.5 * len(patterns)
         
         # Check for ALL CAPS (urgency indicator)
-        caps_count = sum(1 for c in message if c.isupper())
-        if len(message) > 0 and caps_count / len(message) > 0.3:
+        if caps > 0.3:
             score += 1.5
             detected_keywords.append("excessive_caps")
         
@@ -222,14 +293,218 @@ class ScamDetector:
             "confidence": round(confidence, 2),
             "detected_keywords": detected_keywords,
             "risk_level": risk_level,
-            "score": score
+            "score": score,
+            "engine": "keyword"
         }
 
 
-# Singleton instance
+def message_template(message: str) -> str:
+    """
+    Collapse the variable parts of a message
+    
+    URLs, digit runs and whitespace are collapsed so campaign messages that
+    only differ in amounts, phone digits or links share a template. Digit
+    runs of 10+ digits keep their own placeholder (they are phone or account
+    numbers for the detector).
+    
+    Args:
+        message: Original message text
+        
+    Returns:
+        Template text
+    """
+    template = message
+    if "http" in template or "www." in template:
+        template = _URL_RE.sub("<url>", template)
+    template = _DIGITS_RE.sub(_digit_placeholder, template)
+    return " ".join(template.split())
+
+
+def verdict_template(message: str, digit_fragments: FrozenSet[str] = frozenset()) -> str:
+    """
+    Reduce a message to a stand-in the keyword detector scores the same way
+    
+    Only digit runs are replaced: 1-9 digits by "0" and 10+ digits by ten
+    zeros, which the danger patterns cannot tell apart. Runs holding a digit
+    fragment of a lexicon keyword are kept, as is everything else (URL text
+    and spacing feed keyword hits too).
+    
+    Args:
+        message: Original message text
+        digit_fragments: Digit runs of the active lexicon (see
+                         ScamDetector.digit_fragments)
+        
+    Returns:
+        Template text
+    """
+    def placeholder(match) -> str:
+        run = match.group()
+        replacement = _LONG_RUN if len(run) >= 10 else _SHORT_RUN
+        if digit_fragments:
+            # Indic digits match keywords in folded form
+            folded = fold(run)
+            if any(fragment in folded or fragment in replacement for fragment in digit_fragments):
+                return run
+        return replacement
+    
+    return _DIGITS_RE.sub(placeholder, message)
+
+
+def fingerprint(message: Union[str, MessageAnalysis], digit_fragments: FrozenSet[str] = frozenset()) -> bytes:
+    """
+    Fingerprint a message by its verdict template
+    
+    The ALL-CAPS flag is folded in with the template because it depends on
+    the exact character counts.
+    
+    Args:
+        message: Original message text, or its shared analysis
+        digit_fragments: Digit runs to keep (see verdict_template)
+        
+    Returns:
+        16-byte digest
+    """
+    if isinstance(message, MessageAnalysis):
+        template = verdict_template(message.text, digit_fragments)
+        shouting = message.caps_ratio > 0.3
+    else:
+        template = verdict_template(message, digit_fragments)
+        shouting = caps_ratio(message) > 0.3
+    return hashlib.blake2b(
+        f"{int(shouting)}|{template}".encode("utf-8", "surrogatepass"),
+        digest_size=16
+    ).digest()
+
+
+# Singleton instances
 detector = ScamDetector()
 
+# The linear model (and numpy) is loaded on first use, not with this module
+_linear_classifier = None
+_linear_loaded = False
+_linear_lock = threading.Lock()
+
+# Verdicts for recently seen message templates
+verdict_cache = LRUCache(VERDICT_CACHE_SIZE, ttl=VERDICT_CACHE_TTL)
+
+DETECTION_ENGINES = ("keyword", "linear")
+
+
+def load_linear_classifier():
+    """
+    The trained linear model, loaded on first call
+    
+    Returns:
+        LinearScamClassifier, or None if numpy or the model file is missing
+    """
+    global _linear_classifier, _linear_loaded
+    if not _linear_loaded:
+        with _linear_lock:
+            if not _linear_loaded:
+                from classifier import CLASSIFIER_MODEL_PATH, load_default_model
+                _linear_classifier = load_default_model()
+                _linear_loaded = True
+                if _linear_classifier is None:
+                    print(f"⚠️  Warning: No linear classifier model at {CLASSIFIER_MODEL_PATH} "
+                          f"(or numpy is missing), the keyword engine is used instead")
+    return _linear_classifier
+
+
+def get_engine(name: str = None):
+    """
+    Resolve a detection engine by name
+    
+    Args:
+        name: "keyword" or "linear"; None uses DETECTION_ENGINE
+        
+    Returns:
+        (engine_name, engine) - falls back to the keyword detector when the
+        linear model is not available
+        
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    name = (name or DETECTION_ENGINE).lower()
+    if name not in DETECTION_ENGINES:
+        raise ValueError(f"Unknown detection engine: {name}")
+    if name == "linear":
+        classifier = load_linear_classifier()
+        if classifier is not None:
+            return name, classifier
+    return "keyword", detector
+
+
+def detect_scam(message: Union[str, MessageAnalysis], engine: str = None) -> Dict:
+    """Convenience function to detect scam (served from the template cache when possible)"""
+    name, scorer = get_engine(engine)
+    if scorer is detector:
+        key = name.encode("ascii") + fingerprint(message, detector.digit_fragments)
+    else:
+        # The linear model hashes every word, digits included: key on the exact text
+        text = message.text if isinstance(message, MessageAnalysis) else message
+        key = name.encode("ascii") + hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    verdict = verdict_cache.get(key)
+    if verdict is None:
+        analysis = analyze(message)
+        verdict = detector.detect(analysis) if scorer is detector else scorer.detect(analysis.text)
+        verdict_cache.put(key, verdict)
+    return {**verdict, "detected_keywords": list(verdict["detected_keywords"])}
+
+
+def apply_known_bad(verdict: Dict, indicators: List[str]) -> Dict:
+    """
+    Raise a verdict for indicators found in the known-bad feed
+    
+    Applied outside the verdict cache, since the cache key collapses the
+    phone and account numbers that decide whether an indicator is listed.
+    
+    Args:
+        verdict: Verdict from detect_scam
+        indicators: Listed indicator values found in the message
+        
+    Returns:
+        New verdict with confidence raised by KNOWN_BAD_BOOST per indicator.
+        "score" stays the engine's own score (its scale differs per engine);
+        callers should read "confidence" and "risk_level", which include
+        the boost.
+    """
+    if not indicators:
+        return verdict
+    confidence = round(min(verdict["confidence"] + KNOWN_BAD_BOOST * len(indicators), 1.0), 2)
+    return {
+        **verdict,
+        "is_scam": verdict["is_scam"] or confidence >= 0.3,
+        "confidence": confidence,
+        "detected_keywords": list(verdict["detected_keywords"]) + ["known_bad_indicator"],
+        "risk_level": risk_level_for(confidence),
+        "known_bad": list(indicators)
+    }
+
+
+def detect_scam_batch(messages: List[str], engine: str = None) -> List[Dict]:
+    """Convenience function to detect scam in a batch of messages"""
+    return get_engine(engine)[1].detect_batch(messages)
+
+
+def install_lexicon(automaton: KeywordAutomaton) -> str:
+    """
+    Swap a compiled lexicon into the shared detector
+    
+    Cached verdicts are dropped because they were scored against the old
+    lexicon. Call this from the same thread that serves detect_scam (the
+    event loop) so no stale verdict can be cached after the swap.
+    
+    Args:
+        automaton: Lexicon compiled with ScamDetector.compile_lexicon
+        
+    Returns:
+        Version of the newly active lexicon
+    """
+    detector.swap_lexicon(automaton)
+    verdict_cache.clear()
+    return automaton.version
+
 
-def detect_scam(message: str) -> Dict:
-    """Convenience function to detect scam"""
-    return detector.detect(message)
+def reload_lexicon(path: str = None) -> str:
+    """Compile a lexicon file and install it (blocking convenience function)"""
+    return install_lexicon(ScamDetector.compile_lexicon(path or detector.lexicon_path))
@@ -0,0 +1,248 @@
+"""
+Template Index Module - Near-duplicate lookup of known scam message templates
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from cache import LRUCache
+from scam_detector import message_template
+
+# MinHash similarity (estimated Jaccard over word unigrams and bigrams) for
+# a message to count as a known template, and the looser similarity used to
+# group templates into campaigns
+TEMPLATE_MATCH_SIMILARITY = float(os.getenv("TEMPLATE_MATCH_SIMILARITY", 0.7))
+CAMPAIGN_MATCH_SIMILARITY = float(os.getenv("CAMPAIGN_MATCH_SIMILARITY", 0.4))
+TEMPLATE_INDEX_SIZE = int(os.getenv("TEMPLATE_INDEX_SIZE", 50000))
+
+# Signature layout: _BANDS bands of _ROWS min-hashes each. Two templates
+# become candidates when any band matches exactly; with 8 x 4 a pair at
+# similarity 0.7 is found ~89% of the time and at 0.85 ~99.7%.
+_BANDS = 8
+_ROWS = 4
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(b"a%d" % i, digest_size=8).digest(), "little") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.blake2b(b"b%d" % i, digest_size=8).digest(), "little") % _MERSENNE_PRIME)
+    for i in range(_BANDS * _ROWS)
+]
+
+# Templates kept per LSH bucket; bounds the candidates compared per lookup
+_BUCKET_LIMIT = 32
+
+_TOKEN_RE = re.compile(r"<\w+>|\w+")
+
+
+class TemplateMatch(NamedTuple):
+    """Nearest known template for a message"""
+    template_id: int
+    campaign_id: int
+    similarity: float
+    count: int
+
+
+class ScamTemplate:
+    """A representative scammer message and what was learned from it"""
+
+    __slots__ = ("template_id", "campaign_id", "signature", "text", "count", "verdicts", "shape")
+
+    def __init__(self, template_id: int, campaign_id: int, signature: tuple, text: str):
+        self.template_id = template_id
+        self.campaign_id = campaign_id
+        self.signature = signature
+        self.text = text
+        self.count = 1
+        # engine name -> (lexicon version, verdict)
+        self.verdicts: Dict[str, tuple] = {}
+        # Template-invariant intelligence (suspicious keywords and tactics)
+        self.shape: Optional[Dict] = None
+
+    def verdict_for(self, engine: str, lexicon_version: str) -> Optional[Dict]:
+        """Stored verdict for an engine, if it was scored with this lexicon"""
+        entry = self.verdicts.get(engine)
+        if entry is None or entry[0] != lexicon_version:
+            return None
+        return entry[1]
+
+
+class TemplateIndex:
+    """MinHash index of scammer messages with banded LSH lookup
+
+    Each message is reduced to its template (see message_template) and its
+    word unigrams and bigrams are summarized by a MinHash signature, whose
+    agreement rate estimates the Jaccard similarity of two messages. Only
+    templates sharing a band bucket with the message are compared, and
+    buckets are capped, which bounds lookup time no matter how many
+    messages have been indexed.
+    """
+
+    def __init__(self,
+                 threshold: float = TEMPLATE_MATCH_SIMILARITY,
+                 campaign_threshold: float = CAMPAIGN_MATCH_SIMILARITY,
+                 capacity: int = TEMPLATE_INDEX_SIZE):
+        """
+        Args:
+            threshold: Similarity for a near-duplicate match
+            campaign_threshold: Similarity for joining an existing campaign
+            capacity: Maximum number of distinct templates kept
+        """
+        self.threshold = threshold
+        self.campaign_threshold = min(campaign_threshold, threshold)
+        self.capacity = capacity
+        self._buckets: List[Dict[tuple, List[ScamTemplate]]] = [{} for _ in range(_BANDS)]
+        self._templates: List[ScamTemplate] = []
+        # Exact template text -> template, so repeats of an already filed
+        # variant skip the signature entirely
+        self._exact = LRUCache(capacity)
+        self._feature_hashes: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.indexed = 0
+        self.near_duplicates = 0
+
+    def signature(self, message: str) -> tuple:
+        """MinHash signature of a message template"""
+        return self._signature(message_template(message).lower())
+
+    def _signature(self, template_text: str) -> tuple:
+        tokens = _TOKEN_RE.findall(template_text)
+        features = set(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        if not features:
+            return ()
+
+        # The per-feature hash vectors are memoized, so the signature is a
+        # column-wise min over cached tuples
+        memo = self._feature_hashes
+        hashes = []
+        for feature in features:
+            row = memo.get(feature)
+            if row is None:
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+                row = tuple((a * h + b) % _MERSENNE_PRIME for a, b in _PERMUTATIONS)
+                if len(memo) < 200000:
+                    memo[feature] = row
+            hashes.append(row)
+        return tuple([min(column) for column in zip(*hashes)])
+
+    @staticmethod
+    def _band_keys(signature: tuple):
+        for band in range(_BANDS):
+            yield signature[band * _ROWS:(band + 1) * _ROWS]
+
+    @staticmethod
+    def similarity(a: tuple, b: tuple) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        if not a or not b:
+            return 0.0
+        return sum(map(int.__eq__, a, b)) / len(a)
+
+    def _nearest(self, signature: tuple) -> Optional[tuple]:
+        best = None
+        seen = set()
+        for buckets, key in zip(self._buckets, self._band_keys(signature)):
+            for template in buckets.get(key, ()):
+                if template.template_id in seen:
+                    continue
+                seen.add(template.template_id)
+                similarity = self.similarity(template.signature, signature)
+                if best is None or similarity > best[0]:
+                    best = (similarity, template)
+        return best
+
+    def lookup(self, message: str) -> Optional[TemplateMatch]:
+        """
+        Report the nearest known template and its campaign
+
+        Args:
+            message: Message text
+
+        Returns:
+            TemplateMatch for the nearest template sharing a band, or None
+        """
+        signature = self.signature(message)
+        with self._lock:
+            best = self._nearest(signature)
+        if best is None:
+            return None
+        similarity, template = best
+        return TemplateMatch(template.template_id, template.campaign_id, round(similarity, 4), template.count)
+
+    def add(self, message: str) -> Optional[ScamTemplate]:
+        """
+        Index a scammer message
+
+        A near-duplicate of a known template only bumps that template's
+        count. Otherwise the message becomes a new template, joining the
+        campaign of the nearest candidate above campaign_threshold.
+
+        Args:
+            message: Scammer message text
+
+        Returns:
+            The template the message was filed under, or None if the message
+            has no words or the index is full
+        """
+        template_text = message_template(message).lower()
+        with self._lock:
+            self.indexed += 1
+            template = self._exact.get(template_text)
+            if template is not None:
+                self.near_duplicates += 1
+                template.count += 1
+                return template
+
+        signature = self._signature(template_text)
+        if not signature:
+            return None
+        with self._lock:
+            best = self._nearest(signature)
+            if best is not None and best[0] >= self.threshold:
+                self.near_duplicates += 1
+                best[1].count += 1
+                self._exact.put(template_text, best[1])
+                return best[1]
+            if len(self._templates) >= self.capacity:
+                return None
+
+            template_id = len(self._templates) + 1
+            campaign_id = best[1].campaign_id if best is not None and best[0] >= self.campaign_threshold else template_id
+            template = ScamTemplate(template_id, campaign_id, signature, message)
+            self._templates.append(template)
+            for buckets, key in zip(self._buckets, self._band_keys(signature)):
+                bucket = buckets.setdefault(key, [])
+                if len(bucket) < _BUCKET_LIMIT:
+                    bucket.append(template)
+            self._exact.put(template_text, template)
+            return template
+
+    def add_many(self, messages: Iterable[str]) -> int:
+        """Index many messages, returning how many were indexed"""
+        count = 0
+        for message in messages:
+            if message and self.add(message) is not None:
+                count += 1
+        return count
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def stats(self) -> Dict:
+        """Snapshot of size and near-duplicate counters"""
+        campaigns = len({t.campaign_id for t in self._templates})
+        return {
+            "templates": len(self._templates),
+            "campaigns": campaigns,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "indexed": self.indexed,
+            "near_duplicates": self.near_duplicates,
+            "near_duplicate_rate": round(self.near_duplicates / self.indexed, 4) if self.indexed else 0.0,
+            "exact_hits": self._exact.hits
+        }
+
+
+# Singleton instance
+template_index = TemplateIndex()
@@ -0,0 +1,151 @@
+"""
+Tests for asynchronous reply generation: concurrency limit, deadline and fallback
+"""
+
+import asyncio
+import time
+
+from agent import ScamEngagementAgent
+from circuit_breaker import CircuitBreaker
+from fake_llm import FakeModel
+from reply_cache import ReplyCache
+
+
+class CountingModel(FakeModel):
+    """FakeModel that records the most calls it had in flight at once"""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate_content_async(prompt, generation_config, stream)
+        finally:
+            self.active -= 1
+
+
+def make_agent(model, max_concurrency=2, timeout=5.0):
+    agent = ScamEngagementAgent(connect=False)
+    agent.set_backend(model)
+    agent.max_concurrency = max_concurrency
+    agent.timeout = timeout
+    agent.reply_cache = ReplyCache(capacity=0)
+    # Never trips, so every reply reaches the model
+    agent.breaker = CircuitBreaker(window=1000, min_calls=1000)
+    return agent
+
+
+def fallback(agent, message):
+    return agent._get_smart_fallback(message, [])
+
+
+def test_calls_in_flight_never_exceed_the_limit():
+    model = CountingModel(latency=0.02, echo=True)
+    agent = make_agent(model, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*(agent.generate_reply_async(f"message {i}") for i in range(12)))
+
+    replies = asyncio.run(run())
+    assert model.peak == 3
+    assert model.calls == 12
+    # Each reply belongs to the message that asked for it
+    assert replies == [f"You said: message {i}" for i in range(12)]
+    assert agent.in_flight == 0
+
+
+def test_blocking_client_runs_on_the_thread_pool():
+    model = FakeModel(latency=0.1, async_client=False, echo=True)
+    agent = make_agent(model, max_concurrency=4)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # The event loop keeps running while the four calls block their threads
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while loop.time() - start < 0.08:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        replies, _ = await asyncio.gather(
+            asyncio.gather(*(agent.generate_reply_async(f"m{i}") for i in range(4))), tick()
+        )
+        return replies, ticks, loop.time() - start
+
+    replies, ticks, elapsed = asyncio.run(run())
+    assert replies == [f"You said: m{i}" for i in range(4)]
+    assert ticks >= 4
+    # Four blocking calls one after another would take 0.4s
+    assert elapsed < 0.3
+
+
+def test_reply_past_the_deadline_falls_back():
+    model = FakeModel(latency=0.5)
+    agent = make_agent(model, timeout=0.05)
+    message = "Your account will be blocked"
+
+    async def run():
+        start = time.perf_counter()
+        reply = await agent.generate_reply_async(message)
+        return reply, time.perf_counter() - start, agent.in_flight
+
+    reply, elapsed, in_flight = asyncio.run(run())
+    assert reply == fallback(agent, message)
+    assert elapsed < 0.3
+    assert agent.llm_timeouts == 1
+    # The abandoned call keeps its slot until it actually ends
+    assert in_flight == 1
+
+
+def test_slot_wait_counts_against_the_deadline():
+    model = FakeModel(latency=0.2)
+    agent = make_agent(model, max_concurrency=1, timeout=0.3)
+
+    async def run():
+        return await asyncio.gather(agent.generate_reply_async("first"), agent.generate_reply_async("second"))
+
+    first, second = asyncio.run(run())
+    assert first in FakeModel.REPLIES
+    assert second == fallback(agent, "second")
+    assert agent.llm_timeouts == 1
+
+
+def test_model_errors_fall_back():
+    model = FakeModel(latency=0.01, error_rate=1.0)
+    agent = make_agent(model)
+    message = "Share the OTP now"
+    assert asyncio.run(agent.generate_reply_async(message)) == fallback(agent, message)
+    assert agent.llm_errors == 1
+
+
+def test_no_backend_uses_the_scripted_reply():
+    agent = make_agent(None)
+    message = "Your account will be blocked"
+    assert asyncio.run(agent.generate_reply_async(message)) == fallback(agent, message)
+    assert agent.llm_calls == 0
+
+
+def test_hedged_reply_finishes_in_the_background():
+    model = FakeModel(latency=0.1)
+    agent = make_agent(model)
+    agent.hedge_seconds = 0.02
+    message = "Pay the fee now"
+
+    async def run():
+        reply = await agent.generate_reply_async(message)
+        pending = set(agent._hedged_calls)
+        await asyncio.gather(*pending)
+        return reply, len(pending)
+
+    reply, pending = asyncio.run(run())
+    assert reply == fallback(agent, message)
+    assert pending == 1
+    assert agent.llm_hedged == 1
+    assert agent.breaker.stats()["window_calls"] == 1
@@ -0,0 +1,94 @@
+"""
+Tests for streamed agent replies
+"""
+
+import asyncio
+
+from agent import ScamEngagementAgent
+from circuit_breaker import CircuitBreaker
+from fake_llm import FakeModel, FakeResponse
+from reply_cache import ReplyCache
+
+
+class ScriptedStream:
+    """Streams fixed chunks, optionally stalling before the last one"""
+
+    def __init__(self, chunks, stall: float = 0.0):
+        self.chunks = chunks
+        self.stall = stall
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        chunks, stall = self.chunks, self.stall
+
+        async def pieces():
+            for position, chunk in enumerate(chunks):
+                if stall and position == len(chunks) - 1:
+                    await asyncio.sleep(stall)
+                yield FakeResponse(chunk)
+
+        if not stream:
+            return FakeResponse("".join(chunks))
+        return pieces()
+
+    def generate_content(self, prompt, generation_config=None):
+        return FakeResponse("".join(self.chunks))
+
+
+def make_agent(model, timeout=5.0):
+    agent = ScamEngagementAgent(connect=False)
+    agent.set_backend(model)
+    agent.timeout = timeout
+    agent.reply_cache = ReplyCache(capacity=10, ttl=60, variants=1)
+    agent.breaker = CircuitBreaker(window=1000, min_calls=1000)
+    return agent
+
+
+def collect(agent, message, history=None):
+    async def run():
+        return [piece async for piece in agent.stream_reply_async(message, history or [])]
+    return asyncio.run(run())
+
+
+def test_pieces_join_to_the_reply():
+    model = FakeModel(latency=0.04, first_token=0.01, seed=3)
+    pieces = collect(make_agent(model), "Your account is blocked")
+    assert len(pieces) > 1
+    assert "".join(pieces) in FakeModel.REPLIES
+
+
+def test_speaker_label_is_stripped_across_pieces():
+    agent = make_agent(ScriptedStream(["Yo", "u: Wa", "it, ", "why?"]))
+    assert "".join(collect(agent, "Pay now")) == "Wait, why?"
+
+
+def test_streamed_reply_is_cached_and_served_whole():
+    agent = make_agent(ScriptedStream(["Hmm, ", "which bank ", "is this?"]))
+    message = "Share the OTP"
+    first = collect(agent, message)
+    assert len(first) > 1
+    # The same script turn is answered from the cache in one piece
+    assert collect(agent, message) == ["Hmm, which bank is this?"]
+
+
+def test_deadline_keeps_what_was_already_sent():
+    agent = make_agent(ScriptedStream(["Wait, ", "why would ", "they block it?"], stall=0.5), timeout=0.1)
+    pieces = collect(agent, "Account blocked")
+    assert "".join(pieces) == "Wait, why would"
+    assert agent.llm_timeouts == 1
+
+
+def test_stream_without_any_text_falls_back():
+    agent = make_agent(ScriptedStream(["Wait"], stall=0.5), timeout=0.1)
+    message = "Account blocked"
+    assert collect(agent, message) == [agent._get_smart_fallback(message, [])]
+
+
+def test_blocking_client_streams_one_piece():
+    agent = make_agent(FakeModel(latency=0.01, async_client=False, echo=True))
+    assert collect(agent, "Send Rs 500") == ["You said: Send Rs 500"]
+
+
+def test_no_backend_streams_the_scripted_reply():
+    agent = make_agent(None)
+    message = "Account blocked"
+    assert collect(agent, message) == [agent._get_smart_fallback(message, [])]
@@ -0,0 +1,134 @@
+"""
+Tests for the LLM circuit breaker
+"""
+
+import types
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manually advanced monotonic clock for the breaker module"""
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def make_breaker(**overrides):
+    options = dict(window=4, min_calls=4, error_rate=0.5, slow_rate=0.5, slow_seconds=2.0, cooldown=30.0)
+    options.update(overrides)
+    return CircuitBreaker(**options)
+
+
+def test_closed_until_the_window_has_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record(0.1, ok=False)
+    assert breaker.state == CLOSED
+    breaker.record(0.1, ok=False)
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+
+
+def test_full_cycle_closed_open_half_open_closed(clock):
+    breaker = make_breaker()
+    for ok in (True, False, True, False):
+        breaker.record(0.1, ok)
+    assert breaker.state == OPEN
+
+    # Open: refused until the cooldown has passed
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    clock.now += 29.9
+    assert breaker.state == OPEN
+    clock.now += 0.1
+    assert breaker.state == HALF_OPEN
+
+    # Half-open: exactly one probe goes out
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.probes == 1
+
+    breaker.record(0.1, ok=True)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_calls"] == 0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(0.1, ok=False)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(0.1, ok=False)
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+    assert breaker.stats()["retry_in_seconds"] == 30.0
+
+
+def test_slow_probe_reopens(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(0.1, ok=False)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(2.0, ok=True)
+    assert breaker.state == OPEN
+
+
+def test_slow_successes_trip_the_breaker(clock):
+    breaker = make_breaker()
+    breaker.record(0.1, ok=True)
+    breaker.record(0.1, ok=True)
+    breaker.record(2.5, ok=True)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["slow_rate"] == pytest.approx(1 / 3, abs=1e-3)
+    breaker.record(2.0, ok=True)
+    assert breaker.state == OPEN
+
+
+def test_failed_calls_are_not_counted_as_slow(clock):
+    breaker = make_breaker(error_rate=1.0)
+    breaker.record(5.0, ok=False)
+    breaker.record(5.0, ok=True)
+    stats = breaker.stats()
+    assert stats["failure_rate"] == 0.5
+    assert stats["slow_rate"] == 0.5
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = make_breaker()
+    breaker.record(0.1, ok=False)
+    for _ in range(4):
+        breaker.record(0.1, ok=True)
+    # Only the last four calls (all fine) are judged
+    assert breaker.stats()["failure_rate"] == 0.0
+    breaker.record(0.1, ok=False)
+    assert breaker.state == CLOSED
+
+
+def test_unreported_probe_is_replaced_after_a_cooldown(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(0.1, ok=False)
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.probes == 2
+
+
+def test_calls_from_before_the_trip_are_ignored(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(0.1, ok=False)
+    breaker.record(0.1, ok=True)
+    assert breaker.state == OPEN
+    assert breaker.stats()["window_calls"] == 0
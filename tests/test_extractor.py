@@ -0,0 +1,87 @@
+"""
+Tests for intelligence extraction
+"""
+
+import random
+
+import pytest
+
+from extractor import extractor, read_chunks
+
+
+@pytest.mark.parametrize("message, phones", [
+    ("Send Rs 500 to 9876543210@paytm now", ["9876543210"]),
+    ("Visit http://bit.ly/9876543210", ["9876543210"]),
+    ("mail 9123456789@gmail.com", ["9123456789"]),
+    ("Call 9876543210 or pay to 9123456789@ybl", ["9876543210", "9123456789"]),
+])
+def test_phone_numbers_inside_other_indicators_are_reported(message, phones):
+    # The original per-kind regexes overlapped, so these numbers were phones too
+    assert extractor.extract_from_message(message)["phoneNumbers"] == phones
+
+
+def test_nested_phone_numbers_stream_like_whole_text():
+    text = "pay 9876543210@paytm or open http://x.in/9123456789 " * 3
+    stream = extractor.open_stream()
+    found = [item.value for chunk in (text[:20], text[20:45], text[45:]) for item in stream.feed(chunk)]
+    found += [item.value for item in stream.close()]
+    whole = extractor.extract_intelligence([{"text": text}])
+    assert sorted(found) == sorted(whole["phoneNumbers"] + whole["upiIds"] + whole["phishingLinks"])
+
+
+STREAM_TEXT = (
+    "URGENT: your account will be blocked. Verify now at https://sbi-kyc.example/login?id=42 "
+    "or pay Rs 499 to refund.desk@okaxis\n"
+    "Call +91 98765 43210 or 9123456789, account number 123456789012 (IFSC SBIN0001234).\n"
+    "Share the OTP and PIN immediately; mail support9876543210@gmail.com, "
+    "download app from www.kyc-update.in/app.apk\tbank transfer only, don't delay!\n"
+)
+
+
+def split_at(text, cuts):
+    bounds = [0, *cuts, len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_stream_matches_whole_text_at_every_split_point():
+    whole = extractor.extract_intelligence([{"text": STREAM_TEXT}])
+    for cut in range(1, len(STREAM_TEXT)):
+        assert extractor.extract_stream(split_at(STREAM_TEXT, [cut])) == whole, cut
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_stream_matches_whole_text_for_random_chunks(seed):
+    rnd = random.Random(seed)
+    text = STREAM_TEXT * rnd.randint(1, 40)
+    cuts = sorted(rnd.sample(range(1, len(text)), rnd.randint(1, 60)))
+    assert extractor.extract_stream(split_at(text, cuts)) == extractor.extract_intelligence([{"text": text}])
+
+
+def test_stream_of_single_characters():
+    text = STREAM_TEXT * 3
+    assert extractor.extract_stream(iter(text)) == extractor.extract_intelligence([{"text": text}])
+
+
+def test_keyword_split_across_chunks():
+    chunks = ["please don't del", "ay, it is ur", "gent"]
+    streamed = extractor.extract_stream(chunks)["suspiciousKeywords"]
+    assert {"don't delay", "urgent"} <= set(streamed)
+    assert streamed == extractor.extract_intelligence([{"text": "".join(chunks)}])["suspiciousKeywords"]
+
+
+def test_streamed_offsets_point_at_first_occurrences():
+    text = STREAM_TEXT * 2
+    stream = extractor.open_stream()
+    found = [item for chunk in split_at(text, [50, 51, 200]) for item in stream.feed(chunk)] + stream.close()
+    assert found
+    for item in found:
+        assert text.find(item.value) == item.offset
+    assert len({(item.key, item.value) for item in found}) == len(found)
+
+
+def test_read_chunks_feeds_the_stream(tmp_path):
+    path = tmp_path / "export.txt"
+    path.write_text(STREAM_TEXT * 50, encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        streamed = extractor.extract_stream(read_chunks(f, chunk_size=97))
+    assert streamed == extractor.extract_intelligence([{"text": STREAM_TEXT * 50}])
@@ -0,0 +1,73 @@
+"""
+Tests for the cross-session indicator index
+"""
+
+import pytest
+
+from indicator_index import IndicatorIndex, normalize_indicator, resolve_kind
+
+
+@pytest.mark.parametrize("kind, value, normalized", [
+    ("phoneNumbers", "+91 98765-43210", "9876543210"),
+    ("phone", "09876543210", "9876543210"),
+    ("bankAccounts", "1234 5678-9012", "123456789012"),
+    ("upiIds", " Fraud@YBL ", "fraud@ybl"),
+    ("phishingLinks", "https://www.Bit.ly/abc/", "bit.ly/abc"),
+    ("url", "http://sbi-kyc.example/login).", "sbi-kyc.example/login"),
+])
+def test_spelling_variants_normalize_to_one_entry(kind, value, normalized):
+    assert normalize_indicator(kind, value) == normalized
+
+
+def test_kind_aliases():
+    assert resolve_kind("upiIds") == "upiIds"
+    assert resolve_kind("UPI") == "upiIds"
+    assert resolve_kind("suspiciousKeywords") is None
+
+
+def test_lookup_lists_sessions_oldest_first():
+    index = IndicatorIndex()
+    index.add("s2", {"upiIds": ["fraud@ybl"]}, "2026-01-02T09:00:00")
+    index.add("s1", {"upiIds": ["FRAUD@ybl"], "phoneNumbers": ["9876543210"]}, "2026-01-01T09:00:00")
+    index.add("s3", {"upiIds": ["fraud@ybl"]}, "2026-01-03T09:00:00")
+    index.add("s2", {"upiIds": ["fraud@ybl"]}, "2026-01-04T09:00:00")
+
+    [match] = index.lookup("Fraud@YBL", "upi")
+    assert match["indicator"] == "fraud@ybl"
+    assert match["session_count"] == 3
+    assert match["first_seen"] == "2026-01-01T09:00:00"
+    assert match["last_seen"] == "2026-01-04T09:00:00"
+    # Insertion order of the sessions, limited
+    assert match["sessions"] == ["s2", "s1", "s3"]
+    assert index.lookup("fraud@ybl", "upi", limit=1)[0]["sessions"] == ["s2"]
+
+
+def test_lookup_without_kind_checks_every_kind():
+    index = IndicatorIndex()
+    index.add("s1", {"phoneNumbers": ["+91 9876543210"], "bankAccounts": ["9876543210"]})
+    assert {match["kind"] for match in index.lookup("9876543210")} == {"phoneNumbers", "bankAccounts"}
+    assert index.lookup("9876543210", "nonsense") == []
+    assert index.lookup("0000000000") == []
+
+
+def test_non_indicator_kinds_are_not_indexed():
+    index = IndicatorIndex()
+    added = index.add("s1", {"suspiciousKeywords": ["otp"], "upiIds": ["", "a@ybl"]})
+    assert added == 1
+    assert len(index) == 1
+    assert index.stats()["by_kind"]["upiIds"] == 1
+
+
+def test_load_and_updates_can_interleave():
+    index = IndicatorIndex()
+    index.add("live", {"upiIds": ["a@ybl"]}, "2026-02-01T00:00:00")
+    loaded = index.load([
+        ("old", "upiIds", "a@ybl", "2026-01-01T00:00:00"),
+        ("live", "upiIds", "a@ybl", "2026-01-15T00:00:00"),
+        ("old", "tactic", "{}", None),
+    ])
+    assert loaded == 2
+    [match] = index.lookup("a@ybl", "upiIds")
+    assert match["first_seen"] == "2026-01-01T00:00:00"
+    assert match["last_seen"] == "2026-02-01T00:00:00"
+    assert match["session_count"] == 2
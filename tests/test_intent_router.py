@@ -0,0 +1,61 @@
+"""
+Tests for the compiled intent rules
+"""
+
+import pytest
+
+from intent_router import IntentRoute, IntentRules, INTENT_RULES_PATH
+from text_analysis import analyze
+
+MESSAGES = [
+    "Your account is blocked, share the OTP now",
+    "Please verify your KYC immediately",
+    "You won a cashback reward, send your UPI ID",
+    "Scan this QR code to receive the refund",
+    "Enter your card password and click the link",
+    "Payment done, wait while we process the credit",
+    "Aapka account block ho gaya hai",
+    "Hello, how are you?",
+    "",
+]
+
+
+def substring_route(rules, analysis, turn_count):
+    """The original per-probe substring loop"""
+    stage = rules.stage_for(turn_count)
+    for keyword, rank in stage.probes:
+        if keyword in analysis.folded:
+            return IntentRoute(stage.name, stage.intents[rank], stage.replies[rank])
+    return IntentRoute(stage.name, None, stage.default)
+
+
+def substring_should_continue(rules, analysis, message_count):
+    if rules.max_messages is not None and message_count >= rules.max_messages:
+        return False
+    if any(keyword in analysis.folded for keyword in rules.continue_keywords):
+        return True
+    return rules.continue_default
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_automaton_routes_like_the_substring_loop(message):
+    rules = IntentRules.load(INTENT_RULES_PATH)
+    analysis = analyze(message)
+    for turns in range(12):
+        assert rules.route(analysis, turns) == substring_route(rules, analysis, turns)
+        assert rules.should_continue(analysis, turns) == substring_should_continue(rules, analysis, turns)
+
+
+def test_earlier_rule_wins_over_earlier_position():
+    rules = IntentRules({
+        "version": "t",
+        "stages": [{"name": "only", "rules": [
+            {"intent": "first", "keywords": ["otp"], "reply": "a"},
+            {"intent": "second", "keywords": ["blocked"], "reply": "b"},
+        ], "default": "d"}],
+        "continue": {"keywords": ["otp"], "default": False},
+    })
+    analysis = analyze("blocked, send otp")
+    assert rules.route(analysis, 0).intent == "first"
+    assert rules.should_continue(analysis, 0)
+    assert not rules.should_continue(analyze("blocked"), 0)
@@ -0,0 +1,60 @@
+"""
+Tests for the Aho-Corasick keyword automaton
+"""
+
+import random
+
+import pytest
+
+from keyword_engine import KeywordAutomaton
+
+LEXICON = {"he": 1.0, "she": 2.0, "his": 1.5, "hers": 3.0, "otp": 2.5, "share otp": 3.0, "a": 0.5}
+
+
+def naive_hits(keywords, text):
+    """(end, index) of every occurrence, by one substring scan per keyword"""
+    hits = []
+    for index, keyword in enumerate(keywords):
+        start = text.find(keyword)
+        while start != -1:
+            hits.append((start + len(keyword), index))
+            start = text.find(keyword, start + 1)
+    return sorted(hits)
+
+
+def test_overlapping_keywords_are_all_found():
+    automaton = KeywordAutomaton(LEXICON)
+    hits = automaton.find_all("ushers")
+    assert [(hit.start, hit.end, hit.keyword) for hit in hits] == [
+        (1, 4, "she"), (2, 4, "he"), (2, 6, "hers")
+    ]
+    assert [hit.weight for hit in hits] == [2.0, 1.0, 3.0]
+
+
+def test_matched_indices_are_distinct_and_in_lexicon_order():
+    automaton = KeywordAutomaton(LEXICON)
+    # "a", "otp" and "share otp", each once even though they repeat
+    assert automaton.matched_indices("please share otp, share otp now") == [4, 5, 6]
+    assert automaton.matched_indices("nothing here") == [0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_equal_a_substring_scan(seed):
+    rnd = random.Random(seed)
+    keywords = list(dict.fromkeys("".join(rnd.choice("abc") for _ in range(rnd.randint(1, 4))) for _ in range(15)))
+    automaton = KeywordAutomaton({keyword: 1.0 for keyword in keywords})
+    for _ in range(50):
+        text = "".join(rnd.choice("abcd") for _ in range(rnd.randint(0, 40)))
+        assert sorted(automaton.iter_matches(text)) == naive_hits(keywords, text)
+        assert automaton.matched_indices(text) == sorted({index for _, index in naive_hits(keywords, text)})
+
+
+def test_empty_keyword_never_matches():
+    automaton = KeywordAutomaton({"": 1.0, "otp": 2.0})
+    assert automaton.matched_indices("otp") == [1]
+    assert automaton.find_all("") == []
+
+
+def test_shared_prefixes_share_states():
+    automaton = KeywordAutomaton({"otp": 1.0, "otp code": 1.0, "ot": 1.0})
+    assert automaton.state_count == len("otp code") + 1
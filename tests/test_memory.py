@@ -0,0 +1,24 @@
+"""
+Tests for the in-memory session state
+"""
+
+import pytest
+
+from memory import SessionMemory
+
+
+@pytest.mark.parametrize("decay", [0.0, 0.5, 0.9, 1.0])
+def test_steady_low_confidence_turns_never_flag_the_session(decay):
+    memory = SessionMemory()
+    memory.create_session("s1")
+    scores = [memory.update_session_score("s1", 0.17, decay) for _ in range(50)]
+    assert max(scores) < 0.3
+    assert scores[-1] == 0.17
+
+
+def test_session_score_weights_recent_turns():
+    memory = SessionMemory()
+    memory.create_session("s1")
+    assert memory.update_session_score("s1", 0.8, 0.5) == 0.8
+    # (0.8 * 0.5 + 0.2) / (1 + 0.5)
+    assert memory.update_session_score("s1", 0.2, 0.5) == 0.4
@@ -0,0 +1,103 @@
+"""
+Tests for token-budgeted prompt building
+"""
+
+import pytest
+
+from prompt_builder import PromptBuilder, estimate_tokens
+from text_analysis import analyze
+
+SYSTEM = "You are a cautious bank customer talking to a possible scammer."
+
+SCRIPT = [
+    "Hello, I am calling from SBI head office about your account.",
+    "Your account will be blocked today, pay the Rs 4,999 processing fee.",
+    "Send the OTP you just received to confirm it is you.",
+    "Pay to refund.desk@okaxis or call 9876543210 for help.",
+    "Sir this is urgent, the RBI has flagged your KYC.",
+    "Also share your UPI PIN so we can reverse the charge.",
+    "Open http://sbi-kyc.example/verify and enter your card number.",
+    "Last warning, Rs 25,000 will be debited if you do not act.",
+]
+
+
+def conversation(turns):
+    history = []
+    for i, text in enumerate(SCRIPT[:turns]):
+        history.append({"sender": "scammer", "text": text, "timestamp": f"t{i}"})
+        history.append({"sender": "user", "text": f"What do you mean by that? ({i})", "timestamp": f"t{i}"})
+    return history
+
+
+def test_short_conversation_is_quoted_in_full():
+    builder = PromptBuilder(budget=700, recent_turns=4)
+    history = conversation(2)
+    prompt = builder.build(SYSTEM, analyze("Please hurry"), history)
+    assert prompt.summarized_turns == 0
+    assert prompt.recent_turns == 4
+    assert "Summary of" not in prompt.text
+    for message in history:
+        assert message["text"] in prompt.text
+    assert prompt.text.endswith("Scammer: Please hurry\nYou (respond naturally in 1-2 sentences):")
+
+
+def test_older_messages_are_summarized():
+    builder = PromptBuilder(budget=700, recent_turns=4)
+    prompt = builder.build(SYSTEM, analyze("Are you there?"), conversation(8))
+    assert prompt.recent_turns == 4
+    assert prompt.summarized_turns == 12
+    assert "Summary of the 12 earlier messages:" in prompt.text
+    assert "They claimed to be from: SBI, RBI" in prompt.text
+    assert "Rs 4,999" in prompt.text
+    assert "refund.desk@okaxis" in prompt.text and "9876543210" in prompt.text
+    assert "OTP" in prompt.text and "upi pin" in prompt.text
+    # The summarized scammer messages are not quoted
+    assert SCRIPT[0] not in prompt.text
+
+
+@pytest.mark.parametrize("budget", [120, 200, 400, 700])
+def test_prompt_stays_within_the_budget(budget):
+    builder = PromptBuilder(budget=budget, recent_turns=6)
+    history = conversation(8)
+    history[-2]["text"] = "very long message " * 200
+    prompt = builder.build(SYSTEM, analyze("And now?"), history)
+    assert prompt.tokens == estimate_tokens(prompt.text)
+    assert prompt.tokens <= budget
+
+
+def test_messages_that_do_not_fit_are_folded_into_the_summary():
+    builder = PromptBuilder(budget=90, recent_turns=6)
+    prompt = builder.build(SYSTEM, analyze("And now?"), conversation(8))
+    assert prompt.recent_turns < 6
+    assert prompt.summarized_turns == 16 - prompt.recent_turns
+
+
+def test_incremental_summary_matches_a_fresh_one():
+    incremental = PromptBuilder(budget=700, recent_turns=2)
+    history = conversation(8)
+    for end in range(1, len(history) + 1):
+        last = incremental.build(SYSTEM, analyze("ok?"), history[:end], session_id="s1")
+    fresh = PromptBuilder(budget=700, recent_turns=2).build(SYSTEM, analyze("ok?"), history)
+    assert last.text == fresh.text
+
+
+def test_trailing_copy_of_the_current_message_is_ignored():
+    builder = PromptBuilder(budget=700, recent_turns=4)
+    history = conversation(3)
+    current = "Send the money now"
+    with_copy = builder.build(SYSTEM, analyze(current), history + [{"sender": "scammer", "text": current}])
+    without = builder.build(SYSTEM, analyze(current), history)
+    assert with_copy.text == without.text
+    assert with_copy.text.count(current) == 1
+
+
+def test_replaced_history_restarts_the_summary():
+    builder = PromptBuilder(budget=700, recent_turns=2)
+    builder.build(SYSTEM, analyze("ok?"), conversation(8), session_id="s1")
+    other = [{"sender": "scammer", "text": "Hi from HDFC"}, {"sender": "user", "text": "Hello?"},
+             {"sender": "scammer", "text": "Pay now"}, {"sender": "user", "text": "Why?"}]
+    prompt = builder.build(SYSTEM, analyze("ok?"), other, session_id="s1")
+    assert prompt.summarized_turns == 2
+    assert "SBI" not in prompt.text
+    builder.reset_session("s1")
+    assert builder.stats()["sessions"] == 0
@@ -0,0 +1,67 @@
+"""
+Tests for the LLM reply cache
+"""
+
+import pytest
+
+from reply_cache import ReplyCache, intent_fingerprint
+from text_analysis import analyze
+
+KEY = ("early", "english", b"k" * 16)
+
+
+@pytest.mark.parametrize("reply", [
+    "Should I send it to 9876543210?",
+    "Is the amount Rs 4999 or more?",
+    "Do I open https://secure-kyc.example/verify ?",
+    "Is www.bank-help.in your site?",
+    "Which UPI, scammer@ybl?",
+])
+def test_replies_quoting_numbers_or_links_are_not_cached(reply):
+    cache = ReplyCache(capacity=10, ttl=60, variants=1)
+    assert not cache.put(KEY, reply)
+    assert cache.get(KEY) is None
+    assert cache.stats()["skipped"] == 1
+
+
+@pytest.mark.parametrize("reply", [
+    "Why would my account be blocked?",
+    "Can you explain it again? I have 2 accounts.",
+    "Okay, what do I do next?",
+])
+def test_generic_replies_are_cached(reply):
+    cache = ReplyCache(capacity=10, ttl=60, variants=1)
+    assert cache.put(KEY, reply)
+    assert cache.get(KEY) == reply
+
+
+def test_replies_are_served_once_enough_variants_are_collected():
+    cache = ReplyCache(capacity=10, ttl=60, variants=3)
+    replies = ["What happened?", "Is this real?", "Who are you?"]
+    for reply in replies[:2]:
+        assert cache.put(KEY, reply)
+        assert cache.get(KEY) is None
+    # Duplicates do not count as a variant
+    assert not cache.put(KEY, replies[0])
+    assert cache.put(KEY, replies[2])
+    assert not cache.put(KEY, "One more?")
+    assert {cache.get(KEY) for _ in range(50)} <= set(replies)
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ReplyCache(capacity=0, ttl=60, variants=1)
+    assert not cache.enabled
+    assert not cache.put(KEY, "What happened?")
+    assert cache.get(KEY) is None
+
+
+def test_intent_fingerprint_ignores_filler_and_details():
+    same = [
+        "Dear customer, share OTP now",
+        "Share the OTP now please",
+        "share otp NOW",
+    ]
+    assert len({intent_fingerprint(analyze(text)) for text in same}) == 1
+    assert intent_fingerprint(analyze("Pay Rs 500 at https://a.example")) == \
+        intent_fingerprint(analyze("Pay Rs 20000 at https://b.example"))
+    assert intent_fingerprint(analyze("Share OTP now")) != intent_fingerprint(analyze("Share PIN now"))
@@ -0,0 +1,148 @@
+"""
+Tests for micro-batching of LLM reply requests
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from request_coalescer import RequestCoalescer
+
+
+class RecordingDispatcher:
+    """Answers each prompt with a reply derived from it, recording the batches"""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def __call__(self, prompts):
+        self.batches.append(list(prompts))
+        await asyncio.sleep(self.delay)
+        return [f"reply to {prompt}" for prompt in prompts]
+
+
+def test_full_batch_is_dispatched_without_waiting():
+    dispatch = RecordingDispatcher()
+    # The timer alone would hold the batch for a minute
+    coalescer = RequestCoalescer(dispatch, max_batch=3, max_wait_ms=60_000)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(coalescer.submit(f"p{i}") for i in range(3))), timeout=5
+        )
+
+    assert asyncio.run(run()) == ["reply to p0", "reply to p1", "reply to p2"]
+    assert dispatch.batches == [["p0", "p1", "p2"]]
+
+
+def test_partial_batch_is_dispatched_after_max_wait():
+    dispatch = RecordingDispatcher()
+    coalescer = RequestCoalescer(dispatch, max_batch=10, max_wait_ms=20)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        replies = await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"))
+        return replies, loop.time() - start
+
+    replies, waited = asyncio.run(run())
+    assert replies == ["reply to a", "reply to b"]
+    assert dispatch.batches == [["a", "b"]]
+    assert waited >= 0.015
+    assert coalescer.stats()["mean_batch"] == 2.0
+
+
+def test_overflow_starts_a_new_batch():
+    dispatch = RecordingDispatcher()
+    coalescer = RequestCoalescer(dispatch, max_batch=2, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(*(coalescer.submit(f"p{i}") for i in range(5)))
+
+    assert asyncio.run(run()) == [f"reply to p{i}" for i in range(5)]
+    assert dispatch.batches == [["p0", "p1"], ["p2", "p3"], ["p4"]]
+
+
+def test_each_caller_gets_its_own_prompts_reply():
+    async def scrambled(prompts):
+        # Work in any order, answer in prompt order
+        order = list(range(len(prompts)))
+        random.Random(len(prompts)).shuffle(order)
+        replies = {}
+        for i in order:
+            await asyncio.sleep(0)
+            replies[i] = prompts[i].upper()
+        return [replies[i] for i in range(len(prompts))]
+
+    coalescer = RequestCoalescer(scrambled, max_batch=8, max_wait_ms=5)
+    prompts = [f"session {i} prompt" for i in range(30)]
+
+    async def run():
+        async def one(prompt):
+            # Callers arrive spread over several batch windows
+            await asyncio.sleep(random.Random(prompt).random() * 0.02)
+            return prompt, await coalescer.submit(prompt)
+        return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+    for prompt, reply in asyncio.run(run()):
+        assert reply == prompt.upper()
+    assert coalescer.stats()["batches"] > 1
+
+
+def test_identical_prompts_share_one_slot():
+    dispatch = RecordingDispatcher()
+    coalescer = RequestCoalescer(dispatch, max_batch=4, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(coalescer.submit("same"), coalescer.submit("same"), coalescer.submit("other"))
+
+    assert asyncio.run(run()) == ["reply to same", "reply to same", "reply to other"]
+    assert dispatch.batches == [["same", "other"]]
+    assert coalescer.stats()["shared"] == 1
+
+
+def test_per_prompt_errors_reach_only_their_caller():
+    async def dispatch(prompts):
+        return [ValueError(prompt) if prompt == "bad" else prompt for prompt in prompts]
+
+    coalescer = RequestCoalescer(dispatch, max_batch=2, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(coalescer.submit("good"), coalescer.submit("bad"), return_exceptions=True)
+
+    good, bad = asyncio.run(run())
+    assert good == "good"
+    assert isinstance(bad, ValueError)
+
+
+def test_wrong_result_count_fails_the_whole_batch():
+    async def dispatch(prompts):
+        return prompts[:1]
+
+    coalescer = RequestCoalescer(dispatch, max_batch=2, max_wait_ms=10)
+
+    async def run():
+        return await asyncio.gather(coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+
+def test_cancelled_caller_does_not_cancel_the_batch():
+    dispatch = RecordingDispatcher(delay=0.02)
+    coalescer = RequestCoalescer(dispatch, max_batch=2, max_wait_ms=5)
+
+    async def run():
+        impatient = asyncio.ensure_future(coalescer.submit("a"))
+        patient = asyncio.ensure_future(coalescer.submit("b"))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(run()) == "reply to b"
+
+
+@pytest.mark.parametrize("max_batch,max_wait_ms", [(1, 10), (8, 0)])
+def test_disabled_settings(max_batch, max_wait_ms):
+    assert not RequestCoalescer(RecordingDispatcher(), max_batch=max_batch, max_wait_ms=max_wait_ms).enabled
@@ -0,0 +1,78 @@
+"""
+Regression tests for the keyword scam detector
+"""
+
+import re
+
+import pytest
+
+from scam_detector import detect_scam, detector, verdict_cache
+
+# Danger patterns of the original per-pattern re.search scorer
+BASELINE_PATTERNS = [
+    r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b',
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
+    r'\b\d{10,}\b',
+    r'[A-Z]{2}\d{10}',
+    r'\b[\w.-]+@[\w.-]+\.\w+\b',
+]
+
+PATTERN_MESSAGES = [
+    "Send Rs 500 to 9876543210@paytm now",
+    "Visit http://bit.ly/9876543210",
+    "AB1234567890@gmail.com",
+    "Call +919876543210 or 9123456789",
+    "Mail kyc.update@sbi-secure.co.in or call 1800-123-4567",
+    "Account SB12345678901234 will be frozen",
+    "Card 4111 1111 1111 1111 expires today",
+    "Pay to scammer@ybl or www.refund-now.in/claim",
+    "Link:https://example.com/a?x=1,reply(9999999999)",
+    "user_1@x.c1 and a-b@c.de",
+    "NO INDICATORS HERE, JUST SHOUTING",
+    "ref12345678901 (not a phone), 123456789 (too short)",
+    "",
+]
+
+
+def baseline_pattern_count(message):
+    return sum(1 for pattern in BASELINE_PATTERNS if re.search(pattern, message))
+
+
+@pytest.mark.parametrize("message", PATTERN_MESSAGES)
+def test_danger_patterns_match_baseline(message):
+    assert len(detector.matched_patterns(message)) == baseline_pattern_count(message)
+
+
+def test_batch_danger_patterns_match_baseline():
+    verdicts = detector.detect_batch(PATTERN_MESSAGES)
+    for message, verdict in zip(PATTERN_MESSAGES, verdicts):
+        assert verdict == detector.detect(message)
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Pay fine within 12 hours", "Pay fine within 24 hours"),
+    ("Sale 10%", "Sale 90% off"),
+    ("Open http://example.com/a", "Open http://sbi-kyc-verify-otp.com"),
+])
+def test_verdict_cache_does_not_reuse_other_verdicts(first, second):
+    verdict_cache.clear()
+    detect_scam(first)
+    assert detect_scam(second) == detector.detect(second)
+
+
+def test_verdict_cache_shares_numbers_the_detector_cannot_tell_apart():
+    verdict_cache.clear()
+    detect_scam("Call 9876543210 and pay Rs 500")
+    assert verdict_cache.stats()["size"] == 1
+    detect_scam("Call 9123456789 and pay Rs 1500")
+    assert verdict_cache.stats()["size"] == 1
+
+
+def test_danger_patterns_come_from_the_shared_scan(monkeypatch):
+    import scam_detector
+    scans = []
+    real_scan = scam_detector.scan_indicators
+    monkeypatch.setattr(scam_detector, "scan_indicators", lambda text: scans.append(text) or real_scan(text))
+    message = "Send Rs 500 to 9876543210@paytm now"
+    assert len(detector.matched_patterns(message)) == baseline_pattern_count(message)
+    assert scans == [message]
@@ -0,0 +1,122 @@
+"""
+Tests for the bounded session store and the SQLite round trip of evicted sessions
+"""
+
+import types
+
+import pytest
+
+import db
+from memory import SessionMemory, SessionStore
+
+
+@pytest.fixture
+def clock():
+    """Manually advanced time source for the store"""
+    return types.SimpleNamespace(now=0.0)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "honeypot.db"))
+    db.init_db()
+
+
+def make_memory(clock, evicted, **bounds):
+    """SessionMemory whose evicted sessions are flushed to SQLite (as main.py does)"""
+    store = SessionStore(clock=lambda: clock.now, **bounds)
+
+    def flush(session_id, session, reason):
+        evicted.append((session_id, reason))
+        db.persist_session(dict(session))
+
+    store.add_listener(flush)
+    return SessionMemory(store)
+
+
+def play_turn(memory, session_id, text, confidence, intelligence):
+    """One scammer turn, written to SQLite the way the API writes it"""
+    memory.add_message(session_id, "scammer", text, "2026-01-01T10:00:00Z")
+    db.persist_message(session_id, "scammer", text, "2026-01-01T10:00:00Z")
+    score = memory.update_session_score(session_id, confidence, 0.5)
+    memory.update_scam_detection(session_id, score >= 0.3, score)
+    delta = memory.update_intelligence(session_id, intelligence)
+    db.persist_intelligence(session_id, delta)
+    return score
+
+
+def test_capacity_eviction_flushes_and_reloads_the_session(database, clock):
+    evicted = []
+    memory = make_memory(clock, evicted, capacity=1, ttl=0)
+    memory.create_session("s1", {"channel": "SMS"})
+    play_turn(memory, "s1", "Your account is blocked, pay to fraud@ybl", 0.8,
+              {"upiIds": ["fraud@ybl"], "knownBad": ["fraud@ybl"],
+               "tactics_used": [{"category": "threats", "keyword": "blocked"}]})
+    play_turn(memory, "s1", "Share the OTP now", 0.2, {"suspiciousKeywords": ["otp"]})
+    session = memory.get_session("s1")
+    expected = {key: session[key] for key in
+                ("session_score", "scored_turns", "scam_detected", "confidence", "message_count", "metadata")}
+    expected_intelligence = {key: list(values) for key, values in session["extracted_intelligence"].items()}
+
+    memory.create_session("s2")
+    assert evicted == [("s1", "capacity")]
+    assert memory.get_session("s1") is None
+
+    stored = db.load_session("s1")
+    assert {key: stored[key] for key in expected} == expected
+    assert stored["extracted_intelligence"] == expected_intelligence
+    assert [m["text"] for m in stored["conversation_history"]] == [
+        "Your account is blocked, pay to fraud@ybl", "Share the OTP now"
+    ]
+
+    # Back in memory, the session carries on where it stopped
+    restored = memory.restore_session(stored)
+    assert memory.get_session("s1") is restored
+    # Running score 0.8 * 0.5 + 0.2 = 0.6 over turn weight 1.5, then one more turn
+    assert memory.update_session_score("s1", 0.2, 0.5) == round((0.6 * 0.5 + 0.2) / 1.75, 2)
+    # Indicators reported before the eviction are not new again
+    delta = memory.update_intelligence("s1", {"upiIds": ["fraud@ybl"], "knownBad": ["fraud@ybl", "other@ybl"]})
+    assert delta["upiIds"] == []
+    assert delta["knownBad"] == ["other@ybl"]
+
+
+def test_idle_sessions_expire_and_are_flushed(database, clock):
+    evicted = []
+    memory = make_memory(clock, evicted, capacity=0, ttl=60)
+    memory.create_session("idle")
+    play_turn(memory, "idle", "Pay the fee now", 0.6, {})
+    clock.now = 30
+    memory.create_session("busy")
+    clock.now = 61
+    assert memory.sessions.sweep() == 1
+    assert evicted == [("idle", "expired")]
+    assert "busy" in memory.sessions
+    assert db.load_session("idle")["session_score"] == 0.6
+
+
+def test_pinned_session_is_not_evicted(database, clock):
+    evicted = []
+    memory = make_memory(clock, evicted, capacity=1, ttl=0)
+    memory.create_session("s1")
+    with memory.pinned("s1"):
+        memory.create_session("s2")
+        assert "s1" in memory.sessions
+        assert evicted == [("s2", "capacity")]
+    memory.create_session("s3")
+    assert evicted[-1] == ("s1", "capacity")
+
+
+def test_byte_bound_evicts_least_recently_used(database, clock):
+    evicted = []
+    memory = make_memory(clock, evicted, capacity=0, ttl=0, max_bytes=10_000)
+    for session_id in ("a", "b", "c"):
+        memory.create_session(session_id)
+    memory.get_session("a")
+    memory.add_message("c", "scammer", "x" * 6000, "2026-01-01T10:00:00Z")
+    assert [session_id for session_id, _ in evicted] == ["b", "a"]
+    assert all(reason == "bytes" for _, reason in evicted)
+    assert memory.sessions.bytes <= 10_000
+
+
+def test_unknown_session_is_not_stored(database):
+    assert db.load_session("never-seen") is None
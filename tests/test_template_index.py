@@ -0,0 +1,78 @@
+"""
+Tests for the near-duplicate scam template index
+"""
+
+from template_index import TemplateIndex
+
+BASE = "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.example now"
+VARIANT = "Dear customer your SBI account will be blocked today. Update KYC at http://sbi-kyc.example immediately"
+OTHER = "Congratulations you won a lottery of Rs 25 lakh, pay the processing fee to claim"
+
+
+def test_digits_and_links_do_not_change_the_template():
+    index = TemplateIndex()
+    first = index.add("Pay Rs 500 to 9876543210 at http://a.example")
+    again = index.add("Pay Rs 12000 to 9123456789 at https://b.example/x")
+    assert again is first
+    assert first.count == 2
+    assert len(index) == 1
+
+
+def test_match_depends_on_the_similarity_threshold():
+    similarity = TemplateIndex.similarity(TemplateIndex().signature(BASE), TemplateIndex().signature(VARIANT))
+    assert 0.5 < similarity < 1.0
+
+    # Just below the pair's similarity: the variant is a near-duplicate
+    loose = TemplateIndex(threshold=similarity - 0.01, campaign_threshold=0.3)
+    base = loose.add(BASE)
+    assert loose.add(VARIANT) is base
+    assert base.count == 2
+    assert loose.stats()["near_duplicates"] == 1
+
+    # Just above it: a new template, but in the same campaign
+    strict = TemplateIndex(threshold=similarity + 0.01, campaign_threshold=0.3)
+    base = strict.add(BASE)
+    variant = strict.add(VARIANT)
+    assert variant is not base
+    assert variant.campaign_id == base.campaign_id
+    assert len(strict) == 2
+
+
+def test_unrelated_message_starts_its_own_campaign():
+    index = TemplateIndex()
+    base = index.add(BASE)
+    other = index.add(OTHER)
+    assert other is not base
+    assert other.campaign_id != base.campaign_id
+    assert index.lookup(OTHER).template_id == other.template_id
+    assert index.lookup(OTHER).similarity == 1.0
+
+
+def test_full_index_still_matches_known_templates():
+    similarity = TemplateIndex.similarity(TemplateIndex().signature(BASE), TemplateIndex().signature(VARIANT))
+    index = TemplateIndex(threshold=similarity - 0.01, capacity=1)
+    base = index.add(BASE)
+    # New templates are refused once the index is full...
+    assert index.add(OTHER) is None
+    assert len(index) == 1
+    # ...but repeats and near-duplicates of indexed ones are still counted
+    assert index.add(BASE) is base
+    assert index.add(VARIANT) is base
+    assert base.count == 3
+    assert index.add_many([OTHER, BASE, ""]) == 1
+
+
+def test_messages_without_words_are_not_indexed():
+    index = TemplateIndex()
+    assert index.add("!!! ???") is None
+    assert index.lookup("!!! ???") is None
+    assert len(index) == 0
+
+
+def test_stored_verdict_is_tied_to_the_lexicon_version():
+    template = TemplateIndex().add(BASE)
+    verdict = {"is_scam": True, "confidence": 0.9}
+    template.verdicts["keyword"] = ("v1", verdict)
+    assert template.verdict_for("keyword", "v1") is verdict
+    assert template.verdict_for("keyword", "v2") is None
+    assert template.verdict_for("linear", "v1") is None
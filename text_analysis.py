@@ -0,0 +1,159 @@
+"""
+Text Analysis Module - One-pass message normalization shared across modules
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Tuple, Union
+
+_ASCII_UPPERCASE = bytes(range(ord("A"), ord("Z") + 1))
+
+_TOKEN_RE = re.compile(r"\w+")
+_DIGIT_RUN_RE = re.compile(r"\d+")
+
+# Checked in this order, so a mixed message reports the first script listed
+_SCRIPTS = (
+    ("Devanagari", re.compile(r"[\u0900-\u097F]")),
+    ("Tamil", re.compile(r"[\u0B80-\u0BFF]")),
+    ("Telugu", re.compile(r"[\u0C00-\u0C7F]")),
+)
+
+# Zero-width characters dropped before matching (used to split keywords)
+# and Indic digits mapped to ASCII so numbers match the same way
+_FOLD_TABLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+for _zero in ("\u0966", "\u0BE6", "\u0C66"):  # Devanagari, Tamil, Telugu
+    _FOLD_TABLE.update({ord(_zero) + d: str(d) for d in range(10)})
+
+# Romanized Hindi (Hinglish) spelling variants -> one canonical spelling, so
+# lexicon entries only need to list the canonical form
+HINGLISH_FOLDS = {
+    "aapka": ("apka", "aapkaa", "apkaa"),
+    "khata": ("khaata", "khatha"),
+    "band": ("bandh",),
+    "turant": ("turnt", "turunt"),
+    "jaldi": ("jldi", "jaldee", "jaldii"),
+    "paise": ("paisa", "pese", "paisee"),
+    "nahi": ("nahin", "nhi", "nai"),
+    "karo": ("kro", "karoo"),
+    "abhi": ("abi", "abhie"),
+    "bhejo": ("bhejdo", "bhej do"),
+}
+_HINGLISH_CANONICAL = {variant: canonical for canonical, variants in HINGLISH_FOLDS.items() for variant in variants}
+_HINGLISH_RE = re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, _HINGLISH_CANONICAL), key=len, reverse=True)) + r")\b")
+
+
+class Token(NamedTuple):
+    """A word of the message (lowercased) and its span in the original text"""
+    word: str
+    start: int
+    end: int
+
+
+def count_upper(text: str) -> int:
+    """Count uppercase characters (fast path for ASCII text)"""
+    if text.isascii():
+        return len(text) - len(text.encode("ascii").translate(None, _ASCII_UPPERCASE))
+    return sum(map(str.isupper, text))
+
+
+def caps_ratio(text: str) -> float:
+    """Share of uppercase characters in text (0 for empty text)"""
+    return count_upper(text) / len(text) if text else 0.0
+
+
+def fold(text: str) -> str:
+    """
+    Matching form of a text
+
+    Lowercased, plus for non-ASCII text NFKC compatibility folding (so
+    full-width and styled letters match plain ones), zero-width characters
+    removed and Indic digits mapped to ASCII. Hinglish spelling variants are
+    folded to their canonical spelling. The result can be shorter than text.
+
+    Args:
+        text: Original text
+
+    Returns:
+        Folded text
+    """
+    if text.isascii():
+        return fold_hinglish(text.lower())
+    return fold_hinglish(unicodedata.normalize("NFKC", text).translate(_FOLD_TABLE).lower())
+
+
+def fold_hinglish(lowered: str) -> str:
+    """Replace Hinglish spelling variants in lowercased text with their canonical spelling"""
+    if _HINGLISH_RE.search(lowered):
+        return _HINGLISH_RE.sub(lambda match: _HINGLISH_CANONICAL[match.group()], lowered)
+    return lowered
+
+
+class MessageAnalysis:
+    """Normalized views of one message, computed once and shared
+
+    lower and folded are computed up front (every consumer needs them);
+    tokens, words and digit runs are computed on first use. Offsets always
+    refer to the original text.
+    """
+
+    __slots__ = ("text", "lower", "folded", "script", "caps_ratio", "_tokens", "_words", "_digit_runs")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.folded = fold_hinglish(self.lower) if text.isascii() else fold(text)
+        self.script = "Latin"
+        if not text.isascii():
+            for name, pattern in _SCRIPTS:
+                if pattern.search(text):
+                    self.script = name
+                    break
+        self.caps_ratio = caps_ratio(text)
+        self._tokens = None
+        self._words = None
+        self._digit_runs = None
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Word tokens with their offsets in the original text"""
+        if self._tokens is None:
+            self._tokens = [Token(m.group().lower(), m.start(), m.end()) for m in _TOKEN_RE.finditer(self.text)]
+        return self._tokens
+
+    @property
+    def words(self) -> FrozenSet[str]:
+        """Distinct lowercased words"""
+        if self._words is None:
+            self._words = frozenset(token.word for token in self.tokens)
+        return self._words
+
+    @property
+    def digit_runs(self) -> List[Tuple[int, int]]:
+        """(start, end) spans of digit runs in the original text"""
+        if self._digit_runs is None:
+            self._digit_runs = [m.span() for m in _DIGIT_RUN_RE.finditer(self.text)]
+        return self._digit_runs
+
+
+@lru_cache(maxsize=4096)
+def _analyze_text(text: str) -> MessageAnalysis:
+    return MessageAnalysis(text)
+
+
+def analyze(message: Union[str, MessageAnalysis]) -> MessageAnalysis:
+    """
+    Get the shared analysis of a message
+
+    Analyses are memoized by text, so the detector, extractor and agent
+    handling the same message in one request share one normalization pass.
+
+    Args:
+        message: Message text, or an analysis (returned unchanged)
+
+    Returns:
+        MessageAnalysis
+    """
+    if isinstance(message, MessageAnalysis):
+        return message
+    return _analyze_text(message)
@@ -0,0 +1,114 @@
+"""
+Timings Module - Per-stage latency tracking for request pipelines
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Deque, Dict, TypeVar
+
+# Recent samples kept per stage for percentiles
+TIMING_WINDOW = int(os.getenv("TIMING_WINDOW", 1000))
+
+T = TypeVar("T")
+
+
+class StageTimings:
+    """Rolling per-stage latency samples (seconds) with percentile summaries"""
+
+    def __init__(self, window: int = None):
+        """
+        Args:
+            window: Samples kept per stage (defaults to TIMING_WINDOW)
+        """
+        self.window = max(1, TIMING_WINDOW if window is None else window)
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        """Add one sample for a stage"""
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+            samples.append(seconds)
+            self._counts[stage] += 1
+
+    def start(self) -> "RequestTimer":
+        """Timer for one request, recorded here when finished"""
+        return RequestTimer(self)
+
+    def stats(self) -> Dict:
+        """Count, mean, p50, p95 and max (milliseconds) per stage over the window"""
+        with self._lock:
+            snapshot = {stage: (sorted(samples), self._counts[stage]) for stage, samples in self._samples.items()}
+        summary = {}
+        for stage, (samples, count) in snapshot.items():
+            n = len(samples)
+            summary[stage] = {
+                "count": count,
+                "mean_ms": round(sum(samples) / n * 1000, 2),
+                "p50_ms": round(samples[n // 2] * 1000, 2),
+                "p95_ms": round(samples[min(n - 1, int(n * 0.95))] * 1000, 2),
+                "max_ms": round(samples[-1] * 1000, 2)
+            }
+        return summary
+
+    def clear(self):
+        """Drop all samples"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+
+class RequestTimer:
+    """Stage durations of a single request
+
+    Durations of a stage entered more than once are summed. Stages may
+    overlap (e.g. an LLM call in flight while detection runs), so they do
+    not add up to the total.
+    """
+
+    def __init__(self, timings: StageTimings):
+        self.timings = timings
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.durations[stage] = self.durations.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await `awaitable`, timing it as stage `name`"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def finish(self) -> Dict[str, float]:
+        """Record the stages and the total, returning the durations"""
+        self.durations["total"] = time.perf_counter() - self.started
+        for stage, seconds in self.durations.items():
+            self.timings.record(stage, seconds)
+        return self.durations
+
+    def server_timing(self) -> str:
+        """Durations as a Server-Timing header value"""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.durations.items())
+
+
+# Singleton instance for the honeypot endpoint
+pipeline_timings = StageTimings()
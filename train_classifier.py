@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Linear Classifier Trainer - Fits the hashed n-gram scam classifier offline
+Reads training_dataset.json and the SQLite messages table, writes an .npz model
+
+The scam labels of those two sources are the verdicts the keyword detector
+recorded, so a model trained on them alone only learns to imitate it
+(bootstrap labels). Hand-labelled examples passed with --labels override
+them text by text.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+from classifier import CLASSIFIER_MODEL_PATH, HashingVectorizer, LinearScamClassifier
+from db import DB_PATH
+
+
+def load_training_dataset(path: Path) -> List[Tuple[str, int]]:
+    """Scammer turns labelled by the recorded verdict, victim replies as benign"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    examples = []
+    for conversation in data:
+        for turn in conversation.get('turns', []):
+            if turn.get('scammer_msg'):
+                examples.append((turn['scammer_msg'], 1 if turn.get('scam_detected') else 0))
+            if turn.get('victim_reply'):
+                examples.append((turn['victim_reply'], 0))
+    return examples
+
+
+def load_messages_table(db_path: str) -> List[Tuple[str, int]]:
+    """Scammer messages labelled by their session verdict, agent replies as benign"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT m.sender, m.text, COALESCE(s.scam_detected, 0)
+            FROM messages m LEFT JOIN sessions s ON s.session_id = m.session_id
+            WHERE m.text IS NOT NULL AND m.text != ''
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+
+    return [(text, int(scam) if sender == 'scammer' else 0) for sender, text, scam in rows]
+
+
+def load_labelled(path: Path) -> List[Tuple[str, int]]:
+    """Hand-labelled examples: JSON lines of {"text": ..., "label": 0 or 1}"""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not record.get('text') or record.get('label') not in (0, 1, True, False):
+                raise ValueError(f"{path}:{number}: expected text and a 0/1 label")
+            examples.append((record['text'], int(record['label'])))
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the linear scam classifier")
+    parser.add_argument('--dataset', default='training_dataset.json')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--labels', help="JSON lines of hand-labelled {text, label} examples")
+    parser.add_argument('--output', default=CLASSIFIER_MODEL_PATH)
+    parser.add_argument('--features', type=int, default=2 ** 18, help="hashed feature columns (power of two)")
+    parser.add_argument('--ngram-max', type=int, default=2)
+    parser.add_argument('--epochs', type=int, default=300)
+    parser.add_argument('--holdout', type=float, default=0.2)
+    args = parser.parse_args()
+
+    examples = []
+    if Path(args.dataset).exists():
+        dataset_examples = load_training_dataset(Path(args.dataset))
+        print(f"📊 {args.dataset}: {len(dataset_examples)} examples")
+        examples.extend(dataset_examples)
+    if Path(args.db).exists():
+        db_examples = load_messages_table(args.db)
+        print(f"📊 {args.db}: {len(db_examples)} examples")
+        examples.extend(db_examples)
+
+    if args.labels:
+        labelled = load_labelled(Path(args.labels))
+        print(f"📊 {args.labels}: {len(labelled)} hand-labelled examples")
+        # Added last so a hand label wins over the detector's verdict for the same text
+        examples.extend(labelled)
+    else:
+        print("⚠️  Warning: No --labels given; scam labels are the keyword detector's own verdicts")
+
+    # Same text can appear many times (campaign templates); keep one label per text
+    examples = list(dict(examples).items())
+    labels = {label for _, label in examples}
+    if len(examples) < 10 or labels != {0, 1}:
+        print("Not enough labelled data (need both scam and benign examples).")
+        print("Run generate_training_dataset.py or collect some sessions first.")
+        sys.exit(1)
+
+    random.Random(42).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, test = examples[:split], examples[split:]
+
+    model = LinearScamClassifier(HashingVectorizer(args.features, args.ngram_max))
+    model.fit([t for t, _ in train], [y for _, y in train], epochs=args.epochs)
+
+    if test:
+        verdicts = model.detect_batch([t for t, _ in test])
+        correct = sum(1 for v, (_, y) in zip(verdicts, test) if v['is_scam'] == bool(y))
+        print(f"✓ Holdout accuracy: {correct}/{len(test)} ({correct / len(test):.1%})")
+
+    model.save(args.output)
+    print(f"💾 Model saved to: {args.output} ({len(train)} training examples)")
+
+
+if __name__ == "__main__":
+    main()